@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -11,9 +11,88 @@ class Settings(BaseSettings):
 
     #
     MINDSDB_URL: str
+    mindsdb_pool_min_size: int = 1
+    mindsdb_pool_max_size: int = 16
+    mindsdb_pool_idle_timeout: int = 300
+    mindsdb_pool_health_check_interval: int = 30
+    mindsdb_pool_acquire_timeout: int = 30
+    schema_introspection_workers: int = 4
+    schema_cache_ttl: int = 300
+    schema_cache_size: int = 256
+    schema_cache_use_persisted: bool = True
+
+    # Query result cache
+    query_cache_max_bytes: int = 256 * 1024 * 1024
+    query_cache_ttl: int = 60
+    query_cache_stale_ttl: int = 300
+    query_cache_ttls: dict[str, int] = {}
+
+    # Share one in-flight execution between identical concurrent MindsDB calls and LLM prompts
+    singleflight_enabled: bool = True
+
+    # /datasources/query pagination
+    query_default_page_size: int = 1000
+    query_max_rows: int = 10000
+
+    # Generated SQL cache
+    sql_cache_size: int = 1024
+    sql_cache_ttl: int = 3600
+
+    # Max tables sent to the SQL generator prompt (0 sends the whole schema)
+    sql_prompt_max_tables: int = 8
+
+    # Approximate token budget for the query result handed to SUMMARY_PROMPT
+    summary_token_budget: int = 2000
+
+    # Rows per `data_chunk` event on /chat/stream
+    stream_chunk_rows: int = 500
+
+    # Start SQL generation alongside intent classification on /chat/stream;
+    # the SQL is buffered until the intent is known and dropped for generic messages
+    chat_speculative_sql: bool = False
+
+    # Confidence needed for the local intent classifier to skip the LLM (above 1 disables it)
+    intent_fast_path_threshold: float = 0.8
+
+    # Pre-execution of generated dashboard panel queries (/chat/analytics with validate_panels)
+    panel_validation_concurrency: int = 4
+    panel_validation_timeout: float = 15
+    panel_snapshot_rows: int = 200
+
+    # Local check of generated SQL against the schema: "reject", "warn" or "off"
+    sql_validation_mode: Literal["reject", "warn", "off"] = "reject"
+
+    # Detect relationships from key naming locally and only send leftovers to the LLM
+    relationship_inference: bool = True
+    # Resolve columns matching several tables by sampling their values from MindsDB
+    relationship_value_sampling: bool = False
+
+    # Semantics generation: estimated tokens per table batch, parallel batches, retries per failed batch
+    semantics_batch_tokens: int = 6000
+    semantics_max_concurrency: int = 4
+    semantics_batch_retries: int = 1
+
+    # Background jobs: worker tasks, jobs queued or running per user, SQLite state file, seconds finished jobs are kept
+    jobs_workers: int = 4
+    jobs_max_per_user: int = 3
+    jobs_store_path: str = "jobs.sqlite3"
+    jobs_retention: int = 86400
 
     origins: list[str] = []
 
+    # Executor pools for blocking clients
+    mindsdb_pool_workers: int = 16
+    supabase_pool_workers: int = 16
+    llm_pool_workers: int = 32
+
+    # LLM scheduler: per-minute request/token budgets and in-flight cap (0 = unlimited), retries of 429/5xx
+    llm_requests_per_minute: int = 0
+    llm_tokens_per_minute: int = 0
+    llm_max_concurrency: int = 16
+    llm_max_retries: int = 3
+    llm_retry_base_delay: float = 1.0
+    llm_retry_max_delay: float = 30.0
+
     # Database
     database_url: Optional[str] | None = None
 
@@ -21,6 +100,11 @@ class Settings(BaseSettings):
     secret_key: str = "fallback-secret-key"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    supabase_jwt_secret: Optional[str] = None
+    jwt_audience: Optional[str] = "authenticated"
+    auth_local_verification: bool = True
+    auth_token_cache_size: int = 1024
+    auth_token_cache_ttl: int = 300
 
     # Supabase
     SUPABASE_URL: str
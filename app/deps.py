@@ -1,8 +1,24 @@
 from fastapi import FastAPI
 
+from app.managers.auth import AuthManager
 from app.managers.db import DBManager
+from app.managers.executors import ExecutorManager
+from app.managers.jobs import JobManager
+from app.managers.llm import LLMRegistry
+from app.managers.llm_scheduler import LLMScheduler
 from app.managers.mindsdb import MindsDBManager
+from app.managers.mindsdb_pool import MindsDBPool
+from app.managers.query_cache import QueryResultCache
 from app.config import settings
+from app.services.db_chat import DBChatService
+from app.services.intent_classifier import FastIntentClassifier
+from app.services.schema_cache import SchemaCache
+from app.services.schema_diff import SchemaChangeTracker
+from app.services.schema_retriever import SchemaRetriever
+from app.services.sql_cache import SQLGenerationCache
+from app.services.sql_validator import SQLValidator
+from app.utils.metrics import ChatStreamMetrics
+from app.utils.singleflight import SingleFlight
 
 
 def create_db_manager() -> DBManager:
@@ -13,18 +29,196 @@ def create_db_manager() -> DBManager:
     )
 
 
-def create_minds_db_manager() -> MindsDBManager:
+def create_minds_db_pool() -> MindsDBPool:
+    """Create the shared MindsDB session pool"""
+    return MindsDBPool(
+        url=settings.MINDSDB_URL,
+        min_size=settings.mindsdb_pool_min_size,
+        max_size=settings.mindsdb_pool_max_size,
+        idle_timeout=settings.mindsdb_pool_idle_timeout,
+        health_check_interval=settings.mindsdb_pool_health_check_interval,
+        acquire_timeout=settings.mindsdb_pool_acquire_timeout,
+    )
+
+
+def create_query_cache() -> QueryResultCache:
+    """Create the MindsDB query result cache"""
+    return QueryResultCache(
+        max_bytes=settings.query_cache_max_bytes,
+        ttl=settings.query_cache_ttl,
+        stale_ttl=settings.query_cache_stale_ttl,
+        ttls=settings.query_cache_ttls,
+    )
+
+
+def create_singleflight() -> SingleFlight | None:
+    """Create a call coalescer, or None when coalescing is disabled"""
+    return SingleFlight() if settings.singleflight_enabled else None
+
+
+def create_minds_db_manager(pool: MindsDBPool, query_cache: QueryResultCache) -> MindsDBManager:
     """Create a new MindsDB manager instance"""
-    return MindsDBManager()
+    return MindsDBManager(
+        pool,
+        introspection_workers=settings.schema_introspection_workers,
+        query_cache=query_cache,
+        singleflight=create_singleflight(),
+    )
+
+
+def create_executor_manager() -> ExecutorManager:
+    """Create the thread pools used to run blocking client calls"""
+    return ExecutorManager(
+        mindsdb_workers=settings.mindsdb_pool_workers,
+        supabase_workers=settings.supabase_pool_workers,
+        llm_workers=settings.llm_pool_workers,
+    )
+
+
+def create_llm_scheduler() -> LLMScheduler:
+    """Create the scheduler every LLM call is admitted through"""
+    return LLMScheduler(
+        requests_per_minute=settings.llm_requests_per_minute,
+        tokens_per_minute=settings.llm_tokens_per_minute,
+        max_concurrency=settings.llm_max_concurrency,
+        max_retries=settings.llm_max_retries,
+        retry_base_delay=settings.llm_retry_base_delay,
+        retry_max_delay=settings.llm_retry_max_delay,
+    )
+
+
+def create_llm_registry(scheduler: LLMScheduler) -> LLMRegistry:
+    """Create the registry of shared LLM clients and chains"""
+    return LLMRegistry(
+        api_key=settings.GEMINI_API_KEY,
+        scheduler=scheduler,
+        singleflight=create_singleflight(),
+    )
+
+
+def create_auth_manager(db_manager: DBManager, executors: ExecutorManager) -> AuthManager:
+    """Create a new auth manager instance"""
+    return AuthManager(
+        supabase_client=db_manager.client,
+        executors=executors,
+        jwt_secret=settings.supabase_jwt_secret,
+        algorithm=settings.algorithm,
+        audience=settings.jwt_audience,
+        local_verification=settings.auth_local_verification,
+        cache_size=settings.auth_token_cache_size,
+        cache_ttl=settings.auth_token_cache_ttl,
+    )
+
+
+def create_schema_cache(minds_db_manager: MindsDBManager, db_manager: DBManager) -> SchemaCache:
+    """Create the datasource schema cache"""
+    return SchemaCache(
+        minds_db_manager,
+        db_manager=db_manager if settings.schema_cache_use_persisted else None,
+        ttl=settings.schema_cache_ttl,
+        maxsize=settings.schema_cache_size,
+    )
+
+
+def create_sql_cache() -> SQLGenerationCache:
+    """Create the cache of generated SQL"""
+    return SQLGenerationCache(
+        maxsize=settings.sql_cache_size,
+        ttl=settings.sql_cache_ttl,
+    )
+
+
+def create_schema_retriever() -> SchemaRetriever:
+    """Create the relevant-table retriever used before SQL generation"""
+    return SchemaRetriever(top_k=settings.sql_prompt_max_tables)
+
+
+def create_intent_classifier() -> FastIntentClassifier:
+    """Create the local intent classifier consulted before the classifier LLM"""
+    return FastIntentClassifier(threshold=settings.intent_fast_path_threshold)
+
+
+def create_sql_validator() -> SQLValidator:
+    """Create the local validator for generated SQL"""
+    return SQLValidator(mode=settings.sql_validation_mode)
+
+
+def create_job_manager() -> JobManager:
+    """Create the background job queue"""
+    return JobManager(
+        store_path=settings.jobs_store_path,
+        workers=settings.jobs_workers,
+        max_per_user=settings.jobs_max_per_user,
+        retention=settings.jobs_retention,
+    )
+
+
+def create_db_chat_service(app: FastAPI) -> DBChatService:
+    """Create a chat service wired to the app's shared managers"""
+    return DBChatService(
+        app.state.llm_registry,
+        app.state.minds_db_manager,
+        executors=app.state.executors,
+        sql_cache=app.state.sql_cache,
+        schema_retriever=app.state.schema_retriever,
+        summary_token_budget=settings.summary_token_budget,
+        stream_chunk_rows=settings.stream_chunk_rows,
+        speculative_sql=settings.chat_speculative_sql,
+        metrics=app.state.chat_metrics,
+        intent_classifier=app.state.intent_classifier,
+        sql_validator=app.state.sql_validator,
+    )
 
 
 async def init_managers(app: FastAPI):
     """Initialize all managers"""
+    app.state.executors = create_executor_manager()
     app.state.db_manager = create_db_manager()
-    app.state.minds_db_manager = create_minds_db_manager()
+    app.state.minds_db_pool = create_minds_db_pool()
+    app.state.query_cache = create_query_cache()
+    app.state.minds_db_manager = create_minds_db_manager(
+        app.state.minds_db_pool, app.state.query_cache)
+    app.state.auth_manager = create_auth_manager(
+        app.state.db_manager, app.state.executors)
+    app.state.llm_scheduler = create_llm_scheduler()
+    app.state.llm_registry = create_llm_registry(app.state.llm_scheduler)
+    app.state.schema_cache = create_schema_cache(
+        app.state.minds_db_manager, app.state.db_manager)
+    app.state.sql_cache = create_sql_cache()
+    app.state.schema_retriever = create_schema_retriever()
+    app.state.chat_metrics = ChatStreamMetrics()
+    app.state.intent_classifier = create_intent_classifier()
+    app.state.sql_validator = create_sql_validator()
+    app.state.schema_changes = SchemaChangeTracker()
+    app.state.jobs = create_job_manager()
+    await app.state.jobs.start()
 
 
 async def cleanup_managers(app: FastAPI):
     """Cleanup all managers"""
+    if getattr(app.state, "jobs", None) is not None:
+        await app.state.jobs.close()
+    app.state.jobs = None
+    if getattr(app.state, "executors", None) is not None:
+        app.state.executors.shutdown()
+    app.state.executors = None
     app.state.db_manager = None
     app.state.minds_db_manager = None
+    app.state.schema_cache = None
+    app.state.sql_cache = None
+    app.state.schema_retriever = None
+    app.state.chat_metrics = None
+    app.state.intent_classifier = None
+    app.state.sql_validator = None
+    app.state.schema_changes = None
+    if getattr(app.state, "query_cache", None) is not None:
+        app.state.query_cache.close()
+    app.state.query_cache = None
+    if getattr(app.state, "minds_db_pool", None) is not None:
+        app.state.minds_db_pool.close()
+    app.state.minds_db_pool = None
+    app.state.auth_manager = None
+    if getattr(app.state, "llm_registry", None) is not None:
+        app.state.llm_registry.clear()
+    app.state.llm_registry = None
+    app.state.llm_scheduler = None
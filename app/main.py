@@ -5,11 +5,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 from app.config import settings
 from app.deps import cleanup_managers, init_managers
+from app.utils.serialization import FastJSONResponse
 
 from app.middleware.auth import AuthMiddleware
 from app.routes.datasources import router as datasources_router
 from app.routes.chat import router as chat_router
 from app.routes.auth import router as auth_router
+from app.routes.jobs import router as jobs_router
 
 
 @asynccontextmanager
@@ -28,6 +30,7 @@ app = FastAPI(
     version=settings.app_version,
     debug=settings.debug,
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 origins = settings.origins
@@ -66,6 +69,13 @@ app.include_router(
     responses={404: {"description": "Not found"}},
 )
 
+app.include_router(
+    jobs_router,
+    prefix="/jobs",
+    tags=["jobs"],
+    responses={404: {"description": "Not found"}},
+)
+
 
 @app.get("/")
 async def root():
@@ -75,3 +85,31 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "version": settings.app_version}
+
+
+def _singleflight_stats(singleflight) -> dict | None:
+    return singleflight.stats() if singleflight is not None else None
+
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "auth": app.state.auth_manager.stats(),
+        "executors": app.state.executors.stats(),
+        "llm": app.state.llm_registry.stats(),
+        "llm_scheduler": app.state.llm_scheduler.stats(),
+        "mindsdb_pool": app.state.minds_db_pool.stats(),
+        "schema_cache": app.state.schema_cache.stats(),
+        "query_cache": app.state.query_cache.stats(),
+        "sql_cache": app.state.sql_cache.stats(),
+        "schema_retriever": app.state.schema_retriever.stats(),
+        "chat_stream": app.state.chat_metrics.stats(),
+        "intent_classifier": app.state.intent_classifier.stats(),
+        "sql_validator": app.state.sql_validator.stats(),
+        "schema_changes": app.state.schema_changes.stats(),
+        "jobs": app.state.jobs.stats(),
+        "singleflight": {
+            "mindsdb": _singleflight_stats(app.state.minds_db_manager.singleflight),
+            "llm": _singleflight_stats(app.state.llm_registry.singleflight),
+        },
+    }
@@ -0,0 +1,164 @@
+import hashlib
+import threading
+import time
+from typing import Any, Optional
+
+import jwt
+from loguru import logger
+
+from app.managers.executors import ExecutorManager
+from app.utils.cache import TTLCache
+
+# Fields of `request.state.user`, the same whichever way the token was verified
+USER_FIELDS = ("id", "email", "role", "aud", "app_metadata", "user_metadata")
+
+
+class InvalidTokenError(Exception):
+    pass
+
+
+class AuthManager:
+    """
+    Verifies Supabase access tokens.
+
+    Tokens signed with the configured Supabase JWT secret/algorithm are
+    verified locally (signature, `exp`, `aud`); anything that cannot be
+    verified locally, including a signature that doesn't match the secret
+    (e.g. after a key rotation), falls back to `supabase_client.auth.get_user`. Verified tokens are cached until
+    the cache TTL or the token's own expiry, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        supabase_client,
+        executors: ExecutorManager,
+        jwt_secret: Optional[str],
+        algorithm: str,
+        audience: Optional[str],
+        local_verification: bool = True,
+        cache_size: int = 1024,
+        cache_ttl: float = 300,
+    ):
+        self.supabase_client = supabase_client
+        self.executors = executors
+        self.jwt_secret = jwt_secret
+        self.algorithm = algorithm
+        self.audience = audience
+        self.local_verification = local_verification and bool(self.jwt_secret)
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._lock = threading.Lock()
+        self.local_verifications = 0
+        self.remote_verifications = 0
+        self.rejections = 0
+
+        if not self.local_verification:
+            logger.warning(
+                "Local JWT verification disabled, falling back to Supabase get_user")
+
+    @staticmethod
+    def _cache_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    async def averify(self, token: str) -> tuple[dict[str, Any], str]:
+        """
+        Return `(user, user_id)` for a valid token or raise InvalidTokenError.
+        `user` is a dict of USER_FIELDS, taken from the JWT claims or from
+        the Supabase user. Only the Supabase fallback leaves the event loop.
+        """
+        result = self._verify_without_network(token)
+        if result is None:
+            result = await self.executors.supabase(self._verify_remotely, token)
+            self._store(token, result)
+        return result
+
+    def _verify_without_network(self, token: str) -> Optional[tuple[dict[str, Any], str]]:
+        cached = self.cache.get(self._cache_key(token))
+        if cached is not None:
+            return cached
+
+        claims = self._verify_locally(token)
+        if claims is None:
+            return None
+
+        user = {field: claims.get(field) for field in USER_FIELDS} | {"id": claims["sub"]}
+        result = (user, claims["sub"])
+        self._count("local_verifications")
+        self._store(token, result)
+        return result
+
+    def _store(self, token: str, result: tuple[dict[str, Any], str]):
+        self.cache.set(self._cache_key(token), result,
+                       ttl=self._remaining_lifetime(token))
+
+    def _verify_locally(self, token: str) -> Optional[dict[str, Any]]:
+        """Decode the token locally, or return None when that is not possible."""
+        if not self.local_verification:
+            return None
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.InvalidTokenError:
+            self._count("rejections")
+            raise InvalidTokenError("Invalid authentication token")
+
+        # Tokens signed with a different (e.g. asymmetric) key can't be
+        # verified with the shared secret, let Supabase decide.
+        if header.get("alg") != self.algorithm:
+            return None
+
+        try:
+            claims = jwt.decode(
+                token,
+                self.jwt_secret,
+                algorithms=[self.algorithm],
+                audience=self.audience,
+                options={"require": ["exp", "sub"],
+                         "verify_aud": bool(self.audience)},
+            )
+        except jwt.InvalidSignatureError:
+            # Possibly signed with a rotated or different secret, let Supabase decide.
+            return None
+        except jwt.InvalidTokenError as e:
+            self._count("rejections")
+            raise InvalidTokenError(f"Invalid authentication token: {e}")
+
+        return claims
+
+    def _verify_remotely(self, token: str) -> tuple[dict[str, Any], str]:
+        try:
+            user = self.supabase_client.auth.get_user(token)
+        except Exception:
+            self._count("rejections")
+            raise InvalidTokenError("Invalid authentication token")
+
+        if not user:
+            self._count("rejections")
+            raise InvalidTokenError("Unauthorized")
+
+        self._count("remote_verifications")
+        return {field: getattr(user.user, field, None) for field in USER_FIELDS}, user.user.id
+
+    @staticmethod
+    def _remaining_lifetime(token: str) -> Optional[float]:
+        try:
+            claims = jwt.decode(token, options={"verify_signature": False})
+        except jwt.InvalidTokenError:
+            return None
+
+        exp = claims.get("exp")
+        if exp is None:
+            return None
+        return float(exp) - time.time()
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "local_verification": self.local_verification,
+            "local_verifications": self.local_verifications,
+            "remote_verifications": self.remote_verifications,
+            "rejections": self.rejections,
+            "cache": self.cache.stats(),
+        }
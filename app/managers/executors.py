@@ -0,0 +1,104 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+MINDSDB = "mindsdb"
+SUPABASE = "supabase"
+LLM = "llm"
+
+
+class _Pool:
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.max_queued = 0
+
+    def _run(self, fn: Callable[[], T]) -> T:
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    def _dequeue_cancelled(self, future: Future):
+        # Cancelled before `_run` started (caller cancelled, or shutdown with
+        # cancel_futures), so `_run` never took it off the queue.
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    async def submit(self, fn: Callable[[], T]) -> T:
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        try:
+            future = self.executor.submit(self._run, fn)
+        except RuntimeError:
+            with self._lock:
+                self.queued -= 1
+            raise
+        future.add_done_callback(self._dequeue_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+        }
+
+
+class ExecutorManager:
+    """
+    Dedicated thread pools for the blocking clients used by the routes.
+
+    MindsDB, Supabase and LLM calls are all synchronous; running them on
+    separate, sized pools keeps the event loop free and stops one slow
+    class of work (e.g. schema introspection) from starving the others.
+    """
+
+    def __init__(self, mindsdb_workers: int, supabase_workers: int, llm_workers: int):
+        self.pools = {
+            MINDSDB: _Pool(MINDSDB, mindsdb_workers),
+            SUPABASE: _Pool(SUPABASE, supabase_workers),
+            LLM: _Pool(LLM, llm_workers),
+        }
+        sizes = {name: pool.max_workers for name, pool in self.pools.items()}
+        logger.info(f"Executor pools initialized: {sizes}")
+
+    async def run(self, pool: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await self.pools[pool].submit(functools.partial(fn, *args, **kwargs))
+
+    async def mindsdb(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await self.run(MINDSDB, fn, *args, **kwargs)
+
+    async def supabase(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await self.run(SUPABASE, fn, *args, **kwargs)
+
+    async def llm(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await self.run(LLM, fn, *args, **kwargs)
+
+    def shutdown(self):
+        for pool in self.pools.values():
+            pool.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {name: pool.stats() for name, pool in self.pools.items()}
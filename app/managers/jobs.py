@@ -0,0 +1,273 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from loguru import logger
+
+from app.utils.serialization import dumps
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+# Seconds between deletions of jobs older than `retention` from the store
+_PRUNE_INTERVAL = 300
+
+_COLUMNS = ("id", "kind", "key", "user_id", "status", "progress",
+            "message", "result", "error", "created_at", "updated_at")
+
+
+class JobLimitError(Exception):
+    """The user already has the maximum number of jobs queued or running."""
+
+
+class JobContext:
+    """Handed to a job function to report progress."""
+
+    def __init__(self, manager: "JobManager", job: dict[str, Any]):
+        self._manager = manager
+        self._job = job
+
+    def report(self, progress: float, message: Optional[str] = None):
+        self._manager._update(
+            self._job, progress=round(min(max(progress, 0.0), 1.0), 3), message=message)
+
+
+JobFn = Callable[[Optional[JobContext]], Awaitable[Any]]
+
+
+def report(context: Optional[JobContext], progress: float, message: Optional[str] = None):
+    """Report progress when running as a job; a no-op for inline requests."""
+    if context is not None:
+        context.report(progress, message)
+
+
+class JobManager:
+    """
+    In-process queue for long-running generation work.
+
+    Jobs run on `workers` asyncio tasks; their state is kept in memory and
+    written through to a local SQLite file so `GET /jobs/{id}` survives a
+    restart (jobs interrupted by one are marked failed). SQLite is only used
+    from one writer thread, so writes stay ordered and off the event loop. A job with the same
+    `key` (kind + datasource) as one still queued or running is not started
+    again; the existing job is returned instead. Each user may have at most
+    `max_per_user` jobs queued or running. Finished jobs are deleted from
+    the store once they are older than `retention` seconds.
+    """
+
+    def __init__(self, store_path: str, workers: int = 4, max_per_user: int = 3, retention: float = 86400):
+        self.store_path = store_path
+        self.workers = max(workers, 1)
+        self.max_per_user = max_per_user
+        self.retention = retention
+        self._jobs: dict[str, dict[str, Any]] = {}
+        self._functions: dict[str, JobFn] = {}
+        self._active_keys: dict[str, str] = {}
+        self._watchers: dict[str, list[asyncio.Event]] = {}
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._lock = threading.Lock()
+        self._store = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jobs-store")
+        self._last_pruned = time.monotonic()
+
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.pruned = 0
+
+        self._db = sqlite3.connect(store_path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, kind TEXT, key TEXT, user_id TEXT, status TEXT,
+                progress REAL, message TEXT, result TEXT, error TEXT,
+                created_at REAL, updated_at REAL
+            )
+        """)
+        with self._db:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE status IN (?, ?)",
+                (FAILED, "Interrupted by a server restart", time.time(), *ACTIVE_STATES))
+        self._prune()
+
+    async def start(self):
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.workers)
+        ]
+        logger.info(f"Job workers started: {self.workers}")
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._store.submit(self._db.close)
+        self._store.shutdown(wait=True)
+
+    def submit(self, kind: str, key: str, user_id: str, fn: JobFn) -> tuple[dict[str, Any], bool]:
+        """Queue `fn` as a job; returns `(job, deduplicated)`."""
+        with self._lock:
+            existing = self._active_keys.get(key)
+            if existing is not None:
+                self.deduplicated += 1
+                return self._public(self._jobs[existing]), True
+
+            active = sum(
+                1 for job in self._jobs.values()
+                if job["user_id"] == user_id and job["status"] in ACTIVE_STATES
+            )
+            if active >= self.max_per_user:
+                self.rejected += 1
+                raise JobLimitError(
+                    f"Too many jobs in progress ({active}/{self.max_per_user})")
+
+            now = time.time()
+            job = {
+                "id": uuid.uuid4().hex, "kind": kind, "key": key, "user_id": user_id,
+                "status": QUEUED, "progress": 0.0, "message": "Queued", "result": None,
+                "error": None, "created_at": now, "updated_at": now,
+            }
+            self._jobs[job["id"]] = job
+            self._functions[job["id"]] = fn
+            self._active_keys[key] = job["id"]
+            self.submitted += 1
+            self._persist(job)
+
+        self._queue.put_nowait(job["id"])
+        return self._public(job), False
+
+    async def get(self, job_id: str, user_id: str) -> Optional[dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            # Runs after any queued write, so a job that just finished is found
+            job = await asyncio.get_running_loop().run_in_executor(self._store, self._load, job_id)
+        if job is None or job["user_id"] != user_id:
+            return None
+        return self._public(job)
+
+    async def watch(self, job_id: str, user_id: str) -> AsyncIterator[dict[str, Any]]:
+        """Yield the job on every change until it finishes."""
+        # Registered before the first read so no change between the two is missed
+        event = asyncio.Event()
+        self._watchers.setdefault(job_id, []).append(event)
+        try:
+            while True:
+                event.clear()
+                job = await self.get(job_id, user_id)
+                if job is None:
+                    return
+                yield job
+                if job["status"] not in ACTIVE_STATES:
+                    return
+                await event.wait()
+        finally:
+            watchers = self._watchers.get(job_id)
+            if watchers is not None:
+                if event in watchers:
+                    watchers.remove(event)
+                if not watchers:
+                    self._watchers.pop(job_id, None)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs[job_id]
+            fn = self._functions.pop(job_id)
+            self._update(job, status=RUNNING, message="Running")
+            try:
+                result = await fn(JobContext(self, job))
+            except asyncio.CancelledError:
+                self._finish(job, FAILED, error="Cancelled by shutdown")
+                raise
+            except Exception as e:
+                detail = getattr(e, "detail", None) or str(e)
+                logger.error(f"Job {job_id} ({job['kind']}) failed: {detail}")
+                self._finish(job, FAILED, error=str(detail))
+            else:
+                self._finish(job, SUCCEEDED, result=result)
+
+    def _finish(self, job: dict[str, Any], status: str, result: Any = None, error: Optional[str] = None):
+        with self._lock:
+            if self._active_keys.get(job["key"]) == job["id"]:
+                del self._active_keys[job["key"]]
+            if status == SUCCEEDED:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+        self._update(job, status=status, progress=1.0 if status == SUCCEEDED else job["progress"],
+                     message="Done" if status == SUCCEEDED else "Failed", result=result, error=error)
+        # Finished jobs are served from the store from now on
+        self._jobs.pop(job["id"], None)
+        if time.monotonic() - self._last_pruned >= _PRUNE_INTERVAL:
+            self._last_pruned = time.monotonic()
+            self._store.submit(self._prune)
+
+    def _update(self, job: dict[str, Any], **changes: Any):
+        changes = {k: v for k, v in changes.items() if v is not None}
+        job.update(changes, updated_at=time.time())
+        self._persist(job)
+        for event in self._watchers.get(job["id"], []):
+            event.set()
+
+    def _persist(self, job: dict[str, Any]):
+        # Snapshot now; the write itself runs on the store thread
+        row = [job[c] for c in _COLUMNS]
+        self._store.submit(self._write, row)
+
+    def _write(self, row: list[Any]):
+        index = _COLUMNS.index("result")
+        row[index] = dumps(row[index]).decode() if row[index] is not None else None
+        try:
+            with self._db:
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO jobs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                    row)
+        except Exception as e:
+            logger.error(f"Failed to persist job {row[0]}: {e}")
+
+    def _prune(self):
+        try:
+            with self._db:
+                deleted = self._db.execute(
+                    "DELETE FROM jobs WHERE updated_at < ? AND status NOT IN (?, ?)",
+                    (time.time() - self.retention, *ACTIVE_STATES)).rowcount
+        except Exception as e:
+            logger.error(f"Failed to prune jobs: {e}")
+            return
+        self.pruned += deleted
+
+    def _load(self, job_id: str) -> Optional[dict[str, Any]]:
+        row = self._db.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(_COLUMNS, row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    @staticmethod
+    def _public(job: dict[str, Any]) -> dict[str, Any]:
+        return {k: v for k, v in job.items() if k not in ("key", "user_id")}
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queued": sum(1 for j in self._jobs.values() if j["status"] == QUEUED),
+            "running": sum(1 for j in self._jobs.values() if j["status"] == RUNNING),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "pruned": self.pruned,
+        }
@@ -0,0 +1,109 @@
+import threading
+from typing import Any, Callable, Optional
+
+from langchain_core.runnables import Runnable
+from langchain_google_genai import ChatGoogleGenerativeAI
+from loguru import logger
+from pydantic import SecretStr
+
+from app.managers.llm_scheduler import INTERACTIVE, LLMScheduler, ScheduledLLM
+from app.utils.singleflight import SingleFlight
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+
+class LLMRegistry:
+    """
+    Long-lived LLM clients and prebuilt chains.
+
+    Clients are keyed by (model, temperature) and chains by
+    (name, model, temperature, priority), so services can fetch them per request
+    without rebuilding clients or re-opening connections to the model API.
+    With a `scheduler`, clients are handed out wrapped in a ScheduledLLM at
+    the caller's priority, and the scheduler owns retries. A `singleflight`
+    additionally shares one call between identical concurrent prompts.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        scheduler: Optional[LLMScheduler] = None,
+        singleflight: Optional[SingleFlight] = None,
+    ):
+        self.api_key = api_key
+        self.scheduler = scheduler
+        self.singleflight = singleflight
+        self._clients: dict[tuple[str, float], ChatGoogleGenerativeAI] = {}
+        self._llms: dict[tuple[str, float, int], Runnable] = {}
+        self._chains: dict[tuple[str, str, float, int], Runnable] = {}
+        self._lock = threading.Lock()
+
+    def _client(self, model: str, temperature: float) -> ChatGoogleGenerativeAI:
+        key = (model, temperature)
+        client = self._clients.get(key)
+        if client is None:
+            client = ChatGoogleGenerativeAI(
+                api_key=SecretStr(self.api_key),
+                model=model,
+                temperature=temperature,
+                convert_system_message_to_human=True,
+                # Retrying inside the client would bypass the scheduler's budget
+                **({"max_retries": 0} if self.scheduler is not None else {}),
+            )
+            self._clients[key] = client
+            logger.info(
+                f"LLM client created: model={model}, temperature={temperature}")
+        return client
+
+    def get_llm(self, model: str = DEFAULT_MODEL, temperature: float = 0.5, priority: int = INTERACTIVE) -> Runnable:
+        key = (model, temperature, priority)
+        llm = self._llms.get(key)
+        if llm is not None:
+            return llm
+
+        with self._lock:
+            llm = self._llms.get(key)
+            if llm is None:
+                llm = self._client(model, temperature)
+                if self.scheduler is not None:
+                    llm = ScheduledLLM(llm, self.scheduler, priority, self.singleflight)
+                self._llms[key] = llm
+        return llm
+
+    def get_chain(
+        self,
+        name: str,
+        build: Callable[[Runnable], Runnable],
+        model: str = DEFAULT_MODEL,
+        temperature: float = 0.5,
+        priority: int = INTERACTIVE,
+    ) -> Runnable:
+        """
+        Return the chain registered under `name`, building it on first use.
+        `build` is kept for the life of the registry, so it should only use
+        module-level prompts and parsers, not state of the calling service.
+        """
+        key = (name, model, temperature, priority)
+        chain = self._chains.get(key)
+        if chain is not None:
+            return chain
+
+        llm = self.get_llm(model, temperature, priority)
+        with self._lock:
+            chain = self._chains.get(key)
+            if chain is None:
+                chain = build(llm)
+                self._chains[key] = chain
+        return chain
+
+    def clear(self):
+        with self._lock:
+            self._chains.clear()
+            self._llms.clear()
+            self._clients.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "clients": [f"{model}@{temperature}" for model, temperature in self._clients],
+            "chains": [name for name, _, _, _ in self._chains],
+        }
@@ -0,0 +1,395 @@
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from loguru import logger
+
+from app.utils.metrics import LatencyRecorder
+from app.utils.singleflight import SingleFlight
+
+T = TypeVar("T")
+
+# Priorities: lower runs first
+INTERACTIVE = 0
+BACKGROUND = 1
+_PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_RETRYABLE_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "InternalServerError",
+    "ServiceUnavailable", "BadGateway", "GatewayTimeout", "DeadlineExceeded",
+}
+
+
+def _prompt_text(value: Any) -> str:
+    return value.to_string() if hasattr(value, "to_string") else str(value)
+
+
+def estimate_tokens(value: Any) -> int:
+    return max(len(_prompt_text(value)) // 4, 1)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Rate-limit (429) and server (5xx) errors, including when wrapped by the client."""
+    seen: Optional[BaseException] = error
+    while seen is not None:
+        if type(seen).__name__ in _RETRYABLE_ERRORS:
+            return True
+        for attr in ("code", "status_code"):
+            try:
+                if int(getattr(seen, attr, None)) in _RETRYABLE_STATUS:
+                    return True
+            except (TypeError, ValueError):
+                pass
+        seen = seen.__cause__ or seen.__context__
+    text = str(error)
+    return "429" in text or "RESOURCE_EXHAUSTED" in text
+
+
+def _usage(result: Any) -> Optional[int]:
+    usage = getattr(result, "usage_metadata", None)
+    return usage.get("total_tokens") if isinstance(usage, dict) else None
+
+
+def _add_usage(used: Optional[int], chunk: Any) -> Optional[int]:
+    """Running total of a stream's usage; chunks report increments that add up to the whole call."""
+    usage = _usage(chunk)
+    return used if usage is None else (used or 0) + usage
+
+
+class _TokenBucket:
+    """Refills `per_minute` units per minute up to `per_minute`; 0 disables the limit."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = max(per_minute, 0)
+        self.rate = self.capacity / 60
+        self.level = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        if not self.capacity:
+            return 0.0
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        # A request larger than the whole budget waits for a full bucket rather than forever
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        if self.capacity:
+            self.level -= amount
+
+
+class LLMScheduler:
+    """
+    Admission control for every LLM call in the process.
+
+    Calls wait in one priority queue (interactive before background, FIFO
+    within a priority) until a concurrency slot is free and both the
+    requests-per-minute and tokens-per-minute buckets can cover them.
+    Prompt tokens are estimated up front and corrected with the reported
+    usage afterwards (for streams, the usage summed over their chunks).
+    429 and 5xx errors are retried with full-jitter exponential backoff;
+    a stream is only retried before its first chunk.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_concurrency: int = 0,
+        max_retries: int = 3,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 30.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._requests = _TokenBucket(requests_per_minute)
+        self._tokens = _TokenBucket(tokens_per_minute)
+        self._waiting: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._active = 0
+        self._condition = threading.Condition()
+        # Async waiters by ticket, woken through their loop whenever the queue changes
+        self._async_waiters: dict[tuple[int, int], tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+
+        self.queue_wait = {priority: LatencyRecorder() for priority in _PRIORITY_NAMES}
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failed = 0
+        self.tokens = 0
+
+    # Admission
+
+    def _notify(self):
+        """Wake every waiter to re-check its place; call with `_condition` held."""
+        self._condition.notify_all()
+        for loop, event in self._async_waiters.values():
+            loop.call_soon_threadsafe(event.set)
+
+    def _try_acquire(self, ticket: tuple[int, int], tokens: int) -> Optional[float]:
+        """
+        Admit `ticket` if it is first in line and the budget allows (returns 0),
+        else seconds until the budget refills, or None to wait for a notification.
+        """
+        if self._waiting[0] != ticket:
+            return None
+        if self.max_concurrency and self._active >= self.max_concurrency:
+            return None
+        now = time.monotonic()
+        wait = max(self._requests.wait_time(1, now), self._tokens.wait_time(tokens, now))
+        if wait > 0:
+            return wait
+
+        heapq.heappop(self._waiting)
+        self._requests.take(1)
+        self._tokens.take(tokens)
+        self._active += 1
+        self.calls += 1
+        self.tokens += tokens
+        self._notify()
+        return 0.0
+
+    def _enqueue(self, priority: int) -> tuple[int, int]:
+        ticket = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _abandon(self, ticket: tuple[int, int]):
+        with self._condition:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+            self._notify()
+
+    def acquire(self, tokens: int, priority: int = INTERACTIVE):
+        started = time.monotonic()
+        ticket = self._enqueue(priority)
+        try:
+            with self._condition:
+                while (wait := self._try_acquire(ticket, tokens)) != 0:
+                    self._condition.wait(wait)
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        self.queue_wait[priority].record(time.monotonic() - started)
+
+    async def aacquire(self, tokens: int, priority: int = INTERACTIVE):
+        started = time.monotonic()
+        ticket = self._enqueue(priority)
+        woken = asyncio.Event()
+        with self._condition:
+            self._async_waiters[ticket] = (asyncio.get_running_loop(), woken)
+        try:
+            while True:
+                with self._condition:
+                    woken.clear()
+                    wait = self._try_acquire(ticket, tokens)
+                if wait == 0:
+                    break
+                try:
+                    await asyncio.wait_for(woken.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        finally:
+            with self._condition:
+                del self._async_waiters[ticket]
+        self.queue_wait[priority].record(time.monotonic() - started)
+
+    def release(self, estimated: int, used: Optional[int] = None):
+        with self._condition:
+            self._active -= 1
+            if used is not None:
+                self._tokens.take(used - estimated)
+                self.tokens += used - estimated
+            self._notify()
+
+    # Retries
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Backoff before the next attempt, or None when `error` should propagate."""
+        if attempt >= self.max_retries or not is_retryable(error):
+            with self._condition:
+                self.failed += 1
+            return None
+        rate_limited = "429" in str(error) or type(error).__name__ in ("ResourceExhausted", "TooManyRequests")
+        with self._condition:
+            self.retries += 1
+            if rate_limited:
+                self.rate_limited += 1
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+        logger.warning(f"LLM call failed ({error}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+        return delay
+
+    def run(self, fn: Callable[[], T], tokens: int, priority: int = INTERACTIVE) -> T:
+        for attempt in itertools.count():
+            self.acquire(tokens, priority)
+            used = None
+            try:
+                result = fn()
+                used = _usage(result)
+                return result
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                self.release(tokens, used)
+            time.sleep(delay)
+
+    async def arun(self, fn: Callable[[], Awaitable[T]], tokens: int, priority: int = INTERACTIVE) -> T:
+        for attempt in itertools.count():
+            await self.aacquire(tokens, priority)
+            used = None
+            try:
+                result = await fn()
+                used = _usage(result)
+                return result
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                self.release(tokens, used)
+            await asyncio.sleep(delay)
+
+    def stream(self, fn: Callable[[], Iterator[T]], tokens: int, priority: int = INTERACTIVE) -> Iterator[T]:
+        for attempt in itertools.count():
+            self.acquire(tokens, priority)
+            started = False
+            used = None
+            try:
+                for chunk in fn():
+                    started = True
+                    used = _add_usage(used, chunk)
+                    yield chunk
+                return
+            except Exception as e:
+                if started:
+                    with self._condition:
+                        self.failed += 1
+                    raise
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                self.release(tokens, used)
+            time.sleep(delay)
+
+    async def astream(
+        self, fn: Callable[[], AsyncIterator[T]], tokens: int, priority: int = INTERACTIVE
+    ) -> AsyncIterator[T]:
+        for attempt in itertools.count():
+            await self.aacquire(tokens, priority)
+            started = False
+            used = None
+            try:
+                async for chunk in fn():
+                    started = True
+                    used = _add_usage(used, chunk)
+                    yield chunk
+                return
+            except Exception as e:
+                if started:
+                    with self._condition:
+                        self.failed += 1
+                    raise
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                self.release(tokens, used)
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests_per_minute": self._requests.capacity or None,
+            "tokens_per_minute": self._tokens.capacity or None,
+            "max_concurrency": self.max_concurrency or None,
+            "active": self._active,
+            "waiting": len(self._waiting),
+            "calls": self.calls,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "failed": self.failed,
+            "tokens": self.tokens,
+            "queue_wait": {name: self.queue_wait[p].stats() for p, name in _PRIORITY_NAMES.items()},
+        }
+
+
+class ScheduledLLM(Runnable):
+    """
+    Chat model wrapper that routes invoke/stream (sync and async) through an LLMScheduler.
+
+    With a `singleflight`, concurrent invocations with the same prompt share
+    one call. Streams are not coalesced; each consumer needs its own chunks.
+    """
+
+    def __init__(
+        self,
+        llm: Runnable,
+        scheduler: LLMScheduler,
+        priority: int = INTERACTIVE,
+        singleflight: Optional[SingleFlight] = None,
+    ):
+        self.llm = llm
+        self.scheduler = scheduler
+        self.priority = priority
+        self.singleflight = singleflight
+
+    def _flight_key(self, input: Any, kwargs: dict[str, Any]) -> Optional[tuple]:
+        if self.singleflight is None or kwargs:
+            return None
+        # Keyed on the client, so prompts to other models or temperatures aren't shared
+        return (id(self.llm), _prompt_text(input))
+
+    @property
+    def InputType(self) -> Any:
+        return self.llm.InputType
+
+    @property
+    def OutputType(self) -> Any:
+        return self.llm.OutputType
+
+    def get_name(self, suffix: Optional[str] = None, *, name: Optional[str] = None) -> str:
+        return self.llm.get_name(suffix, name=name)
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        def call():
+            return self.scheduler.run(
+                lambda: self.llm.invoke(input, config, **kwargs), estimate_tokens(input), self.priority)
+
+        key = self._flight_key(input, kwargs)
+        return call() if key is None else self.singleflight.do(key, call)
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        def call():
+            return self.scheduler.arun(
+                lambda: self.llm.ainvoke(input, config, **kwargs), estimate_tokens(input), self.priority)
+
+        key = self._flight_key(input, kwargs)
+        return await (call() if key is None else self.singleflight.ado(key, call))
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        yield from self.scheduler.stream(
+            lambda: self.llm.stream(input, config, **kwargs), estimate_tokens(input), self.priority)
+
+    async def astream(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        async for chunk in self.scheduler.astream(
+            lambda: self.llm.astream(input, config, **kwargs), estimate_tokens(input), self.priority
+        ):
+            yield chunk
@@ -1,49 +1,66 @@
-from typing import Any, Dict, List
-from app.config import settings
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import time
+from typing import Any, Dict, Iterable, List, Tuple
 from fastapi import HTTPException
-import mindsdb_sdk
 from loguru import logger
+import pandas as pd
+
+from app.managers.mindsdb_pool import CONNECTION_ERRORS, MindsDBPool
+from app.managers.query_cache import CACHE_DEFAULT, QueryResultCache, copy_result, is_read_query, normalize_sql
+from app.utils.singleflight import SingleFlight
+
+# Seconds before bulk introspection is tried again on a datasource where it failed
+BULK_UNSUPPORTED_TTL = 3600
+
+
+class _BulkIncomplete(Exception):
+    """The bulk query ran but didn't cover the tables; may be transient, so not remembered."""
 
 
 class MindsDBManager:
-    def __init__(self):
-        try:
-            self.mindsdb = mindsdb_sdk.connect(settings.MINDSDB_URL)
-            # Validate connection by attempting to list databases
-            # This ensures the connection actually works before logging success
-            # _ = self.mindsdb.list_databases()
-            logger.info(
-                f"MindsDB client initialized successfully: {self.mindsdb}")
-        except Exception as e:
-            logger.error(f"Failed to initialize MindsDB client: {str(e)}")
-            raise Exception(f"Failed to initialize MindsDB client: {str(e)}")
+    def __init__(
+        self,
+        pool: MindsDBPool,
+        introspection_workers: int = 4,
+        query_cache: QueryResultCache | None = None,
+        singleflight: SingleFlight | None = None,
+    ):
+        self.pool = pool
+        self.query_cache = query_cache
+        # Coalesces identical concurrent introspection and read queries
+        self.singleflight = singleflight
+        self.introspection_workers = max(introspection_workers, 1)
+        # Datasources whose engine can't answer an unfiltered INFORMATION_SCHEMA query
+        # (a syntax or feature error), until the stored monotonic deadline
+        self._bulk_unsupported: dict[str, float] = {}
 
     def create_datasource(self, name: str, engine: str, connection_data: Dict[str, Any]):
-        if not self.mindsdb:
+        if not self.pool:
             raise Exception("MindsDB client not initialized")
         try:
-            self.mindsdb.create_database(
-                name=name, engine=engine, connection_args=connection_data)
+            self.pool.run(lambda mindsdb: mindsdb.create_database(
+                name=name, engine=engine, connection_args=connection_data))
             logger.info(f"Datasource {name} created successfully")
         except Exception as e:
             logger.error(f"Failed to create datasource {name}: {str(e)}")
             raise Exception(f"Failed to create datasource {name}: {str(e)}")
 
     def delete_datasource(self, name: str):
-        if not self.mindsdb:
+        if not self.pool:
             raise Exception("MindsDB client not initialized")
         try:
-            self.mindsdb.drop_database(name)
+            self.pool.run(lambda mindsdb: mindsdb.drop_database(name))
             logger.info(f"Datasource {name} deleted successfully")
         except Exception as e:
             logger.error(f"Failed to delete datasource {name}: {str(e)}")
             raise Exception(f"Failed to delete datasource {name}: {str(e)}")
 
     def get_datasources(self):
-        if not self.mindsdb:
+        if not self.pool:
             raise Exception("MindsDB client not initialized")
         try:
-            databases = self.mindsdb.list_databases()
+            databases = self.pool.run(lambda mindsdb: mindsdb.list_databases(), idempotent=True)
             result = []
             for db in databases:
                 # Skip system databases
@@ -67,103 +84,252 @@ class MindsDBManager:
     def get_datasources_tables_and_schemas_by_names(self, names: List[str]):
         """
         Get all data sources, their tables, and schemas by names.
+
+        Datasources are introspected in parallel, each on its own pooled connection.
         """
-        if not self.mindsdb:
+        if not self.pool:
             raise Exception("MindsDB connection not available")
 
         try:
-            db_info = {}
-
-            for name in names:
-                db_name = name
-                db_info[db_name] = {}
-
-                try:
-                    # Get tables in this database
-                    db = self.mindsdb.get_database(db_name)
-                    query = f'SHOW TABLES FROM "{db_name}"'
-                    tables = db.query(query).fetch()
-
-                    # Extract just the table names
-                    table_names = []
-                    if hasattr(tables, 'iloc'):  # If it's a DataFrame
-                        # Assuming first column contains table names
-                        table_names = tables.iloc[:, 0].tolist()
-                    elif isinstance(tables, list):
-                        # If it's a list of dicts, extract table names
-                        table_names = [list(row.values())[0] for row in tables]
-
-                    for table_name in table_names:
-                        try:
-                            columns_query = f"""
-                            SELECT COLUMN_NAME, IS_NULLABLE, DATA_TYPE FROM {db_name}.INFORMATION_SCHEMA.COLUMNS
-                            WHERE table_name = '{table_name}'
-                            """
-
-                            columns = db.query(columns_query).fetch()
-
-                            # Process columns with schema information in format {column_name: data_type}
-                            columns_info = {}
-                            if hasattr(columns, 'iloc'):  # If it's a DataFrame
-                                # Extract column name and data type for each row
-                                for idx, row in columns.iterrows():
-                                    column_name = row.iloc[0]
-                                    # Skip is_nullable (index 1)
-                                    data_type = row.iloc[2]
-                                    columns_info[column_name] = data_type
-                            elif isinstance(columns, list):
-                                # If it's a list of dicts, extract column name and data type
-                                for row in columns:
-                                    if isinstance(row, dict):
-                                        # If row is already a dict with proper keys
-                                        column_name = row.get(
-                                            'COLUMN_NAME', '')
-                                        data_type = row.get('DATA_TYPE', '')
-                                        if column_name:
-                                            columns_info[column_name] = data_type
-                                    else:
-                                        # If row is a list/tuple of values
-                                        values = list(row.values()) if hasattr(
-                                            row, 'values') else row
-                                        if len(values) >= 3:
-                                            column_name = values[0]
-                                            # Skip is_nullable (index 1)
-                                            data_type = values[2]
-                                            if column_name:
-                                                columns_info[column_name] = data_type
-                            else:
-                                columns_info = {}
-
-                        except Exception as e:
-                            logger.error(
-                                f"Error fetching columns for table {table_name}: {e}")
-                            columns_info = {}
-
-                        db_info[db_name][table_name] = columns_info
-
-                except Exception as e:
-                    logger.error(f"Error accessing database {db_name}: {e}")
-                    raise Exception(f"Error accessing database {db_name}: {e}")
-
-            return db_info
+            if len(names) <= 1:
+                return {name: self._coalesced_schema(name) for name in names}
 
+            workers = min(len(names), self.introspection_workers)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="introspection") as executor:
+                schemas = executor.map(self._coalesced_schema, names)
+                return dict(zip(names, schemas))
         except Exception as e:
             logger.error(f"Failed to list datasources: {str(e)}")
             raise Exception(f"Failed to list datasources: {str(e)}")
 
-    def execute_query(self, sql_query: str, database_name: str | None = None) -> List[Dict[str, Any]]:
-        """Execute SQL query and return results"""
+    def _coalesce(self, key: tuple, fn):
+        if self.singleflight is None:
+            return fn()
+        return self.singleflight.do(key, fn)
+
+    def _coalesced_schema(self, db_name: str) -> Dict[str, Dict[str, str]]:
+        return self._coalesce(("schema", db_name), lambda: self._get_datasource_schema(db_name))
+
+    def _get_datasource_schema(self, db_name: str) -> Dict[str, Dict[str, str]]:
         try:
-            # Execute query
+            with self.pool.connection() as mindsdb:
+                # Get tables in this database
+                db = mindsdb.get_database(db_name)
+                query = f'SHOW TABLES FROM "{db_name}"'
+                tables = db.query(query).fetch()
+
+                # Extract just the table names
+                table_names = []
+                if hasattr(tables, 'iloc'):  # If it's a DataFrame
+                    # Assuming first column contains table names
+                    table_names = tables.iloc[:, 0].tolist()
+                elif isinstance(tables, list):
+                    # If it's a list of dicts, extract table names
+                    table_names = [list(row.values())[0] for row in tables]
+
+                if table_names and self._bulk_unsupported.get(db_name, 0) <= time.monotonic():
+                    try:
+                        return self._get_columns_bulk(db, db_name, table_names)
+                    except (CONNECTION_ERRORS + (_BulkIncomplete,)) as e:
+                        logger.warning(
+                            f"Bulk column introspection failed for {db_name}, "
+                            f"using per-table queries this time: {e}")
+                    except Exception as e:
+                        logger.warning(
+                            f"Bulk column introspection not supported for {db_name}, "
+                            f"falling back to per-table queries: {e}")
+                        self._bulk_unsupported[db_name] = time.monotonic() + BULK_UNSUPPORTED_TTL
+
+                return {
+                    table_name: self._get_table_columns(db, db_name, table_name)
+                    for table_name in table_names
+                }
+
+        except Exception as e:
+            logger.error(f"Error accessing database {db_name}: {e}")
+            raise Exception(f"Error accessing database {db_name}: {e}")
+
+    @staticmethod
+    def schema_fingerprint(schema: Dict[str, Dict[str, str]]) -> str:
+        """Fingerprint of a schema: its table names and (table, column) pairs."""
+        columns = [(table, column) for table, table_columns in schema.items() for column in table_columns or {}]
+        return MindsDBManager._fingerprint(list(schema.keys()), columns)
+
+    @staticmethod
+    def _fingerprint(table_names: List[str], columns: Iterable[Tuple[Any, Any]]) -> str:
+        # A name listed in several schemas is one key of an introspected schema
+        names = sorted(set(map(str, table_names)))
+        pairs = sorted({(str(table), str(column)) for table, column in columns})
+        digest = hashlib.sha1("\n".join(
+            names + [f"{table}\t{column}" for table, column in pairs]).encode()).hexdigest()
+        return f"{len(names)}:{len(pairs)}:{digest}"
+
+    def get_schema_fingerprint(self, db_name: str) -> str:
+        """
+        Cheaply fingerprint the live schema of a datasource.
+
+        Runs `SHOW TABLES` and a single query for the distinct (table, column) pairs
+        of those tables in INFORMATION_SCHEMA.COLUMNS, and hashes the pairs so it
+        matches `schema_fingerprint` of an unchanged introspected schema (one entry
+        per pair, even when a table name exists in several schemas) and changes
+        when a column is renamed, added or dropped.
+        """
+        return self._coalesce(("fingerprint", db_name), lambda: self._get_schema_fingerprint(db_name))
+
+    def _get_schema_fingerprint(self, db_name: str) -> str:
+        with self.pool.connection() as mindsdb:
+            db = mindsdb.get_database(db_name)
+            tables = db.query(f'SHOW TABLES FROM "{db_name}"').fetch()
+            if hasattr(tables, 'iloc'):
+                table_names = tables.iloc[:, 0].tolist()
+            else:
+                table_names = [list(row.values())[0] for row in tables]
+
+            if not table_names:
+                return self._fingerprint([], [])
+
+            in_list = ", ".join(
+                "'" + str(name).replace("'", "''") + "'" for name in table_names)
+            columns = db.query(f"""
+            SELECT DISTINCT TABLE_NAME, COLUMN_NAME FROM {db_name}.INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_NAME IN ({in_list})
+            """).fetch()
+            if not hasattr(columns, 'iloc'):
+                columns = pd.DataFrame(columns)
+            pairs = columns.iloc[:, :2].itertuples(index=False, name=None) if len(columns) else []
+
+            return self._fingerprint(table_names, pairs)
+
+    @staticmethod
+    def _get_columns_bulk(db, db_name: str, table_names: List[str]) -> Dict[str, Dict[str, str]]:
+        """Fetch the columns of every table with a single INFORMATION_SCHEMA query."""
+        columns_query = f"""
+        SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE FROM {db_name}.INFORMATION_SCHEMA.COLUMNS
+        """
+        columns = db.query(columns_query).fetch()
+        if not hasattr(columns, 'iloc'):
+            columns = pd.DataFrame(columns)
+        if columns.shape[1] < 3:
+            raise Exception("INFORMATION_SCHEMA.COLUMNS returned no TABLE_NAME column")
+
+        columns = columns.iloc[:, :3]
+        columns.columns = ["table_name", "column_name", "data_type"]
+        columns = columns[columns["table_name"].isin(table_names)]
+        if columns.empty:
+            raise _BulkIncomplete("INFORMATION_SCHEMA.COLUMNS returned no rows for known tables")
+
+        grouped = {
+            table_name: dict(zip(group["column_name"], group["data_type"]))
+            for table_name, group in columns.groupby("table_name", sort=False)
+        }
+        return {table_name: grouped.get(table_name, {}) for table_name in table_names}
+
+    @staticmethod
+    def _get_table_columns(db, db_name: str, table_name: str) -> Dict[str, str]:
+        try:
+            columns_query = f"""
+            SELECT COLUMN_NAME, IS_NULLABLE, DATA_TYPE FROM {db_name}.INFORMATION_SCHEMA.COLUMNS
+            WHERE table_name = '{table_name}'
+            """
+
+            columns = db.query(columns_query).fetch()
+
+            # Process columns with schema information in format {column_name: data_type}
+            columns_info = {}
+            if hasattr(columns, 'iloc'):  # If it's a DataFrame
+                # Column name is index 0, skip is_nullable (index 1), data type is index 2
+                columns_info = dict(
+                    zip(columns.iloc[:, 0], columns.iloc[:, 2]))
+            elif isinstance(columns, list):
+                # If it's a list of dicts, extract column name and data type
+                for row in columns:
+                    if isinstance(row, dict):
+                        # If row is already a dict with proper keys
+                        column_name = row.get(
+                            'COLUMN_NAME', '')
+                        data_type = row.get('DATA_TYPE', '')
+                        if column_name:
+                            columns_info[column_name] = data_type
+                    else:
+                        # If row is a list/tuple of values
+                        values = list(row.values()) if hasattr(
+                            row, 'values') else row
+                        if len(values) >= 3:
+                            column_name = values[0]
+                            # Skip is_nullable (index 1)
+                            data_type = values[2]
+                            if column_name:
+                                columns_info[column_name] = data_type
+
+            return columns_info
+
+        except Exception as e:
+            logger.error(
+                f"Error fetching columns for table {table_name}: {e}")
+            return {}
+
+    def fetch_query(self, sql_query: str, database_name: str | None = None, cache: str = CACHE_DEFAULT) -> Any:
+        """Run a query on a pooled connection and return the raw fetched result"""
+        return self.fetch_query_with_status(sql_query, database_name, cache)[0]
+
+    def fetch_query_with_status(
+        self, sql_query: str, database_name: str | None = None, cache: str = CACHE_DEFAULT
+    ) -> tuple[Any, str | None]:
+        """Like `fetch_query`, also returning the result cache status (None when uncached)"""
+        def _fetch(mindsdb):
             if database_name:
-                query = self.mindsdb.databases.get(
-                    database_name).query(sql_query)
+                query = mindsdb.databases.get(database_name).query(sql_query)
             else:
-                query = self.mindsdb.query(sql_query)
+                query = mindsdb.query(sql_query)
+            return query.fetch()
 
-            # Convert results to list of dictionaries
-            results = query.fetch()
+        def _load():
+            if not is_read_query(sql_query):
+                return self.pool.run(_fetch)
+            return self._coalesce(
+                ("query", database_name or "", normalize_sql(sql_query)),
+                lambda: self.pool.run(_fetch, idempotent=True))
 
+        if self.query_cache is None:
+            # A coalesced result is shared with the other callers
+            return (copy_result(_load()) if self.singleflight and is_read_query(sql_query) else _load()), None
+        return self.query_cache.fetch(database_name, sql_query, _load, mode=cache)
+
+    def sample_column_values(self, database_name: str, table_name: str, column_name: str, limit: int = 1000) -> set:
+        """Up to `limit` distinct non-null values of a column, for relationship inference."""
+        frame = self.execute_query_frame(
+            f"SELECT DISTINCT `{column_name}` FROM `{table_name}` "
+            f"WHERE `{column_name}` IS NOT NULL LIMIT {int(limit)}",
+            database_name=database_name,
+        )
+        return set(frame.iloc[:, 0].tolist()) if not frame.empty else set()
+
+    def execute_query_frame(
+        self, sql_query: str, database_name: str | None = None, cache: str = CACHE_DEFAULT
+    ) -> pd.DataFrame:
+        """Execute SQL query and return results as a DataFrame"""
+        try:
+            results = self.fetch_query(sql_query, database_name, cache)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Query execution failed: {str(e)}")
+
+        if isinstance(results, pd.DataFrame):
+            return results
+        elif isinstance(results, list):
+            return pd.DataFrame(results)
+        else:
+            return pd.DataFrame([{"result": str(results)}])
+
+    def execute_query(
+        self, sql_query: str, database_name: str | None = None, cache: str = CACHE_DEFAULT
+    ) -> List[Dict[str, Any]]:
+        """Execute SQL query and return results"""
+        try:
+            # Execute query
+            results = self.fetch_query(sql_query, database_name, cache)
+
+            # Convert results to list of dictionaries
             if hasattr(results, 'to_dict'):
                 return results.to_dict('records')
             elif isinstance(results, list):
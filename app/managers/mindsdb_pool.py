@@ -0,0 +1,248 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar
+
+import mindsdb_sdk
+import requests
+from loguru import logger
+from urllib3.exceptions import ConnectTimeoutError
+
+T = TypeVar("T")
+
+CONNECTION_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    ConnectionError,
+)
+
+
+def _before_send(error: BaseException) -> bool:
+    """Whether `error` means the request never reached MindsDB (the connection couldn't be opened)."""
+    if isinstance(error, (requests.exceptions.ConnectTimeout, ConnectionRefusedError)):
+        return True
+    # requests.ConnectionError wraps urllib3's MaxRetryError, whose reason is a NewConnectionError
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, ConnectTimeoutError)
+
+
+class _PooledConnection:
+    def __init__(self, server):
+        self.server = server
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.last_checked = self.created_at
+
+
+class MindsDBPool:
+    """
+    Thread-safe pool of MindsDB SDK sessions.
+
+    Keeps between `min_size` and `max_size` sessions, health-checks idle
+    sessions before handing them out, evicts sessions idle for longer than
+    `idle_timeout` and replaces sessions that fail with connection errors.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        idle_timeout: float = 300,
+        health_check_interval: float = 30,
+        acquire_timeout: float = 30,
+    ):
+        self.url = url
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+
+        self._idle: list[_PooledConnection] = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self.created = 0
+        self.discarded = 0
+        self.evicted = 0
+        self.reconnects = 0
+        self.health_check_failures = 0
+        self.waits = 0
+        self.wait_time = 0.0
+
+        for _ in range(self.min_size):
+            self._idle.append(self._connect())
+            self._size += 1
+
+    def _connect(self) -> _PooledConnection:
+        try:
+            server = mindsdb_sdk.connect(self.url)
+        except Exception as e:
+            logger.error(f"Failed to initialize MindsDB client: {str(e)}")
+            raise Exception(f"Failed to initialize MindsDB client: {str(e)}")
+        self.created += 1
+        logger.info(f"MindsDB client initialized successfully: {server}")
+        return _PooledConnection(server)
+
+    @staticmethod
+    def _close(conn: _PooledConnection):
+        session = getattr(getattr(conn.server, "api", None), "session", None)
+        if session is not None:
+            try:
+                session.close()
+            except Exception:
+                pass
+
+    def _is_healthy(self, conn: _PooledConnection) -> bool:
+        try:
+            conn.server.query("SELECT 1").fetch()
+        except Exception as e:
+            logger.warning(f"MindsDB connection failed health check: {e}")
+            self.health_check_failures += 1
+            return False
+        conn.last_checked = time.monotonic()
+        return True
+
+    def _evict_idle(self):
+        """Drop sessions idle for too long, keeping at least `min_size`. Caller holds the lock."""
+        now = time.monotonic()
+        keep = []
+        for conn in self._idle:
+            if self._size > self.min_size and now - conn.last_used > self.idle_timeout:
+                self._size -= 1
+                self.evicted += 1
+                self._close(conn)
+            else:
+                keep.append(conn)
+        self._idle = keep
+
+    def acquire(self) -> _PooledConnection:
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise Exception("MindsDB connection pool is closed")
+
+                self._evict_idle()
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Reserve the slot, connect outside the lock
+                    self._size += 1
+                    conn = None
+                    break
+
+                waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    raise Exception(
+                        "Timed out waiting for a MindsDB connection")
+
+            if waited:
+                self.waits += 1
+                self.wait_time += time.monotonic() - started
+
+        if conn is None:
+            try:
+                return self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+
+        if time.monotonic() - conn.last_checked > self.health_check_interval and not self._is_healthy(conn):
+            self._discard(conn)
+            self.reconnects += 1
+            return self.acquire()
+
+        return conn
+
+    def release(self, conn: _PooledConnection, discard: bool = False):
+        if discard:
+            self._discard(conn)
+            return
+
+        conn.last_used = time.monotonic()
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                self._close(conn)
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def _discard(self, conn: _PooledConnection):
+        self._close(conn)
+        with self._cond:
+            self._size -= 1
+            self.discarded += 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a session; sessions that hit connection errors are not returned to the pool."""
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn.server
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            self.release(conn, discard=broken)
+
+    def run(self, fn: Callable[[Any], T], idempotent: bool = False) -> T:
+        """
+        Run `fn(server)` on a pooled session, reconnecting once on connection errors.
+
+        Only `idempotent` calls are retried after errors that may have hit the
+        server (timeouts, connections dropped mid-response); others are retried
+        only when the request couldn't be sent, so writes never run twice.
+        """
+        try:
+            with self.connection() as server:
+                return fn(server)
+        except CONNECTION_ERRORS as e:
+            if not idempotent and not _before_send(e):
+                raise
+            logger.warning(f"MindsDB connection lost, reconnecting: {e}")
+            self.reconnects += 1
+            with self.connection() as server:
+                return fn(server)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            for conn in self._idle:
+                self._close(conn)
+            self._size -= len(self._idle)
+            self._idle = []
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            idle = len(self._idle)
+            size = self._size
+        return {
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "utilization": round((size - idle) / self.max_size, 4),
+            "created": self.created,
+            "discarded": self.discarded,
+            "evicted": self.evicted,
+            "reconnects": self.reconnects,
+            "health_check_failures": self.health_check_failures,
+            "waits": self.waits,
+            "wait_time_seconds": round(self.wait_time, 4),
+        }
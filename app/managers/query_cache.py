@@ -0,0 +1,224 @@
+import copy
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from loguru import logger
+
+# Cache modes, mirroring the HTTP Cache-Control request directives
+CACHE_DEFAULT = "default"
+CACHE_NO_CACHE = "no-cache"  # skip the lookup, still store the fresh result
+CACHE_NO_STORE = "no-store"  # skip the lookup and don't store the result
+
+HIT = "HIT"
+STALE = "STALE"
+MISS = "MISS"
+BYPASS = "BYPASS"
+
+_READ_QUERY = re.compile(r"^\s*(select|with|show|describe|desc)\b", re.IGNORECASE)
+_LITERALS = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace outside string literals and drop trailing semicolons."""
+    parts = _LITERALS.split(sql.strip().rstrip(";").strip())
+    return "".join(
+        part if i % 2 else " ".join(part.split())
+        for i, part in enumerate(parts)
+    )
+
+
+def is_read_query(sql: str) -> bool:
+    return bool(_READ_QUERY.match(sql))
+
+
+def copy_result(result: Any) -> Any:
+    """A private copy of a result, so a caller mutating it can't change what others see."""
+    if hasattr(result, "copy") and hasattr(result, "memory_usage"):
+        return result.copy()
+    return copy.deepcopy(result)
+
+
+def estimate_size(result: Any) -> int:
+    if hasattr(result, "memory_usage"):
+        return int(result.memory_usage(index=True, deep=True).sum())
+    return sys.getsizeof(result) + len(str(result))
+
+
+class _Entry:
+    def __init__(self, value: Any, size: int, ttl: float, stale_ttl: float):
+        now = time.monotonic()
+        self.value = value
+        self.size = size
+        self.fresh_until = now + ttl
+        self.stale_until = self.fresh_until + stale_ttl
+
+
+class QueryResultCache:
+    """
+    Result cache keyed on (datasource, normalized SQL).
+
+    Entries are evicted LRU once the total estimated size exceeds `max_bytes`.
+    Within `ttl` an entry is served as a hit; for `stale_ttl` seconds after
+    that it is still served (STALE) while a background refresh runs.
+    Per-datasource TTLs override the default `ttl`.
+
+    Every caller gets its own copy of a result. A write statement drops the
+    cached reads of its datasource (of every datasource when it names none),
+    including results of loads that were still running when it executed.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float = 60,
+        stale_ttl: float = 300,
+        ttls: Optional[dict[str, float]] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.ttls = ttls or {}
+        self._entries: "OrderedDict[tuple[str, str], _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._refreshing: set[tuple[str, str]] = set()
+        # Bumped per datasource on invalidation; a load started before it isn't stored
+        self._generations: dict[str, int] = {}
+        self._generation = 0
+        self._refresher = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="query-cache-refresh")
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+    def ttl_for(self, datasource: Optional[str]) -> float:
+        return self.ttls.get(datasource or "", self.ttl)
+
+    def fetch(
+        self,
+        datasource: Optional[str],
+        sql: str,
+        loader: Callable[[], Any],
+        mode: str = CACHE_DEFAULT,
+    ) -> tuple[Any, str]:
+        """Return `(result, status)`, calling `loader` on a miss."""
+        if not is_read_query(sql):
+            with self._lock:
+                self.bypasses += 1
+            try:
+                return loader(), BYPASS
+            finally:
+                # Even a failed write may have applied in part
+                self.invalidate(datasource)
+
+        key = (datasource or "", normalize_sql(sql))
+
+        if mode == CACHE_DEFAULT:
+            with self._lock:
+                entry = self._entries.get(key)
+                now = time.monotonic()
+                if entry is not None and now < entry.stale_until:
+                    self._entries.move_to_end(key)
+                    self.bytes_saved += entry.size
+                    if now < entry.fresh_until:
+                        self.hits += 1
+                        return copy_result(entry.value), HIT
+                    self.stale_hits += 1
+                    stale = entry.value
+                else:
+                    stale = None
+
+            if stale is not None:
+                self._refresh(key, datasource, loader)
+                return copy_result(stale), STALE
+
+        with self._lock:
+            if mode == CACHE_DEFAULT:
+                self.misses += 1
+            else:
+                self.bypasses += 1
+            generation = self._generation_of(key[0])
+
+        result = loader()
+        if mode != CACHE_NO_STORE:
+            self._store(key, datasource, result, generation)
+        return copy_result(result), MISS if mode == CACHE_DEFAULT else BYPASS
+
+    def _generation_of(self, datasource: str) -> tuple[int, int]:
+        return self._generation, self._generations.get(datasource, 0)
+
+    def _refresh(self, key: tuple[str, str], datasource: Optional[str], loader: Callable[[], Any]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            generation = self._generation_of(key[0])
+
+        def _run():
+            try:
+                self._store(key, datasource, loader(), generation)
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {key[0]}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(_run)
+
+    def _store(self, key: tuple[str, str], datasource: Optional[str], value: Any, generation: tuple[int, int]):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        entry = _Entry(value, size, self.ttl_for(datasource), self.stale_ttl)
+        with self._lock:
+            if self._generation_of(key[0]) != generation:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def invalidate(self, datasource: Optional[str]):
+        """Drop the cached results of `datasource`, or of every datasource when None."""
+        with self._lock:
+            if datasource is None:
+                self._generation += 1
+                self._entries.clear()
+                self._bytes = 0
+                return
+            self._generations[datasource] = self._generations.get(datasource, 0) + 1
+            for key in [key for key in self._entries if key[0] == datasource]:
+                self._bytes -= self._entries.pop(key).size
+
+    def close(self):
+        self._refresher.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
@@ -1,37 +1,62 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import HTTPException, Request, status
+from fastapi import status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from app.managers.auth import AuthManager, InvalidTokenError
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Skip auth for OPTIONS and /auth routes
-        if request.method == "OPTIONS" or request.url.path.startswith("/auth/demo-login") or request.url.path.startswith("/health"):
-            return await call_next(request)
-        auth_header = request.headers.get("Authorization")
+PUBLIC_PATHS = ("/auth/demo-login", "/health")
+
+
+class AuthMiddleware:
+    """
+    Pure ASGI auth middleware.
+
+    Unlike `BaseHTTPMiddleware` it does not wrap the response, so streaming
+    bodies (e.g. `/chat/stream`) are sent straight through to the server.
+    The authenticated user is stored in `scope["state"]`, which is what
+    `request.state.user` (a dict of `auth.USER_FIELDS`) / `request.state.user_id`
+    read from.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        # Skip auth for OPTIONS and public routes
+        if scope["method"] == "OPTIONS" or scope["path"].startswith(PUBLIC_PATHS):
+            return await self.app(scope, receive, send)
+
+        auth_header = Headers(scope=scope).get("Authorization")
 
         if not auth_header:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Auth header is missing or invalid!")
+            return await self._unauthorized(
+                "Auth header is missing or invalid!", scope, receive, send)
 
         if not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Auth header format is invalid")
+            return await self._unauthorized(
+                "Auth header format is invalid", scope, receive, send)
 
         token = auth_header.split(" ")[1]
 
-        supabase_client = request.app.state.db_manager.client
+        auth_manager: AuthManager = scope["app"].state.auth_manager
 
         try:
-            user = supabase_client.auth.get_user(token)
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication token")
+            user, user_id = await auth_manager.averify(token)
+        except InvalidTokenError as e:
+            return await self._unauthorized(str(e), scope, receive, send)
 
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+        state = scope.setdefault("state", {})
+        state["user"] = user
+        state["user_id"] = user_id
 
-        request.state.user = user
-        request.state.user_id = user.user.id
+        await self.app(scope, receive, send)
 
-        return await call_next(request)
+    @staticmethod
+    async def _unauthorized(detail: str, scope: Scope, receive: Receive, send: Send):
+        response = JSONResponse(
+            {"detail": detail}, status_code=status.HTTP_401_UNAUTHORIZED)
+        await response(scope, receive, send)
@@ -19,3 +19,26 @@ Instructions:
 
 Analyze carefully and provide comprehensive relationship mapping. Return ONLY valid JSON, no additional text.
 """)
+
+RESOLVE_RELATIONSHIPS_PROMPT = ChatPromptTemplate.from_template("""
+You are a database architect expert. Most relationships of this database were already detected from key naming conventions. Resolve only the remaining columns.
+
+Key columns of every table (table -> column -> data type):
+{schema}
+
+Relationships already known:
+{known}
+
+Unresolved columns (with candidate target tables when more than one matched):
+{ambiguous}
+
+Instructions:
+1. For each unresolved column, decide which table and column it references, if any (e.g. "created_by_id" usually references a users table, "parent_id" its own table).
+2. Skip columns that do not reference another table. Do not repeat the known relationships.
+3. Use only tables and columns listed above. Use relationship types "many-to-one", "one-to-many" or "one-to-one".
+4. Provide a brief description of each relationship and a short summary of the overall database structure.
+
+{format_instructions}
+
+Return ONLY valid JSON, no additional text.
+""")
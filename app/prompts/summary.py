@@ -10,6 +10,17 @@ SQL executed:
 Data:
 {data}
 
+The data is either the full result as a list of rows, or, for large results,
+a statistical profile of it with these keys:
+- row_count / column_count: size of the full result
+- columns: per column its kind ("numeric", "time" or "categorical"), null
+  counts, min/max (plus mean and sum for numeric columns) or the most
+  frequent values with their counts ("top", out of "distinct")
+- head / tail: the first and last few rows only, as examples
+- trends: direction and % change of numeric columns over the time column
+When given a profile, base totals and insights on row_count, the column
+statistics and trends, not on the head/tail sample rows.
+
 Write a breif summary and insights about the response.
 It can be detailed if User request is demanding.
 """)
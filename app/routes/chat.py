@@ -1,15 +1,22 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, FastAPI
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from typing import Optional
 
 # from app.schemas.chatSchemas import ChatSchema
-# from loguru import logger
+from loguru import logger
 
+from app.config import settings
 from app.managers.db import DBManager
+from app.managers.executors import ExecutorManager
+from app.managers.jobs import JobContext, report
 from fastapi import HTTPException, Request
 
 from app.services.analytics_generation import AnalyticsGenerationService, DatabaseInfo
 from app.services.db_chat import DBChatService, ChatInput
+from app.services.panel_validation import PanelValidator
+from app.deps import create_db_chat_service
+from app.routes.jobs import run_or_submit
 
 router = APIRouter()
 
@@ -29,46 +36,87 @@ router = APIRouter()
 class AnalyticsRequest(BaseModel):
     db_info: DatabaseInfo
     dashboard_id: str
+    # Datasource the panel queries run against; required when validate_panels is set
+    db_name: Optional[str] = None
+    # Run every panel query before storing: failures are stored inactive, results as snapshots
+    validate_panels: bool = False
+    # Queue the generation as a job and answer 202 with its id
+    background: bool = False
 
 
 @router.post("/analytics")
 async def analytics(request: Request, payload: AnalyticsRequest):
+    if payload.validate_panels and not payload.db_name:
+        raise HTTPException(
+            status_code=400, detail="db_name is required to validate panels")
+
+    app = request.app
+    user_id = request.state.user_id
+    return await run_or_submit(request, "analytics", payload.dashboard_id, payload,
+                               lambda job: _generate_dashboard(app, user_id, payload, job))
+
+
+async def _generate_dashboard(
+    app: FastAPI, user_id: str, payload: AnalyticsRequest, job: Optional[JobContext] = None
+) -> list:
     try:
-        db: DBManager = request.app.state.db_manager
-        analytics_service: AnalyticsGenerationService = AnalyticsGenerationService()
+        db: DBManager = app.state.db_manager
+        executors: ExecutorManager = app.state.executors
+        analytics_service: AnalyticsGenerationService = AnalyticsGenerationService(
+            app.state.llm_registry)
         # logger.info(f"Chatting for user {request.state.user}")
 
-        result = analytics_service.generateDashboardConfig(payload.db_info)
+        report(job, 0.1, "Generating dashboard")
+        result = await executors.llm(analytics_service.generateDashboardConfig, payload.db_info)
 
         if isinstance(result, list):
+            if payload.validate_panels:
+                report(job, 0.6, "Validating panels")
+                validator = PanelValidator(
+                    app.state.minds_db_manager,
+                    executors,
+                    concurrency=settings.panel_validation_concurrency,
+                    timeout=settings.panel_validation_timeout,
+                    snapshot_rows=settings.panel_snapshot_rows,
+                    sql_validator=app.state.sql_validator,
+                )
+                summary = await validator.validate(
+                    result, payload.db_name, payload.db_info.schemas, payload.db_info.db_type)
+                logger.info(f"Validated dashboard {payload.dashboard_id} panels: {summary}")
+
+            report(job, 0.9, "Saving panels")
             for item in result:
                 item["dashboard_id"] = payload.dashboard_id
-                item["user_id"] = request.state.user_id
-            db.client.table("dashboard_panels").insert(result).execute()
+                item["user_id"] = user_id
+            await executors.supabase(db.client.table("dashboard_panels").insert(result).execute)
         else:
             raise HTTPException(
                 status_code=500, detail="Generated configuration is not a list of panels")
 
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/classify")
-async def classify(payload: dict[str, str]):
+async def classify(request: Request, payload: dict[str, str]):
     try:
-        db_chat: DBChatService = DBChatService()
-        result = db_chat.classify(payload["user_message"])
+        executors: ExecutorManager = request.app.state.executors
+        db_chat: DBChatService = create_db_chat_service(request.app)
+        result = await executors.llm(db_chat.classify, payload["user_message"])
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/generateSQL")
-async def generateSQL(payload: ChatInput):
+async def generateSQL(request: Request, payload: ChatInput):
     try:
-        db_chat: DBChatService = DBChatService()
-        result = db_chat.invoke(payload)
+        executors: ExecutorManager = request.app.state.executors
+        db_chat: DBChatService = create_db_chat_service(request.app)
+        result = await executors.llm(db_chat.invoke, payload)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -77,7 +125,7 @@ async def generateSQL(payload: ChatInput):
 @router.post("/stream")
 async def stream_chat(request: Request, payload: ChatInput):
     try:
-        assistant = DBChatService()
+        assistant = create_db_chat_service(request.app)
         return StreamingResponse(
             assistant.stream_response(payload),
             media_type="text/event-stream",
@@ -1,16 +1,27 @@
-from fastapi import APIRouter, HTTPException, Request
+from typing import Literal, Optional
+
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Response
 from loguru import logger
 
+from app.config import settings
 from app.constants.dbTables import USER_DATASOURCE_CONNECTIONS
 from app.managers.db import DBManager
+from app.managers.executors import ExecutorManager
+from app.managers.jobs import JobContext, report
+from app.managers.query_cache import CACHE_DEFAULT, CACHE_NO_CACHE, CACHE_NO_STORE, STALE, QueryResultCache, is_read_query
 from app.managers.mindsdb import MindsDBManager
-from app.schemas.datasourceSchemas import DataSourceCreateSchema, GetDataSourceSchemas
+from app.routes.jobs import run_or_submit
+from app.schemas.datasourceSchemas import DataSourceCreateSchema, GenerateDataSourceArtifacts, GetDataSourceSchemas
 from app.services.db_relationships_analyzer import DBRelationshipsAnalyzer
 
 from app.services.mindsdb_service import MindsDBService
+from app.services.result_format import ARROW_MEDIA_TYPE, FORMAT_ARROW, FORMAT_RECORDS
+from app.services.schema_cache import SchemaCache
+from app.services.schema_diff import RELATIONSHIPS, SEMANTICS, SchemaChangeTracker, diff_schemas, semantics_diff, touches
+from app.utils.serialization import FastJSONResponse
 
 from app.services.db_semantics_analyzer import DBSemanticsAnalyzer
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 router = APIRouter()
 
@@ -20,16 +31,22 @@ async def create_datasource(request: Request, payload: DataSourceCreateSchema):
     try:
         minds_db: MindsDBManager = request.app.state.minds_db_manager
         db: DBManager = request.app.state.db_manager
+        executors: ExecutorManager = request.app.state.executors
 
         logger.info(f"Creating datasource for user {request.state.user}")
         user_id = request.state.user_id
 
-        result = minds_db.create_datasource(name=payload.metadata.name,
-                                            engine=payload.metadata.engine,
-                                            connection_data=payload.connection_data)
+        result = await executors.mindsdb(minds_db.create_datasource,
+                                         name=payload.metadata.name,
+                                         engine=payload.metadata.engine,
+                                         connection_data=payload.connection_data)
 
-        db_result = db.client.table(USER_DATASOURCE_CONNECTIONS).insert(
-            payload.metadata.model_dump() | {"user_id": user_id}).execute()
+        db_result = await executors.supabase(db.client.table(USER_DATASOURCE_CONNECTIONS).insert(
+            payload.metadata.model_dump() | {"user_id": user_id}).execute)
+        schema_cache: SchemaCache = request.app.state.schema_cache
+        schema_cache.invalidate(payload.metadata.name)
+        query_cache: QueryResultCache = request.app.state.query_cache
+        query_cache.invalidate(payload.metadata.name)
 
         return {
             "status": "success",
@@ -45,9 +62,10 @@ async def delete_datasource(request: Request, id: str):
     try:
         minds_db: MindsDBManager = request.app.state.minds_db_manager
         db: DBManager = request.app.state.db_manager
+        executors: ExecutorManager = request.app.state.executors
 
-        resp = db.client.table(USER_DATASOURCE_CONNECTIONS).delete().eq(
-            "id", id).execute()
+        resp = await executors.supabase(db.client.table(USER_DATASOURCE_CONNECTIONS).delete().eq(
+            "id", id).execute)
 
         deleted_row = resp.data[0]
         if not deleted_row:
@@ -56,7 +74,12 @@ async def delete_datasource(request: Request, id: str):
                 "message": "Datasource deleted successfully"
             }
         else:
-            minds_db.delete_datasource(deleted_row["name"])
+            await executors.mindsdb(minds_db.delete_datasource, deleted_row["name"])
+            schema_cache: SchemaCache = request.app.state.schema_cache
+            schema_cache.invalidate(deleted_row["name"])
+            query_cache: QueryResultCache = request.app.state.query_cache
+            query_cache.invalidate(deleted_row["name"])
+            request.app.state.schema_changes.forget(deleted_row["name"])
             return {
                 "status": "success",
                 "message": "Datasource deleted successfully"
@@ -69,7 +92,8 @@ async def delete_datasource(request: Request, id: str):
 async def get_user_datasources(request: Request):
     try:
         db: DBManager = request.app.state.db_manager
-        return db.client.table(USER_DATASOURCE_CONNECTIONS).select("id, name, label, engine, description, integration_id, created_at, master_datasource_connections(label, icon)").execute()
+        executors: ExecutorManager = request.app.state.executors
+        return await executors.supabase(db.client.table(USER_DATASOURCE_CONNECTIONS).select("id, name, label, engine, description, integration_id, created_at, master_datasource_connections(label, icon)").execute)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -77,107 +101,228 @@ async def get_user_datasources(request: Request):
 @router.get("/schemas/{name}")
 async def get_user_datasource_schemas(request: Request, name: str):
     try:
-        minds_db: MindsDBManager = request.app.state.minds_db_manager
-        return minds_db.get_datasources_tables_and_schemas_by_names([name])
+        schema_cache: SchemaCache = request.app.state.schema_cache
+        executors: ExecutorManager = request.app.state.executors
+        return {name: await executors.mindsdb(schema_cache.get, name)}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/schemas")
 async def get_datasource_schemas(request: Request, payload: GetDataSourceSchemas):
-    try:
-        minds_db: MindsDBManager = request.app.state.minds_db_manager
-        db: DBManager = request.app.state.db_manager
+    app = request.app
+    return await run_or_submit(request, "schemas", payload.name, payload,
+                               lambda job: _sync_schemas(app, payload.name, job))
 
-        name = payload.name
-        response = minds_db.get_datasources_tables_and_schemas_by_names([name])
-        db.client.table(USER_DATASOURCE_CONNECTIONS).update(
-            {"schemas": response[name]}).eq("name", name).execute()
+
+async def _sync_schemas(app: FastAPI, name: str, job: Optional[JobContext] = None) -> dict:
+    try:
+        minds_db: MindsDBManager = app.state.minds_db_manager
+        db: DBManager = app.state.db_manager
+        executors: ExecutorManager = app.state.executors
+        tracker: SchemaChangeTracker = app.state.schema_changes
+
+        report(job, 0.1, "Loading stored schema")
+        stored = await executors.supabase(db.client.table(USER_DATASOURCE_CONNECTIONS).select(
+            "schemas, relationships, semantics").eq("name", name).execute)
+        stored_row = stored.data[0] if stored and stored.data else {}
+
+        report(job, 0.2, "Introspecting datasource")
+        response = await executors.mindsdb(minds_db.get_datasources_tables_and_schemas_by_names, [name])
+        schema = response[name]
+        diff = diff_schemas(stored_row.get("schemas"), schema)
+
+        report(job, 0.8, "Saving schema")
+        update = {"schemas": schema}
+        if diff.removed:
+            # Generated artifacts of dropped tables are no longer valid
+            update["relationships"] = [
+                r for r in stored_row.get("relationships") or [] if not touches(r, diff.removed)]
+            update["semantics"] = [
+                t for t in stored_row.get("semantics") or [] if t.get("table_name") not in diff.removed]
+        await executors.supabase(db.client.table(USER_DATASOURCE_CONNECTIONS).update(
+            update).eq("name", name).execute)
+        tracker.mark_changed(name, diff)
+
+        schema_cache: SchemaCache = app.state.schema_cache
+        schema_cache.put(name, schema)
 
         return {
             "status": "success",
             "message": "Datasource schemas updated successfully",
-            "data": response[name]
+            "data": schema,
+            "changes": {
+                "added": sorted(diff.added),
+                "removed": sorted(diff.removed),
+                "altered": sorted(diff.altered),
+            },
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/generate-relationships")
-async def generate_relationships(request: Request, payload: GetDataSourceSchemas):
-    try:
-        # minds_db: MindsDBManager = request.app.state.minds_db_manager
-        name = payload.name
-        db: DBManager = request.app.state.db_manager
-        connection = db.client.table(USER_DATASOURCE_CONNECTIONS).select(
-            "schemas").eq("name", name).execute()
+async def _load_stored(app: FastAPI, name: str, columns: str) -> dict:
+    db: DBManager = app.state.db_manager
+    executors: ExecutorManager = app.state.executors
+    connection = await executors.supabase(db.client.table(USER_DATASOURCE_CONNECTIONS).select(
+        columns).eq("name", name).execute)
 
-        if (connection is None):
-            raise HTTPException(status_code=400, detail="Datasource not found")
+    if connection is None or not connection.data:
+        raise HTTPException(status_code=400, detail="Datasource not found")
 
-        schema = connection.data[0].get("schemas", None)
+    row = connection.data[0]
+    if row.get("schemas") is None:
+        raise HTTPException(
+            status_code=400, detail="Datasource schemas not found")
+    return row
 
-        if (schema is None):
-            raise HTTPException(
-                status_code=400, detail="Datasource schemas not found")
 
-        analyzer = DBRelationshipsAnalyzer()
-        relationships = analyzer.analyze_relationships(schema)
+@router.post("/generate-relationships")
+async def generate_relationships(request: Request, payload: GenerateDataSourceArtifacts):
+    app = request.app
+    return await run_or_submit(request, "relationships", payload.name, payload,
+                               lambda job: _generate_relationships(app, payload, job))
 
-        if (relationships is None):
-            raise HTTPException(
-                status_code=400, detail="Relationships not found")
-        elif (relationships):
-            db_relationships = [r.model_dump()
-                                for r in relationships.relationships]
-            db.client.table(USER_DATASOURCE_CONNECTIONS).update(
-                {"relationships": db_relationships}).eq("name", name).execute()
+
+async def _generate_relationships(
+    app: FastAPI, payload: GenerateDataSourceArtifacts, job: Optional[JobContext] = None
+) -> dict:
+    try:
+        name = payload.name
+        db: DBManager = app.state.db_manager
+        executors: ExecutorManager = app.state.executors
+        tracker: SchemaChangeTracker = app.state.schema_changes
+
+        with tracker.generating(name, RELATIONSHIPS):
+            report(job, 0.1, "Loading stored schema")
+            row = await _load_stored(app, name, "schemas, relationships")
+            schema = row["schemas"]
+            persisted = row.get("relationships") or []
+
+            # Tables changed since the last run; None means unknown, so regenerate everything
+            changed = None if payload.full or not persisted else tracker.pending(
+                name, RELATIONSHIPS)
+            if changed is not None and not changed:
+                return {
+                    "status": "success",
+                    "message": "Relationships are up to date",
+                    "data": persisted,
+                }
+
+            minds_db: MindsDBManager = app.state.minds_db_manager
+            sampler = (
+                lambda table, column, limit: minds_db.sample_column_values(name, table, column, limit)
+            ) if settings.relationship_value_sampling else None
+            analyzer = DBRelationshipsAnalyzer(
+                app.state.llm_registry,
+                inference=settings.relationship_inference,
+                sampler=sampler,
+            )
+            report(job, 0.2, "Analyzing relationships")
+            relationships = await executors.llm(analyzer.analyze_relationships, schema, changed)
+
+            if (relationships is None):
+                raise HTTPException(
+                    status_code=400, detail="Relationships not found")
+
+            db_relationships = [r.model_dump() for r in relationships.relationships]
+            if changed is not None:
+                # Keep the persisted relationships between unchanged tables
+                tables = set(schema) if isinstance(schema, dict) else set()
+                db_relationships = [
+                    r for r in persisted
+                    if not touches(r, changed) and r.get("source_table") in tables and r.get("target_table") in tables
+                ] + db_relationships
+
+            report(job, 0.9, "Saving relationships")
+            await executors.supabase(db.client.table(USER_DATASOURCE_CONNECTIONS).update(
+                {"relationships": db_relationships}).eq("name", name).execute)
+            tracker.mark_generated(
+                name, RELATIONSHIPS, incremental=changed is not None,
+                skipped=len(schema) - len(changed) if changed is not None else 0)
 
         return {
             "status": "success",
             "message": "Relationships generated successfully",
             "data": db_relationships,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/generate-semantics")
-async def generate_semantics(request: Request, payload: GetDataSourceSchemas):
-    try:
-        # minds_db: MindsDBManager = request.app.state.minds_db_manager
-        name = payload.name
-        db: DBManager = request.app.state.db_manager
-
-        connection = db.client.table(USER_DATASOURCE_CONNECTIONS).select(
-            "schemas").eq("name", name).execute()
-
-        if (connection is None):
-            raise HTTPException(status_code=400, detail="Datasource not found")
-
-        schema = connection.data[0].get("schemas", None)
+async def generate_semantics(request: Request, payload: GenerateDataSourceArtifacts):
+    app = request.app
+    return await run_or_submit(request, "semantics", payload.name, payload,
+                               lambda job: _generate_semantics(app, payload, job))
 
-        if (schema is None):
-            raise HTTPException(
-                status_code=400, detail="Datasource schemas not found")
 
-        analyzer = DBSemanticsAnalyzer()
-        semantics = analyzer.analyze_semantics(schema)
-
-        if (semantics is None):
-            raise HTTPException(
-                status_code=400, detail="Semantics not found")
-        elif (semantics):
-            db_semantics = [r.model_dump()
-                            for r in semantics.tables]
-            db.client.table(USER_DATASOURCE_CONNECTIONS).update(
-                {"semantics": db_semantics}).eq("name", name).execute()
+async def _generate_semantics(
+    app: FastAPI, payload: GenerateDataSourceArtifacts, job: Optional[JobContext] = None
+) -> dict:
+    try:
+        name = payload.name
+        db: DBManager = app.state.db_manager
+        executors: ExecutorManager = app.state.executors
+        tracker: SchemaChangeTracker = app.state.schema_changes
+
+        with tracker.generating(name, SEMANTICS):
+            report(job, 0.1, "Loading stored schema")
+            row = await _load_stored(app, name, "schemas, semantics")
+            schema = row["schemas"]
+            persisted = row.get("semantics") or []
+
+            changed = None
+            if not payload.full and persisted and isinstance(schema, dict):
+                # Tables the stored semantics miss or describe with other columns,
+                # plus type changes recorded by the last schema sync
+                changed = semantics_diff(schema, persisted).changed | (
+                    tracker.pending(name, SEMANTICS) or set())
+                if not changed:
+                    return {
+                        "status": "success",
+                        "message": "Semantics are up to date",
+                        "data": persisted,
+                    }
+
+            analyzer = DBSemanticsAnalyzer(
+                app.state.llm_registry,
+                batch_tokens=settings.semantics_batch_tokens,
+                max_concurrency=settings.semantics_max_concurrency,
+                batch_retries=settings.semantics_batch_retries,
+            )
+            target = schema if changed is None else {
+                t: columns for t, columns in schema.items() if t in changed}
+            report(job, 0.2, "Analyzing semantics")
+            semantics = await executors.llm(analyzer.analyze_semantics, target)
+
+            if (semantics is None):
+                raise HTTPException(
+                    status_code=400, detail="Semantics not found")
+
+            db_semantics = [r.model_dump() for r in semantics.tables]
+            if changed is not None:
+                # Merge into the persisted semantics, in schema order
+                merged = {t.get("table_name"): t for t in persisted if t.get("table_name") in schema}
+                merged.update({t["table_name"]: t for t in db_semantics})
+                db_semantics = [merged[t] for t in schema if t in merged]
+
+            report(job, 0.9, "Saving semantics")
+            await executors.supabase(db.client.table(USER_DATASOURCE_CONNECTIONS).update(
+                {"semantics": db_semantics}).eq("name", name).execute)
+            tracker.mark_generated(
+                name, SEMANTICS, incremental=changed is not None,
+                skipped=len(schema) - len(changed) if changed is not None else 0)
 
         return {
             "status": "success",
             "message": "Semantics generated successfully",
             "data": db_semantics,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -185,21 +330,84 @@ async def generate_semantics(request: Request, payload: GetDataSourceSchemas):
 class QueryRequest(BaseModel):
     name: str
     query: str
+    # "no-cache" re-runs the query and refreshes the cache, "no-store" bypasses it entirely
+    cache: Literal["default", "no-cache", "no-store"] = CACHE_DEFAULT
+    # Pagination: either an offset or the `next_cursor` of a previous page
+    page_size: Optional[int] = Field(default=None, ge=1)
+    offset: int = Field(default=0, ge=0)
+    cursor: Optional[str] = None
+    # Response layout; defaults from the Accept header (Arrow IPC) or "records"
+    format: Optional[Literal["records", "columnar", "arrow"]] = None
+
+
+def _cache_mode(request: Request, payload: QueryRequest) -> str:
+    """Combine the payload cache flag with the request's Cache-Control header."""
+    directives = request.headers.get("Cache-Control", "").lower()
+    if payload.cache == CACHE_NO_STORE or CACHE_NO_STORE in directives:
+        return CACHE_NO_STORE
+    if payload.cache == CACHE_NO_CACHE or CACHE_NO_CACHE in directives:
+        return CACHE_NO_CACHE
+    return CACHE_DEFAULT
+
+
+def _result_format(request: Request, payload: QueryRequest) -> str:
+    if payload.format:
+        return payload.format
+    if ARROW_MEDIA_TYPE in request.headers.get("Accept", ""):
+        return FORMAT_ARROW
+    return FORMAT_RECORDS
 
 
 @router.post("/query")
-async def query(request: Request, payload: QueryRequest):
+async def query(request: Request, response: Response, payload: QueryRequest):
     try:
         minds_db: MindsDBManager = request.app.state.minds_db_manager
-        service = MindsDBService(minds_db)
+        executors: ExecutorManager = request.app.state.executors
+        query_cache: QueryResultCache = request.app.state.query_cache
+        service = MindsDBService(
+            minds_db,
+            max_rows=settings.query_max_rows,
+            default_page_size=settings.query_default_page_size,
+        )
+
+        cache_mode = _cache_mode(request, payload)
+        result = await executors.mindsdb(
+            service.query,
+            payload.name,
+            payload.query,
+            cache_mode,
+            offset=payload.offset,
+            page_size=payload.page_size,
+            cursor=payload.cursor,
+            format=_result_format(request, payload),
+        )
+
+        if result.get("cache"):
+            response.headers["X-Cache"] = result["cache"]
+        if cache_mode == CACHE_NO_STORE or not result.get("cache") or not is_read_query(payload.query):
+            response.headers["Cache-Control"] = "no-store"
+        elif result["cache"] == STALE:
+            # Already past its TTL; a refresh is running
+            response.headers["Cache-Control"] = "private, max-age=0"
+        else:
+            response.headers["Cache-Control"] = f"private, max-age={int(query_cache.ttl_for(payload.name))}"
 
-        result = service.query(payload.name, payload.query)
+        if result["format"] == FORMAT_ARROW:
+            # Binary body; page metadata travels in headers
+            headers = dict(response.headers) | {
+                "X-Row-Count": str(result["row_count"]),
+                "X-Truncated": str(result["truncated"]).lower(),
+            }
+            if result["next_cursor"]:
+                headers["X-Next-Cursor"] = result["next_cursor"]
+            return Response(content=result["data"], media_type=ARROW_MEDIA_TYPE, headers=headers)
 
-        return {
+        # Returned directly so the rows skip jsonable_encoder and go straight to the fast encoder
+        return FastJSONResponse({
             "status": "success",
             "message": "Query executed successfully",
             "data": result
-        }
+        }, headers=dict(response.headers))
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
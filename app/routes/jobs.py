@@ -0,0 +1,73 @@
+import hashlib
+import json
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.managers.jobs import ACTIVE_STATES, JobFn, JobLimitError, JobManager
+from app.utils.serialization import FastJSONResponse, dumps
+
+router = APIRouter()
+
+
+def _options_digest(payload: BaseModel) -> str:
+    options = payload.model_dump(mode="json", exclude={"background"})
+    return hashlib.sha1(json.dumps(options, sort_keys=True).encode()).hexdigest()[:16]
+
+
+async def run_or_submit(request: Request, kind: str, name: str, payload: BaseModel, work: JobFn):
+    """
+    Run `work` inline, or queue it as a job (`payload.background`) and answer 202 with the job id.
+
+    Jobs are deduplicated per user, kind, datasource `name` and the other payload options.
+    """
+    if not getattr(payload, "background", False):
+        return await work(None)
+
+    jobs: JobManager = request.app.state.jobs
+    user_id = request.state.user_id
+    key = f"{kind}:{user_id}:{name}:{_options_digest(payload)}"
+    try:
+        job, deduplicated = jobs.submit(kind, key, user_id, work)
+    except JobLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return FastJSONResponse(status_code=202, content={
+        "status": "accepted",
+        "job_id": job["id"],
+        "deduplicated": deduplicated,
+        "data": job,
+    })
+
+
+@router.get("/{job_id}")
+async def get_job(request: Request, job_id: str):
+    jobs: JobManager = request.app.state.jobs
+    job = await jobs.get(job_id, request.state.user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}/stream")
+async def stream_job(request: Request, job_id: str):
+    jobs: JobManager = request.app.state.jobs
+    user_id = request.state.user_id
+    if await jobs.get(job_id, user_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        async for job in jobs.watch(job_id, user_id):
+            event = "progress" if job["status"] in ACTIVE_STATES else "complete"
+            yield dumps({"event": event, "data": job}) + b"\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -17,3 +17,10 @@ class DataSourceCreateSchema(BaseModel):
 
 class GetDataSourceSchemas(BaseModel):
     name: str
+    # Queue the work as a job and answer 202 with its id instead of waiting for the result
+    background: bool = False
+
+
+class GenerateDataSourceArtifacts(GetDataSourceSchemas):
+    # Regenerate everything instead of only the tables changed since the last run
+    full: bool = False
@@ -1,6 +1,7 @@
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_google_genai import ChatGoogleGenerativeAI
-from app.config import settings
+from app.managers.llm import LLMRegistry
+from app.managers.llm_scheduler import BACKGROUND
 from pydantic import BaseModel, Field
 from typing import Any
 import re
@@ -19,17 +20,16 @@ class DatabaseInfo(BaseModel):
 
 
 class AnalyticsGenerationService:
-    def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            google_api_key=settings.GEMINI_API_KEY,
-            temperature=0.5,
-            convert_system_message_to_human=True
-        )
+    def __init__(self, llm_registry: LLMRegistry):
+        self.chain = llm_registry.get_chain(
+            "analytics.dashboard_config", self._build_chain, temperature=0.5, priority=BACKGROUND)
+
+    @staticmethod
+    def _build_chain(llm: ChatGoogleGenerativeAI):
+        return GENERATE_ANALYTICS_PROMPT | llm
 
     def generateDashboardConfig(self, db_info: DatabaseInfo) -> Any:
-        chain = GENERATE_ANALYTICS_PROMPT | self.llm
-        result = chain.invoke({
+        result = self.chain.invoke({
             "schemas": db_info.schemas,
             "relationships": db_info.relationships,
             "semantics": db_info.semantics,
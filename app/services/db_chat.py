@@ -1,12 +1,19 @@
-import json
+import asyncio
+import time
 from langchain_core.runnables import RunnableBranch, RunnableLambda, RunnableSerializable
-from app.config import settings
-from pydantic import SecretStr
-
+from app.managers.executors import ExecutorManager
+from app.managers.llm import LLMRegistry
 from app.managers.mindsdb import MindsDBManager
+from app.services.intent_classifier import FastIntentClassifier
+from app.services.result_profiler import summarize_result
+from app.services.schema_retriever import SchemaRetriever
+from app.services.sql_cache import SQLGenerationCache
+from app.services.sql_validator import SQLValidationError, SQLValidator
+from app.utils.metrics import ChatStreamMetrics
+from app.utils.serialization import dumps
 
 from typing import Any, cast
-from typing_extensions import AsyncIterator, TypedDict
+from typing_extensions import AsyncIterator, Iterator, TypedDict
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.output_parsers import StrOutputParser
@@ -18,6 +25,8 @@ from app.prompts.summary import SUMMARY_PROMPT
 
 import re
 
+import pandas as pd
+
 
 class ClassifierInput(TypedDict):
     user_message: str
@@ -63,40 +72,63 @@ class SummaryInput(TypedDict):
 
 
 class DBChatService:
-    llm: ChatGoogleGenerativeAI
-
-    def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
-            api_key=SecretStr(settings.GEMINI_API_KEY),
-            model="gemini-2.5-flash",
-            temperature=0.5,
-            convert_system_message_to_human=True
-        )
-        self.classifier_chain = self._build_classifier()
-        self.generic_chain = self._build_generic_reply()
-        self.sql_chain = self._build_sql_generator()
-        self.summary_chain = self._build_summary()
+    def __init__(
+        self,
+        llm_registry: LLMRegistry,
+        minds_db_manager: MindsDBManager,
+        executors: ExecutorManager | None = None,
+        sql_cache: SQLGenerationCache | None = None,
+        schema_retriever: SchemaRetriever | None = None,
+        summary_token_budget: int = 2000,
+        stream_chunk_rows: int = 500,
+        speculative_sql: bool = False,
+        metrics: ChatStreamMetrics | None = None,
+        intent_classifier: FastIntentClassifier | None = None,
+        sql_validator: SQLValidator | None = None,
+    ):
+        self.minds_db_manager = minds_db_manager
+        self.executors = executors
+        self.sql_cache = sql_cache
+        self.schema_retriever = schema_retriever
+        self.summary_token_budget = summary_token_budget
+        self.stream_chunk_rows = stream_chunk_rows
+        self.speculative_sql = speculative_sql
+        self.metrics = metrics
+        self.intent_classifier = intent_classifier
+        self.sql_validator = sql_validator
+        self.classifier_chain = llm_registry.get_chain(
+            "db_chat.classifier", self._build_classifier, temperature=0.5)
+        self.generic_chain = llm_registry.get_chain(
+            "db_chat.generic_reply", self._build_generic_reply, temperature=0.5)
+        self.sql_chain = llm_registry.get_chain(
+            "db_chat.sql_generator", self._build_sql_generator, temperature=0.5)
+        self.summary_chain = llm_registry.get_chain(
+            "db_chat.summary", self._build_summary, temperature=0.5)
         self.pipeline = self._build_pipeline()
 
-    def _build_classifier(self) -> RunnableSerializable[ClassifierInput, str]:
+    @staticmethod
+    def _build_classifier(llm: ChatGoogleGenerativeAI) -> RunnableSerializable[ClassifierInput, str]:
         prompt = cast(
             RunnableSerializable[ClassifierInput, str], MESSAGE_CLASSIFIER_PROMPT)
-        return prompt | self.llm | StrOutputParser()
+        return prompt | llm | StrOutputParser()
 
-    def _build_generic_reply(self) -> RunnableSerializable[GenericReplyInput, str]:
+    @staticmethod
+    def _build_generic_reply(llm: ChatGoogleGenerativeAI) -> RunnableSerializable[GenericReplyInput, str]:
         prompt = cast(
             RunnableSerializable[GenericReplyInput, str], GENERIC_REPLY_PROMPT)
-        return prompt | self.llm | StrOutputParser()
+        return prompt | llm | StrOutputParser()
 
-    def _build_sql_generator(self) -> RunnableSerializable[ChatInput, str]:
+    @staticmethod
+    def _build_sql_generator(llm: ChatGoogleGenerativeAI) -> RunnableSerializable[ChatInput, str]:
         prompt = cast(
             RunnableSerializable[ChatInput, str], SQL_GENERATOR_PROMPT)
-        return prompt | self.llm | StrOutputParser() | RunnableLambda(self._clean_sql)
+        return prompt | llm | StrOutputParser() | RunnableLambda(DBChatService._clean_sql)
 
-    def _build_summary(self) -> RunnableSerializable[SummaryInput, str]:
+    @staticmethod
+    def _build_summary(llm: ChatGoogleGenerativeAI) -> RunnableSerializable[SummaryInput, str]:
         prompt = cast(
             RunnableSerializable[SummaryInput, str], SUMMARY_PROMPT)
-        return prompt | self.llm | StrOutputParser()
+        return prompt | llm | StrOutputParser()
 
     #
     @staticmethod
@@ -109,17 +141,109 @@ class DBChatService:
         sql = sql.strip()
         return sql
 
-    def _execute_sql(self, inputs: dict[str, Any]) -> dict[str, Any]:
+    def _execute_sql_frame(self, inputs: dict[str, Any]) -> dict[str, Any]:
         sql = inputs["sql"]
-        executor = MindsDBManager()
-        data = executor.execute_query(
+        frame = self.minds_db_manager.execute_query_frame(
             sql_query=sql, database_name=inputs["db_name"])
         return {
             "sql": sql,
-            "data": data,
+            "frame": frame,
+            # Bounded digest of the result for SUMMARY_PROMPT
+            "summary_data": summarize_result(frame, self.summary_token_budget),
             "user_message": inputs["user_message"]
         }
 
+    def _execute_sql(self, inputs: dict[str, Any]) -> dict[str, Any]:
+        result = self._execute_sql_frame(inputs)
+        frame = result.pop("frame")
+        return result | {"data": frame.to_dict("records")}
+
+    async def _aexecute_sql(self, inputs: dict[str, Any]) -> dict[str, Any]:
+        """Execute off the event loop, returning the result DataFrame under `frame`."""
+        if self.executors is None:
+            return await asyncio.to_thread(self._execute_sql_frame, inputs)
+        return await self.executors.mindsdb(self._execute_sql_frame, inputs)
+
+    def _stream_rows(self, frame: pd.DataFrame) -> Iterator[bytes]:
+        """SSE events for a result: schema first, bounded row batches, then completion."""
+        yield self._format_sse("data_schema", {
+            "columns": [str(c) for c in frame.columns],
+            "dtypes": {str(c): str(t) for c, t in frame.dtypes.items()},
+        })
+
+        step = max(self.stream_chunk_rows, 1)
+        for offset in range(0, len(frame), step):
+            # Only one batch of row dicts exists at a time
+            rows = frame.iloc[offset:offset + step].to_dict("records")
+            yield self._format_sse("data_chunk", {"offset": offset, "rows": rows})
+
+        yield self._format_sse("data_complete", {"row_count": len(frame)})
+
+    @staticmethod
+    def _sql_inputs(x: Any) -> dict[str, Any]:
+        return {
+            "user_message": x["user_message"],
+            "tables": x["tables"],
+            "relationships": x["relationships"],
+            "semantics": x["semantics"],
+            "db_type": x["db_type"],
+            "db_name": x["db_name"]
+        }
+
+    def _prompt_inputs(self, inputs: dict[str, Any]) -> dict[str, Any]:
+        """Cut the schema sent to SQL_GENERATOR_PROMPT down to the relevant tables."""
+        if self.schema_retriever is None:
+            return inputs
+        return self.schema_retriever.prune(inputs)
+
+    def _generate_sql(self, x: Any) -> str:
+        inputs = self._sql_inputs(x)
+        if self.sql_cache is not None:
+            cached = self.sql_cache.get(inputs)
+            if cached is not None:
+                return cached
+
+        sql = self.sql_chain.invoke(self._prompt_inputs(inputs))
+        if self.sql_cache is not None:
+            self.sql_cache.put(inputs, sql)
+        return sql
+
+    def _validate_sql(self, sql: str, x: Any) -> list[str]:
+        """Check generated SQL against the payload schema before it reaches MindsDB."""
+        if self.sql_validator is None:
+            return []
+        return self.sql_validator.validate(sql, x.get("tables"), x.get("db_type"))
+
+    def _discard_cached_sql(self, x: Any):
+        """Forget generated SQL that failed to execute, so the next ask regenerates it."""
+        if self.sql_cache is not None:
+            self.sql_cache.discard(self._sql_inputs(x))
+
+    def _classify(self, x: Any) -> str:
+        """Intent from the local fast path when it is confident, else from the classifier chain."""
+        if self.intent_classifier is not None:
+            intent = self.intent_classifier.classify(
+                x["user_message"], x.get("tables"))
+            if intent is not None:
+                return intent
+
+        intent = self.classifier_chain.invoke({"user_message": x["user_message"]})
+        if self.intent_classifier is not None:
+            self.intent_classifier.record(intent, fast_path=False)
+        return intent
+
+    async def _aclassify(self, x: Any) -> str:
+        if self.intent_classifier is not None:
+            intent = self.intent_classifier.classify(
+                x["user_message"], x.get("tables"))
+            if intent is not None:
+                return intent
+
+        intent = await self.classifier_chain.ainvoke({"user_message": x["user_message"]})
+        if self.intent_classifier is not None:
+            self.intent_classifier.record(intent, fast_path=False)
+        return intent
+
     # BUILD PIPELINE
 
     def _build_pipeline(self):
@@ -127,7 +251,7 @@ class DBChatService:
         def add_intent(x: ChatInput):
             return {
                 **x,
-                "intent": self.classifier_chain.invoke({"user_message": x["user_message"]})
+                "intent": self._classify(x)
             }
 
         with_intent = RunnableLambda(add_intent)
@@ -143,33 +267,34 @@ class DBChatService:
         generic_branch = RunnableLambda(handle_generic)
 
         def handle_analytical(x):
-            sql = self.sql_chain.invoke({
-                "user_message": x["user_message"],
-                "tables": x["tables"],
-                "relationships": x["relationships"],
-                "semantics": x["semantics"],
-                "db_type": x["db_type"],
-                "db_name": x["db_name"]
-            })
+            sql = self._generate_sql(x)
 
-            data = self._execute_sql({
-                "sql": sql,
-                "user_message": x["user_message"],
-                "db_name": x["db_name"]
-            })
+            try:
+                sql_warnings = self._validate_sql(sql, x)
+                data = self._execute_sql({
+                    "sql": sql,
+                    "user_message": x["user_message"],
+                    "db_name": x["db_name"]
+                })
+            except Exception:
+                self._discard_cached_sql(x)
+                raise
 
             summary = self.summary_chain.invoke({
                 "user_message": x["user_message"],
                 "sql_query": sql,
-                "data": data["data"]
+                "data": data["summary_data"]
             })
 
-            return {
+            response = {
                 "type": "data_response",
                 "summary": summary,
                 "data": data["data"],
                 "sql": sql
             }
+            if sql_warnings:
+                response["warnings"] = sql_warnings
+            return response
 
         analytical_branch = RunnableLambda(handle_analytical)
 
@@ -183,16 +308,61 @@ class DBChatService:
 
     # STREAMING
 
-    async def stream_response(self, payload: ChatInput) -> AsyncIterator[str]:
+    async def _speculate_sql(self, inputs: dict[str, Any], queue: asyncio.Queue):
+        """Stream SQL chunks into `queue`, ending with None (or the exception raised)."""
+        try:
+            async for chunk in self.sql_chain.astream(inputs):
+                queue.put_nowait(chunk)
+        except Exception as e:
+            queue.put_nowait(e)
+        else:
+            queue.put_nowait(None)
+
+    @staticmethod
+    async def _drain(queue: asyncio.Queue) -> AsyncIterator[str]:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def _record_first_sql_token(self, speculative: bool, started: float):
+        if self.metrics is not None:
+            mode = ChatStreamMetrics.SPECULATIVE if speculative else ChatStreamMetrics.SEQUENTIAL
+            self.metrics.record_first_sql_token(
+                mode, time.perf_counter() - started)
+
+    async def stream_response(self, payload: ChatInput) -> AsyncIterator[bytes]:
+        started = time.perf_counter()
+        sql_inputs = self._sql_inputs(payload)
+        cached_sql = None
+        speculation: asyncio.Task | None = None
+        sql_queue: asyncio.Queue = asyncio.Queue()
+
         try:
             yield self._format_sse("status", {"content": "Classifying query..."})
-            intent = await self.classifier_chain.ainvoke({
-                "user_message": payload["user_message"]
-            })
+
+            if self.speculative_sql:
+                cached_sql = self.sql_cache.get(
+                    sql_inputs) if self.sql_cache is not None else None
+                if cached_sql is None:
+                    # Generate SQL while the classifier runs; the chunks wait in the queue
+                    speculation = asyncio.create_task(self._speculate_sql(
+                        self._prompt_inputs(sql_inputs), sql_queue))
+
+            intent = await self._aclassify(payload)
 
             yield self._format_sse("intent", {"content": intent})
 
             if intent == "generic":
+                if speculation is not None:
+                    speculation.cancel()
+                    if self.metrics is not None:
+                        self.metrics.speculation_finished(used=False)
+                    speculation = None
+
                 yield self._format_sse("status", {"content": "Generating response..."})
 
                 # Stream the generic response
@@ -208,29 +378,57 @@ class DBChatService:
             else:
                 yield self._format_sse("status", {"content": "Gnerating SQL query..."})
 
-                sql_chunks: list[str] = []
-
-                async for chunk in self.sql_chain.astream({
-                    "user_message": payload["user_message"],
-                    "tables": payload["tables"],
-                    "relationships": payload["relationships"],
-                    "semantics": payload["semantics"],
-                    "db_type": payload["db_type"],
-                    "db_name": payload["db_name"]
-                }):
-                    sql_chunks.append(chunk)
-                    yield self._format_sse("sql_chunk", {"content": chunk})
+                if not self.speculative_sql:
+                    cached_sql = self.sql_cache.get(
+                        sql_inputs) if self.sql_cache is not None else None
+
+                if cached_sql is not None:
+                    sql = cached_sql
+                    yield self._format_sse("sql_chunk", {"content": sql})
+                else:
+                    sql_chunks: list[str] = []
+                    if speculation is not None:
+                        chunks = self._drain(sql_queue)
+                        if self.metrics is not None:
+                            self.metrics.speculation_finished(used=True)
+                    else:
+                        chunks = self.sql_chain.astream(
+                            self._prompt_inputs(sql_inputs))
+
+                    async for chunk in chunks:
+                        if not sql_chunks:
+                            self._record_first_sql_token(
+                                speculation is not None, started)
+                        sql_chunks.append(chunk)
+                        yield self._format_sse("sql_chunk", {"content": chunk})
+
+                    sql = "".join(sql_chunks)
+                    if self.sql_cache is not None:
+                        self.sql_cache.put(sql_inputs, self._clean_sql(sql))
 
-                sql = "".join(sql_chunks)
                 yield self._format_sse("sql_complete", {"content": sql})
 
+                try:
+                    sql_warnings = self._validate_sql(
+                        self._clean_sql(sql), payload)
+                except SQLValidationError:
+                    self._discard_cached_sql(payload)
+                    raise
+                if sql_warnings:
+                    yield self._format_sse("sql_warning", {"content": sql_warnings})
+
                 yield self._format_sse("status", {"content": "Executing SQL query..."})
-                data = self._execute_sql({
-                    "sql": self._clean_sql(sql),
-                    "user_message": payload["user_message"],
-                    "db_name": payload["db_name"]
-                })
-                yield self._format_sse("data", {"content": data["data"], "data": data["data"]})
+                try:
+                    data = await self._aexecute_sql({
+                        "sql": self._clean_sql(sql),
+                        "user_message": payload["user_message"],
+                        "db_name": payload["db_name"]
+                    })
+                except Exception:
+                    self._discard_cached_sql(payload)
+                    raise
+                for event in self._stream_rows(data["frame"]):
+                    yield event
 
                 yield self._format_sse("status", {"content": "Generating summary..."})
 
@@ -238,7 +436,7 @@ class DBChatService:
                 async for chunk in self.summary_chain.astream({
                     "user_message": payload["user_message"],
                     "sql_query": sql,
-                    "data": data["data"]
+                    "data": data["summary_data"]
                 }):
                     summary_chunks.append(chunk)
                     yield self._format_sse("summary_chunk", {"content": chunk})
@@ -249,20 +447,24 @@ class DBChatService:
         except Exception as e:
             yield self._format_sse("error", {"content": str(e)})
 
+        finally:
+            # Classifier failed or the client went away mid-stream
+            if speculation is not None and not speculation.done():
+                speculation.cancel()
+
     #
 
     @staticmethod
-    def _format_sse(event_type: str, data: dict[str, Any]) -> str:
+    def _format_sse(event_type: str, data: dict[str, Any]) -> bytes:
         """Format data as Server-Sent Event."""
-        jsonObj = json.dumps({"event": event_type, "data": data})
-        return jsonObj + "\n\n"
+        return dumps({"event": event_type, "data": data}) + b"\n\n"
 
     def invoke(self, payload: ChatInput) -> dict[str, Any]:
         return self.pipeline.invoke(payload)
 
     def classify(self, user_message: str) -> str:
-        # return self._build_classifier().invoke({"user_message": user_message})
-        return self._build_generic_reply().invoke({"user_message": user_message})
+        # return self.classifier_chain.invoke({"user_message": user_message})
+        return self.generic_chain.invoke({"user_message": user_message})
 
     def generateSQL(self, payload: ChatInput) -> str:
-        return self._build_sql_generator().invoke(payload)
+        return self.sql_chain.invoke(payload)
@@ -1,10 +1,13 @@
 from typing import List, Optional
 from langchain_core.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
-from langchain_google_genai import ChatGoogleGenerativeAI
 
-from app.config import settings
-from app.prompts.generate_relationships_prompt import GENERATE_RELATIONSHIPS_PROMPT
+from app.managers.llm import LLMRegistry
+from app.managers.llm_scheduler import BACKGROUND
+from app.prompts.generate_relationships_prompt import GENERATE_RELATIONSHIPS_PROMPT, RESOLVE_RELATIONSHIPS_PROMPT
+from app.services.relationship_inference import RelationshipInference, ValueSampler
+from app.services.schema_diff import touches
+from loguru import logger
 
 import json
 
@@ -30,33 +33,92 @@ class SchemaRelationships(BaseModel):
     summary: str = Field(..., description="Summary of database structure")
 
 
+RELATIONSHIPS_PARSER = PydanticOutputParser(pydantic_object=SchemaRelationships)
+
+
 class DBRelationshipsAnalyzer:
-    def __init__(self):
-        self.model = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            api_key=settings.GEMINI_API_KEY,
-            temperature=0,
-            convert_system_message_to_human=True
-        )
-        self.parser = PydanticOutputParser(pydantic_object=SchemaRelationships)
-        self.prompt = GENERATE_RELATIONSHIPS_PROMPT
-
-    def analyze_relationships(self, schema):
-        chain = self.prompt | self.model | self.parser
+    def __init__(self, llm_registry: LLMRegistry, inference: bool = True, sampler: Optional[ValueSampler] = None):
+        self.parser = RELATIONSHIPS_PARSER
+        # Chains are shared through the registry, so they must not capture this instance
+        self.chain = llm_registry.get_chain(
+            "relationships.parsed", lambda llm: GENERATE_RELATIONSHIPS_PROMPT | llm | RELATIONSHIPS_PARSER,
+            temperature=0, priority=BACKGROUND)
+        self.chain_without_parser = llm_registry.get_chain(
+            "relationships.raw", lambda llm: GENERATE_RELATIONSHIPS_PROMPT | llm, temperature=0, priority=BACKGROUND)
+        self.resolve_chain = llm_registry.get_chain(
+            "relationships.resolve.parsed", lambda llm: RESOLVE_RELATIONSHIPS_PROMPT | llm | RELATIONSHIPS_PARSER,
+            temperature=0, priority=BACKGROUND)
+        self.resolve_chain_without_parser = llm_registry.get_chain(
+            "relationships.resolve.raw", lambda llm: RESOLVE_RELATIONSHIPS_PROMPT | llm, temperature=0, priority=BACKGROUND)
+        self.inference = RelationshipInference(sampler=sampler) if inference else None
 
-        try:
-            result = chain.invoke({
-                "schema": json.dumps(schema, indent=2),
+    def analyze_relationships(self, schema, tables: Optional[set[str]] = None):
+        """
+        Relationships of `schema`. With `tables`, only relationships touching
+        those tables are generated (the rest of the schema is context).
+        """
+        if not isinstance(schema, dict):
+            tables = None
+
+        if self.inference is None or not isinstance(schema, dict):
+            prompt_schema = schema
+            if tables is not None:
+                prompt_schema = RelationshipInference.key_schema(schema) | {
+                    t: schema[t] for t in tables if t in schema}
+            result = self._invoke(self.chain, self.chain_without_parser, {
+                "schema": json.dumps(prompt_schema, indent=2),
                 "format_instructions": self.parser.get_format_instructions()
             })
+            if tables is not None:
+                result.relationships = [
+                    r for r in result.relationships if touches(r.model_dump(), tables)]
+            return result
+
+        inferred = self.inference.infer(schema)
+        if tables is not None:
+            inferred = inferred._replace(
+                relationships=[r for r in inferred.relationships if touches(r, tables)],
+                ambiguous=[a for a in inferred.ambiguous if a["source_table"] in tables],
+            )
+        relationships = [Relationship(**r) for r in inferred.relationships]
+        logger.info(
+            f"Inferred {len(relationships)} relationships locally, "
+            f"{len(inferred.ambiguous)} columns left for the LLM")
+
+        if not inferred.ambiguous:
+            return SchemaRelationships(
+                relationships=relationships,
+                summary=f"{len(schema)} tables with {len(relationships)} relationships inferred from key naming conventions.",
+            )
+
+        # Only key columns and the unresolved ones go to the model
+        resolved = self._invoke(self.resolve_chain, self.resolve_chain_without_parser, {
+            "schema": json.dumps(RelationshipInference.key_schema(schema), separators=(",", ":")),
+            "known": json.dumps([
+                f"{r.source_table}.{r.source_column} -> {r.target_table}.{r.target_column}"
+                for r in relationships
+            ]),
+            "ambiguous": json.dumps(inferred.ambiguous, separators=(",", ":")),
+            "format_instructions": self.parser.get_format_instructions()
+        })
+
+        unresolved = {(a["source_table"], a["source_column"]) for a in inferred.ambiguous}
+        for r in resolved.relationships:
+            ends = {(r.source_table, r.source_column), (r.target_table, r.target_column)}
+            known_columns = all(column in (schema.get(table) or {}) for table, column in ends)
+            # Ignore anything the model invented or restated
+            if known_columns and ends & unresolved:
+                relationships.append(r)
+
+        return SchemaRelationships(relationships=relationships, summary=resolved.summary)
+
+    def _invoke(self, chain, chain_without_parser, inputs: dict) -> SchemaRelationships:
+        try:
+            result = chain.invoke(inputs)
             return result
         except Exception as e:
             # Fallback: try without parser if JSON parsing fails
-            chain_without_parser = self.prompt | self.model
-            response = chain_without_parser.invoke({
-                "schema": json.dumps(schema, indent=2),
-                "format_instructions": self.parser.get_format_instructions()
-            })
+            response = chain_without_parser.invoke(inputs)
 
             # Try to parse the response manually
             content = response.content
@@ -1,13 +1,19 @@
-from typing import List
+from typing import Any, List
 from pydantic import BaseModel, Field
-from app.config import settings
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.managers.llm import LLMRegistry
+from app.managers.llm_scheduler import BACKGROUND
+from app.services.schema_retriever import estimate_tokens
 from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.runnables import RunnableLambda
+from loguru import logger
 
 import json
 
 from app.prompts.semantics_generation_prompt import SEMANTICS_GENERATION_PROMPT
 
+# Rough size of one generated description in the answer
+ANSWER_TOKENS_PER_COLUMN = 30
+
 
 class ColumnSemantics(BaseModel):
     """Simplified semantic information for a database column"""
@@ -31,30 +37,119 @@ class SchemaSemantics(BaseModel):
         ..., description="Simplified semantic information for each table")
 
 
+SEMANTICS_PARSER = PydanticOutputParser(pydantic_object=SchemaSemantics)
+
+
+def partition_schema(schema: dict[str, Any], token_budget: int) -> list[dict[str, Any]]:
+    """
+    Split `{table: columns}` into batches of whole tables whose estimated
+    prompt + answer size stays within `token_budget`. A table larger than the
+    budget gets a batch of its own.
+    """
+    batches: list[dict[str, Any]] = []
+    current: dict[str, Any] = {}
+    used = 0
+    for table_name, columns in schema.items():
+        # The answer is roughly a sentence per column plus one for the table
+        cost = estimate_tokens({table_name: columns}) + \
+            ANSWER_TOKENS_PER_COLUMN * (len(columns or {}) + 1)
+        if current and used + cost > token_budget:
+            batches.append(current)
+            current, used = {}, 0
+        current[table_name] = columns
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
 class DBSemanticsAnalyzer:
-    def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            google_api_key=settings.GEMINI_API_KEY,
-            temperature=0,
-            convert_system_message_to_human=True
-        )
-        self.parser = PydanticOutputParser(pydantic_object=SchemaSemantics)
-        self.prompt = SEMANTICS_GENERATION_PROMPT
+    def __init__(
+        self,
+        llm_registry: LLMRegistry,
+        batch_tokens: int = 6000,
+        max_concurrency: int = 4,
+        batch_retries: int = 1,
+    ):
+        self.parser = SEMANTICS_PARSER
+        # Chains are shared through the registry, so they must not capture this instance
+        self.chain = llm_registry.get_chain(
+            "semantics.parsed", lambda llm: SEMANTICS_GENERATION_PROMPT | llm | SEMANTICS_PARSER,
+            temperature=0, priority=BACKGROUND)
+        self.chain_without_parser = llm_registry.get_chain(
+            "semantics.raw", lambda llm: SEMANTICS_GENERATION_PROMPT | llm, temperature=0, priority=BACKGROUND)
+        self.batch_tokens = batch_tokens
+        self.max_concurrency = max(max_concurrency, 1)
+        self.batch_retries = batch_retries
 
     def analyze_semantics(self, schema):
-        chain = self.prompt | self.llm | self.parser
+        if not isinstance(schema, dict):
+            return self._analyze_batch(schema)
+
+        batches = partition_schema(schema, self.batch_tokens)
+        if len(batches) <= 1:
+            return self._analyze_batch(schema)
+
+        logger.info(
+            f"Generating semantics for {len(schema)} tables in {len(batches)} batches")
+        analyze = RunnableLambda(self._analyze_batch)
+        config = {"max_concurrency": self.max_concurrency}
+        tables: dict[str, TableSemantics] = {}
+
+        pending = batches
+        for attempt in range(self.batch_retries + 1):
+            results = analyze.batch(pending, config=config, return_exceptions=True)
+            failed = []
+            for batch, result in zip(pending, results):
+                missing = self._merge(batch, result, tables)
+                if missing:
+                    failed.append(missing)
+            if not failed:
+                break
+            # Only the tables a batch failed to describe are sent again
+            logger.warning(
+                f"{len(failed)} semantics batches incomplete (attempt {attempt + 1})")
+            pending = failed
+
+        if not tables:
+            raise Exception("Semantics generation failed for every batch")
+
+        missing_tables = [t for t in schema if t not in tables]
+        if missing_tables:
+            logger.warning(
+                f"No semantics generated for tables: {', '.join(missing_tables)}")
+
+        # Keep the schema's table order
+        return SchemaSemantics(tables=[tables[t] for t in schema if t in tables])
+
+    @staticmethod
+    def _merge(batch: dict[str, Any], result: Any, tables: dict[str, TableSemantics]) -> dict[str, Any]:
+        """Add a batch result to `tables`; returns the part of `batch` still undescribed."""
+        if isinstance(result, Exception):
+            logger.warning(f"Semantics batch failed: {result}")
+            return batch
+
+        by_name = {t.table_name.lower(): t for t in result.tables}
+        missing = {}
+        for table_name, columns in batch.items():
+            table = by_name.get(str(table_name).lower())
+            if table is None:
+                missing[table_name] = columns
+            else:
+                # Answers sometimes change the table name's case
+                tables[table_name] = table.model_copy(update={"table_name": table_name})
+        return missing
 
+    def _analyze_batch(self, schema):
         try:
-            result = chain.invoke({
+            result = self.chain.invoke({
                 "schema": json.dumps(schema, indent=2),
                 "format_instructions": self.parser.get_format_instructions()
             })
             return result
         except Exception as e:
             # Fallback: try without parser if JSON parsing fails
-            chain_without_parser = self.prompt | self.llm
-            response = chain_without_parser.invoke({
+            response = self.chain_without_parser.invoke({
                 "schema": json.dumps(schema, indent=2),
                 "format_instructions": self.parser.get_format_instructions()
             })
@@ -0,0 +1,142 @@
+import re
+import threading
+from typing import Any, Optional
+
+from app.services.schema_retriever import tokenize
+
+GENERIC = "generic"
+ANALYTICAL = "analytical"
+DATA_SPECIFIC = "data_specific"
+
+_WORD = re.compile(r"[a-z0-9']+")
+# Numbers, quoted strings and ids point at specific records
+_LITERAL = re.compile(r"\b\d+\b|'[^']+'|\"[^\"]+\"")
+
+GREETINGS = frozenset("""
+hi hello hey hiya yo greetings morning afternoon evening good thanks thank thx ty
+cheers bye goodbye ok okay cool great nice awesome there sup welcome appreciate
+""".split())
+
+# Greetings built from question words; matched as whole phrases only
+GREETING_PHRASES = (
+    "how are you", "how are you doing", "how's it going", "how is it going",
+    "what's up", "whats up", "thank you", "thanks a lot", "thank you very much",
+)
+
+ASSISTANT_TERMS = frozenset("""
+who are you your name help can do able capabilities joke weather
+""".split())
+
+AGGREGATION_TERMS = frozenset("""
+count total sum average avg mean median min max minimum maximum top bottom
+highest lowest most least trend trends growth compare comparison distribution
+breakdown percentage percent ratio monthly weekly daily yearly quarterly
+""".split())
+
+# Aggregation cues made of common words that mean nothing on their own
+AGGREGATION_PHRASES = (
+    "how many", "how much", "number of", "group by", "grouped by", "over time",
+    "by day", "by week", "by month", "by quarter", "by year",
+    "per day", "per week", "per month", "per quarter", "per year",
+)
+
+
+def _phrase_pattern(phrases: tuple[str, ...]) -> re.Pattern:
+    alternatives = sorted(phrases, key=len, reverse=True)
+    return re.compile(r"(?<![a-z0-9'])(?:" + "|".join(map(re.escape, alternatives)) + r")(?![a-z0-9'])")
+
+
+_GREETING_PHRASE = _phrase_pattern(GREETING_PHRASES)
+_AGGREGATION_PHRASE = _phrase_pattern(AGGREGATION_PHRASES)
+
+LOOKUP_TERMS = frozenset("""
+show list find get display give fetch which where when whose what detail details
+record records row rows id email status
+""".split())
+
+
+class FastIntentClassifier:
+    """
+    Deterministic intent classifier run before MESSAGE_CLASSIFIER_PROMPT.
+
+    Scores a message from greeting words, aggregation/lookup cues and matches
+    against the datasource's table and column names. Decisions at or above
+    `threshold` confidence skip the LLM; everything else is escalated.
+    """
+
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.fast_path = 0
+        self.escalated = 0
+        self.by_intent: dict[str, int] = {}
+
+    @staticmethod
+    def _schema_terms(tables: Optional[dict[str, Any]]) -> set[str]:
+        terms: set[str] = set()
+        for table_name, columns in (tables or {}).items():
+            terms.update(tokenize(table_name))
+            for column_name in (columns or {}):
+                terms.update(tokenize(column_name))
+        # Generic column names say nothing about the question
+        terms -= {"id", "name", "type", "created", "updated", "at", "date"}
+        return terms
+
+    def score(self, user_message: str, tables: Optional[dict[str, Any]] = None) -> tuple[str, float]:
+        """Best guess `(intent, confidence)` for a message."""
+        text = user_message.strip().lower()
+        words = _WORD.findall(text)
+        if not words:
+            return GENERIC, 0.9
+
+        normalized = " ".join(words)
+        schema_hits = len(set(tokenize(text)) & self._schema_terms(tables))
+        aggregation = (
+            sum(1 for w in words if w in AGGREGATION_TERMS)
+            + len(_AGGREGATION_PHRASE.findall(normalized))
+        )
+        lookup = sum(1 for w in words if w in LOOKUP_TERMS)
+        literal = bool(_LITERAL.search(user_message))
+
+        if schema_hits == 0:
+            rest = _WORD.findall(_GREETING_PHRASE.sub(" ", normalized))
+            if all(w in GREETINGS for w in rest):
+                return GENERIC, 0.95
+            if all(w in GREETINGS or w in ASSISTANT_TERMS for w in rest):
+                return GENERIC, 0.85
+            # No schema vocabulary at all: most likely chit-chat, but let the LLM decide
+            return GENERIC, 0.5 if len(words) <= 4 else 0.3
+
+        if aggregation:
+            confidence = 0.7 + 0.1 * min(schema_hits, 2) + 0.05 * min(aggregation, 2)
+            return ANALYTICAL, round(min(confidence, 0.99), 2)
+        if lookup or literal:
+            confidence = 0.65 + 0.1 * min(schema_hits, 2) + (0.1 if literal else 0.0)
+            return DATA_SPECIFIC, round(min(confidence, 0.95), 2)
+        return ANALYTICAL, round(0.5 + 0.1 * min(schema_hits, 2), 2)
+
+    def classify(self, user_message: str, tables: Optional[dict[str, Any]] = None) -> Optional[str]:
+        """The intent when the fast path is confident enough, otherwise None."""
+        intent, confidence = self.score(user_message, tables)
+        if confidence < self.threshold:
+            return None
+        self.record(intent, fast_path=True)
+        return intent
+
+    def record(self, intent: str, fast_path: bool):
+        with self._lock:
+            if fast_path:
+                self.fast_path += 1
+            else:
+                self.escalated += 1
+            self.by_intent[intent] = self.by_intent.get(intent, 0) + 1
+
+    def stats(self) -> dict[str, Any]:
+        decisions = self.fast_path + self.escalated
+        return {
+            "threshold": self.threshold,
+            "fast_path": self.fast_path,
+            "llm": self.escalated,
+            "fast_path_ratio": round(self.fast_path / decisions, 4) if decisions else 0.0,
+            "by_intent": dict(self.by_intent),
+        }
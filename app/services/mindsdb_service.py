@@ -1,41 +1,209 @@
 from app.managers.mindsdb import MindsDBManager
+from app.managers.query_cache import CACHE_DEFAULT
+from app.services.result_format import FORMAT_ARROW, FORMAT_COLUMNAR, FORMAT_RECORDS, to_arrow_ipc, to_columnar, to_records
 from fastapi import HTTPException
-from typing import Any
+from typing import Any, Optional
+import base64
+import hashlib
+import json
+import re
+
+import pandas as pd
+
+_PAGEABLE_QUERY = re.compile(r"^(select|with)\b", re.IGNORECASE)
+# Trailing `LIMIT n`, `LIMIT n OFFSET m` or MySQL-style `LIMIT m, n`
+_TRAILING_LIMIT = re.compile(
+    r"\s+LIMIT\s+(\d+)(?:\s*,\s*(\d+))?(?:\s+OFFSET\s+(\d+))?\s*$", re.IGNORECASE)
+# Trailing `OFFSET m` without a LIMIT
+_TRAILING_OFFSET = re.compile(r"\s+OFFSET\s+(\d+)(?:\s+ROWS?)?\s*$", re.IGNORECASE)
+
+
+def strip_comments(sql: str) -> str:
+    """Remove `--` and `/* */` comments outside quoted strings and identifiers."""
+    out: list[str] = []
+    i, n = 0, len(sql)
+    while i < n:
+        ch = sql[i]
+        if ch in "'\"`":
+            end = i + 1
+            while end < n:
+                if sql[end] == ch:
+                    if end + 1 < n and sql[end + 1] == ch:  # Doubled quote escape
+                        end += 2
+                        continue
+                    break
+                end += 1
+            out.append(sql[i:end + 1])
+            i = end + 1
+        elif sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = n if end == -1 else end
+            out.append(" ")
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            out.append(" ")
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def _wrapped(sql: str) -> bool:
+    """Whether the whole statement is enclosed in one pair of parentheses."""
+    if not (sql.startswith("(") and sql.endswith(")")):
+        return False
+    depth = 0
+    for i, ch in enumerate(sql):
+        depth += ch == "("
+        depth -= ch == ")"
+        if depth == 0 and i < len(sql) - 1:
+            return False
+    return True
+
+
+def clean_sql(query: str) -> str:
+    """The statement without comments, trailing semicolons or enclosing parentheses."""
+    sql = strip_comments(query).strip().rstrip(";").strip()
+    while _wrapped(sql):
+        sql = sql[1:-1].strip()
+    return sql
+
+
+def is_pageable(query: str) -> bool:
+    return bool(_PAGEABLE_QUERY.match(clean_sql(query)))
+
+
+def _query_id(query: str) -> str:
+    return hashlib.sha1(" ".join(query.split()).encode()).hexdigest()[:16]
+
+
+def encode_cursor(query: str, offset: int) -> str:
+    token = json.dumps({"q": _query_id(query), "o": offset}).encode()
+    return base64.urlsafe_b64encode(token).decode().rstrip("=")
+
+
+def decode_cursor(query: str, cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        token = json.loads(base64.urlsafe_b64decode(padded))
+        offset = int(token["o"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if token.get("q") != _query_id(query) or offset < 0:
+        raise HTTPException(
+            status_code=400, detail="Cursor does not belong to this query")
+    return offset
+
+
+def paginate_sql(query: str, offset: int, page_size: int) -> Optional[str]:
+    """
+    Rewrite a SELECT so it fetches one page (plus one row to detect more).
+
+    An existing trailing LIMIT/OFFSET is respected: the page never reaches
+    past the user's own limit. Returns None when the page is past that limit.
+    """
+    base = clean_sql(query)
+    user_limit: Optional[int] = None
+    user_offset = 0
+
+    match = _TRAILING_LIMIT.search(base)
+    if match:
+        if match.group(2) is not None:
+            user_offset, user_limit = int(match.group(1)), int(match.group(2))
+        else:
+            user_limit = int(match.group(1))
+            user_offset = int(match.group(3) or 0)
+        base = base[:match.start()]
+    elif (match := _TRAILING_OFFSET.search(base)):
+        # Folded into the generated clause; `OFFSET m LIMIT n` is invalid in MySQL
+        user_offset = int(match.group(1))
+        base = base[:match.start()]
+
+    fetch = page_size + 1
+    if user_limit is not None:
+        remaining = user_limit - offset
+        if remaining <= 0:
+            return None
+        fetch = min(fetch, remaining)
+
+    sql = f"{base}\nLIMIT {fetch}"
+    if user_offset + offset:
+        sql += f" OFFSET {user_offset + offset}"
+    return sql
 
 
 class MindsDBService:
-    def __init__(self, minds_db_manager: MindsDBManager):
+    def __init__(self, minds_db_manager: MindsDBManager, max_rows: int = 10000, default_page_size: int = 1000):
         self.minds_db_manager = minds_db_manager
+        self.max_rows = max_rows
+        self.default_page_size = default_page_size
 
-    def query(self, name: str, query: str) -> Any:
+    def query(
+        self,
+        name: str,
+        query: str,
+        cache: str = CACHE_DEFAULT,
+        offset: int = 0,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        format: str = FORMAT_RECORDS,
+    ) -> Any:
         if not self.minds_db_manager:
             raise HTTPException(
                 status_code=400, detail="MindsDB manager not initialized")
 
         try:
-            limit = 100
-            database = self.minds_db_manager.mindsdb.get_database(name)
-            if not database:
-                raise HTTPException(
-                    status_code=400, detail=f"Database '{name}' not found")
+            if cursor:
+                offset = decode_cursor(query, cursor)
+            page_size = max(
+                1, min(page_size or self.default_page_size, self.max_rows))
 
-            # Add limit to query if not present
-            # if limit and "limit" not in query.lower():
-            #     query = f"{query} LIMIT {limit}"
+            sql = query
+            if is_pageable(query):
+                sql = paginate_sql(query, offset, page_size)
+                if sql is None:
+                    return self._page(pd.DataFrame(), offset, page_size, False, query, None, format)
 
-            # Execute query
-            result = database.query(query)
-            df = result.fetch()
+            # Execute query on a pooled connection (or serve it from the result cache)
+            df, cache_status = self.minds_db_manager.fetch_query_with_status(
+                sql, database_name=name, cache=cache)
 
             # The result is already a pandas DataFrame
             if df is not None:
-                return {
-                    "columns": list(df.columns),
-                    "data": df.to_dict("records"),
-                    "row_count": len(df),
-                }
+                if sql is query:
+                    # Not a SELECT we could rewrite, page the fetched rows instead
+                    df = df.iloc[offset:]
+                if not isinstance(df, pd.DataFrame):
+                    df = pd.DataFrame(df)
+                truncated = len(df) > page_size
+                df = df.iloc[:page_size]
+                return self._page(df, offset, page_size, truncated, query, cache_status, format)
             else:
-                return {"columns": [], "data": [], "row_count": 0}
+                return self._page(pd.DataFrame(), offset, page_size, False, query, cache_status, format)
 
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
+
+    @staticmethod
+    def _page(df, offset, page_size, truncated, query, cache_status, format) -> dict[str, Any]:
+        page = {
+            "columns": [str(c) for c in df.columns],
+            "row_count": len(df),
+            "offset": offset,
+            "page_size": page_size,
+            "truncated": truncated,
+            "next_cursor": encode_cursor(query, offset + len(df)) if truncated else None,
+            "cache": cache_status,
+            "format": format,
+        }
+
+        if format == FORMAT_COLUMNAR:
+            columnar = to_columnar(df)
+            return page | {"dtypes": columnar["dtypes"], "values": columnar["values"]}
+        if format == FORMAT_ARROW:
+            return page | {"data": to_arrow_ipc(df)}
+        return page | {"data": to_records(df)}
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi import HTTPException
+from loguru import logger
+
+from app.managers.executors import ExecutorManager
+from app.managers.mindsdb import MindsDBManager
+from app.services.result_format import to_records
+from app.services.sql_validator import SQLValidationError, SQLValidator
+
+# Chart types that plot an x axis; kpi/metric/table panels don't need one
+_AXIS_TYPES = {"bar", "line", "area", "scatter", "radar", "composed"}
+
+
+class PanelValidator:
+    """
+    Runs the `config.sql_query` of generated dashboard panels before they are stored.
+
+    Queries run concurrently on the MindsDB executor, at most `concurrency`
+    at a time and each bounded by `timeout` seconds. Panels whose query fails,
+    times out or lacks the configured axis columns are set `active: false`.
+    The first `snapshot_rows` rows of a working query are kept as the panel's
+    `dataSource` so the dashboard can render before re-running it.
+    """
+
+    def __init__(
+        self,
+        minds_db_manager: MindsDBManager,
+        executors: ExecutorManager,
+        concurrency: int = 4,
+        timeout: float = 15,
+        snapshot_rows: int = 200,
+        sql_validator: SQLValidator | None = None,
+    ):
+        self.minds_db_manager = minds_db_manager
+        self.executors = executors
+        self.concurrency = max(concurrency, 1)
+        self.timeout = timeout
+        self.snapshot_rows = snapshot_rows
+        self.sql_validator = sql_validator
+
+    @staticmethod
+    def _missing_columns(config: dict[str, Any], columns: list[str]) -> list[str]:
+        expected: list[str] = []
+        if config.get("type") in _AXIS_TYPES and config.get("x_axis"):
+            expected.append(config["x_axis"])
+        y_axis = config.get("y_axis") or []
+        expected += [y_axis] if isinstance(y_axis, str) else list(y_axis)
+
+        available = {c.lower() for c in columns}
+        return [c for c in expected if c and str(c).lower() not in available]
+
+    async def _validate_panel(
+        self, panel: dict[str, Any], db_name: str, semaphore: asyncio.Semaphore, tables: Any, db_type: str | None
+    ) -> bool:
+        config = panel.get("config")
+        if not isinstance(config, dict):
+            config = panel["config"] = {}
+        sql = config.get("sql_query")
+        if not sql:
+            panel["active"] = False
+            config["validation_error"] = "Panel has no sql_query"
+            return False
+
+        if self.sql_validator is not None:
+            try:
+                self.sql_validator.validate(sql, tables, db_type)
+            except SQLValidationError as e:
+                # Known-bad query: no need to spend a MindsDB round-trip on it
+                panel["active"] = False
+                config["validation_error"] = str(e)
+                return False
+
+        async with semaphore:
+            try:
+                frame = await asyncio.wait_for(
+                    self.executors.mindsdb(
+                        self.minds_db_manager.execute_query_frame,
+                        sql_query=sql,
+                        database_name=db_name,
+                    ),
+                    timeout=self.timeout,
+                )
+            except asyncio.TimeoutError:
+                error = f"Query timed out after {self.timeout}s"
+            except HTTPException as e:
+                error = str(e.detail)
+            except Exception as e:
+                error = str(e)
+            else:
+                error = None
+
+        if error is None:
+            columns = [str(c) for c in frame.columns]
+            missing = self._missing_columns(config, columns)
+            if missing:
+                error = f"Result is missing columns: {', '.join(missing)}"
+
+        if error is not None:
+            logger.warning(f"Panel '{panel.get('title')}' failed validation: {error}")
+            panel["active"] = False
+            config["validation_error"] = error
+            return False
+
+        config.pop("validation_error", None)
+        panel["dataSource"] = {
+            "type": "snapshot",
+            "data": to_records(frame.head(self.snapshot_rows)),
+            "columns": columns,
+            "row_count": len(frame),
+            "truncated": len(frame) > self.snapshot_rows,
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+        }
+        return True
+
+    async def validate(
+        self, panels: list[dict[str, Any]], db_name: str, tables: Any = None, db_type: str | None = None
+    ) -> dict[str, Any]:
+        """Validate `panels` in place and return a summary of the run. `tables` is the schema SQL is checked against."""
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(
+            self._validate_panel(panel, db_name, semaphore, tables, db_type) for panel in panels
+        ))
+        return {
+            "panels": len(panels),
+            "valid": sum(results),
+            "invalid": len(results) - sum(results),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
@@ -0,0 +1,171 @@
+import re
+from typing import Any, Callable, NamedTuple, Optional
+
+from loguru import logger
+
+# Fetches up to `limit` distinct non-null values of table.column
+ValueSampler = Callable[[str, str, int], set]
+
+# customer_id, customer_ID, customerId, customerID
+_ID_SUFFIX = re.compile(r"^(.+?)(?:_id|_ID|_Id|(?<=[a-z0-9])Id|(?<=[a-z0-9])ID)$")
+_TABLE_PREFIX = re.compile(r"^(tbl|tb|t|dim|fact)_", re.IGNORECASE)
+
+_TYPE_FAMILIES = {
+    "number": ("int", "serial", "number", "numeric", "decimal"),
+    "string": ("char", "text", "string", "clob"),
+    "uuid": ("uuid", "uniqueidentifier"),
+}
+
+
+def _singular(word: str) -> str:
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("ses", "xes", "zes", "ches", "shes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def _table_key(table_name: str) -> str:
+    """Comparable form of a table name: lowercase, no tbl_/dim_ prefix, singular."""
+    return _singular(_TABLE_PREFIX.sub("", table_name.lower()))
+
+
+def _type_family(data_type: Any) -> Optional[str]:
+    text = str(data_type or "").lower()
+    for family, markers in _TYPE_FAMILIES.items():
+        if any(marker in text for marker in markers):
+            return family
+    return None
+
+
+def types_compatible(a: Any, b: Any) -> bool:
+    fa, fb = _type_family(a), _type_family(b)
+    if fa is None or fb is None or fa == fb:
+        return True  # Unknown types are not evidence against a match
+    return {fa, fb} == {"string", "uuid"}
+
+
+class InferenceResult(NamedTuple):
+    relationships: list[dict[str, Any]]
+    # {"source_table", "source_column", "data_type", "candidates": [table, ...]}
+    ambiguous: list[dict[str, Any]]
+
+
+class RelationshipInference:
+    """
+    Detects foreign keys from naming conventions before asking the LLM.
+
+    A `<name>_id` / `<name>Id` column is matched to the table whose singular,
+    prefix-stripped name is `<name>`, pointing at that table's `id` (or
+    `<name>_id`) column, provided the types are compatible. Columns with
+    several candidate tables are resolved by value overlap when a `sampler`
+    is given; anything still unresolved is returned as ambiguous.
+    """
+
+    def __init__(self, sampler: Optional[ValueSampler] = None, sample_size: int = 1000, min_overlap: float = 0.9):
+        self.sampler = sampler
+        self.sample_size = sample_size
+        self.min_overlap = min_overlap
+
+    @staticmethod
+    def primary_key(table_name: str, columns: dict[str, Any]) -> Optional[str]:
+        lowered = {c.lower(): c for c in columns}
+        key = _table_key(table_name)
+        for candidate in ("id", f"{key}_id", f"{key}id"):
+            if candidate in lowered:
+                return lowered[candidate]
+        return None
+
+    @staticmethod
+    def _stem(column: str) -> Optional[str]:
+        match = _ID_SUFFIX.match(column)
+        if not match:
+            return None
+        return _singular(match.group(1).lower())
+
+    def _overlap(self, source: tuple[str, str], target: tuple[str, str]) -> float:
+        try:
+            values = self.sampler(source[0], source[1], self.sample_size)
+            if not values:
+                return 0.0
+            target_values = self.sampler(target[0], target[1], self.sample_size * 10)
+        except Exception as e:
+            logger.warning(f"Value sampling failed for {source[0]}.{source[1]}: {e}")
+            return 0.0
+        normalize = lambda vs: {str(v) for v in vs}
+        return len(normalize(values) & normalize(target_values)) / len(values)
+
+    def infer(self, schema: dict[str, dict[str, Any]]) -> InferenceResult:
+        tables = {name: columns or {} for name, columns in schema.items() if isinstance(columns, dict)}
+        keys = {name: self.primary_key(name, columns) for name, columns in tables.items()}
+        by_key: dict[str, list[str]] = {}
+        for name in tables:
+            by_key.setdefault(_table_key(name), []).append(name)
+
+        relationships: list[dict[str, Any]] = []
+        ambiguous: list[dict[str, Any]] = []
+
+        for source_table, columns in tables.items():
+            for column, data_type in columns.items():
+                stem = self._stem(column)
+                if stem is None and column.lower().endswith("id") and len(column) > 2:
+                    # All-lowercase "customerid" only counts when such a table exists
+                    stem = _singular(column[:-2].lower())
+                    stem = stem if stem in by_key else None
+                if stem is None or column == keys[source_table]:
+                    continue
+
+                candidates = []
+                for target_table in by_key.get(stem, []):
+                    # Target column: the table's key, or a same-named column (customers.customer_id)
+                    target_column = keys[target_table]
+                    if target_column is None and column in tables[target_table]:
+                        target_column = column
+                    if target_column is None or (target_table == source_table and target_column == column):
+                        continue
+                    if types_compatible(data_type, tables[target_table][target_column]):
+                        candidates.append((target_table, target_column))
+
+                if len(candidates) > 1 and self.sampler is not None:
+                    overlapping = [
+                        c for c in candidates
+                        if self._overlap((source_table, column), c) >= self.min_overlap
+                    ]
+                    candidates = overlapping or candidates
+
+                if len(candidates) != 1:
+                    ambiguous.append({
+                        "source_table": source_table,
+                        "source_column": column,
+                        "data_type": str(data_type),
+                        "candidates": [t for t, _ in candidates],
+                    })
+                    continue
+
+                target_table, target_column = candidates[0]
+                relationships.append({
+                    "source_table": source_table,
+                    "source_column": column,
+                    "target_table": target_table,
+                    "target_column": target_column,
+                    "relationship_type": "many-to-one",
+                    "description": f"{source_table}.{column} references {target_table}.{target_column}",
+                })
+
+        return InferenceResult(relationships, ambiguous)
+
+    @staticmethod
+    def key_schema(schema: dict[str, dict[str, Any]]) -> dict[str, dict[str, Any]]:
+        """Only the key-like columns of each table; enough context for the LLM to resolve references."""
+        reduced = {}
+        for name, columns in schema.items():
+            if not isinstance(columns, dict):
+                continue
+            key = RelationshipInference.primary_key(name, columns)
+            reduced[name] = {
+                column: data_type for column, data_type in columns.items()
+                if column == key or RelationshipInference._stem(column) is not None
+            }
+        return reduced
@@ -0,0 +1,103 @@
+import math
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+FORMAT_RECORDS = "records"
+FORMAT_COLUMNAR = "columnar"
+FORMAT_ARROW = "arrow"
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def _scalar(value: Any) -> Any:
+    """JSON-safe conversion of a single value from an object column."""
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, Decimal):
+        return float(value) if value.is_finite() else None
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if isinstance(value, (str, int, bool, list, dict)):
+        return value
+    return str(value)
+
+
+def column_values(series: pd.Series) -> list[Any]:
+    """Convert one column into a list of JSON-safe Python values, vectorized where the dtype allows."""
+    missing = series.isna().to_numpy()
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if getattr(series.dt, "tz", None) is not None:
+            values = series.map(lambda v: v.isoformat(), na_action="ignore")
+            values = values.to_numpy(dtype=object)
+        else:
+            values = np.datetime_as_string(series.to_numpy(), unit="auto").astype(object)
+    elif pd.api.types.is_timedelta64_dtype(series):
+        values = series.dt.total_seconds().to_numpy(dtype=object)
+    elif pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        if not missing.any():
+            return series.to_numpy().tolist()
+        values = series.to_numpy(dtype=object)
+    elif pd.api.types.is_float_dtype(series):
+        array = series.to_numpy(dtype=float)
+        missing = ~np.isfinite(array)
+        values = array.astype(object)
+    else:
+        return [_scalar(v) for v in series.to_numpy(dtype=object)]
+
+    values = np.array(values, dtype=object)
+    values[missing] = None
+    return values.tolist()
+
+
+def to_columnar(df: pd.DataFrame) -> dict[str, Any]:
+    """`{"columns": [...], "dtypes": {...}, "values": [[col0...], [col1...]]}` built from the column arrays."""
+    columns = [str(c) for c in df.columns]
+    return {
+        "columns": columns,
+        "dtypes": {str(c): str(t) for c, t in df.dtypes.items()},
+        "values": [column_values(df.iloc[:, i]) for i in range(df.shape[1])],
+    }
+
+
+def to_records(df: pd.DataFrame) -> list[dict[str, Any]]:
+    """Row dicts with the same value conversion as `to_columnar`."""
+    columnar = to_columnar(df)
+    columns = columnar["columns"]
+    return [dict(zip(columns, row)) for row in zip(*columnar["values"])]
+
+
+def to_arrow_ipc(df: pd.DataFrame) -> bytes:
+    """Serialize a DataFrame as an Arrow IPC stream (requires the optional `pyarrow` package)."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(
+            status_code=406, detail="Arrow format requires the 'pyarrow' package")
+
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns: fall back to strings for those
+        df = df.copy()
+        for name in df.columns[df.dtypes == object]:
+            df[name] = df[name].map(_scalar).astype("string")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,182 @@
+import json
+import math
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+_TIME_NAME = re.compile(r"(date|time|day|week|month|quarter|year|period|_at$|_on$)", re.IGNORECASE)
+
+
+def estimate_tokens(value: Any) -> int:
+    return len(json.dumps(value, default=str)) // 4
+
+
+def _py(value: Any) -> Any:
+    """Convert numpy/pandas scalars into JSON-friendly Python values."""
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return None if pd.isna(value) else value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, Decimal):
+        value = float(value)
+    if isinstance(value, float):
+        return None if math.isnan(value) or math.isinf(value) else round(value, 4)
+    if isinstance(value, (str, int, bool)):
+        return value
+    return str(value)
+
+
+def _records(frame: pd.DataFrame) -> list[dict[str, Any]]:
+    return [
+        {column: _py(value) for column, value in zip(frame.columns, row)}
+        for row in frame.itertuples(index=False, name=None)
+    ]
+
+
+def _is_text(series: pd.Series) -> bool:
+    # pandas 3 stores strings as StringDtype rather than object
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def _as_datetime(series: pd.Series) -> pd.Series | None:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if not _is_text(series) or not _TIME_NAME.search(str(series.name)):
+        return None
+    parsed = pd.to_datetime(series, errors="coerce")
+    if parsed.notna().sum() < 0.8 * series.notna().sum():
+        return None
+    return parsed
+
+
+def _numeric(series: pd.Series) -> pd.Series | None:
+    if pd.api.types.is_bool_dtype(series):
+        return None
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    if _is_text(series):
+        # Decimal columns come back from some engines as objects
+        converted = pd.to_numeric(series, errors="coerce")
+        if converted.notna().sum() and converted.notna().sum() == series.notna().sum():
+            return converted.astype(float)
+    return None
+
+
+def _trend(time: pd.Series, values: pd.Series) -> dict[str, Any] | None:
+    frame = pd.DataFrame({"t": time, "v": values}).dropna().sort_values("t")
+    if len(frame) < 3:
+        return None
+
+    x = (frame["t"] - frame["t"].iloc[0]).dt.total_seconds().to_numpy()
+    y = frame["v"].to_numpy()
+    if np.ptp(x) == 0:
+        return None
+
+    slope = np.polyfit(x, y, 1)[0]
+    first, last = y[0], y[-1]
+    change = (last - first) / abs(first) * 100 if first else None
+    spread = np.std(y)
+    direction = "flat" if spread == 0 or abs(slope * np.ptp(x)) < 0.05 * spread else (
+        "increasing" if slope > 0 else "decreasing")
+    return {
+        "direction": direction,
+        "first": _py(first),
+        "last": _py(last),
+        "change_pct": _py(change),
+    }
+
+
+def profile_dataframe(df: pd.DataFrame, top_k: int = 5, sample_rows: int = 5) -> dict[str, Any]:
+    """Column types, counts, min/max/mean, top categories, head/tail sample and time trends."""
+    columns: list[dict[str, Any]] = []
+    time_columns: dict[str, pd.Series] = {}
+    numeric_columns: dict[str, pd.Series] = {}
+
+    for name in df.columns:
+        series = df[name]
+        info: dict[str, Any] = {
+            "name": str(name),
+            "dtype": str(series.dtype),
+            "non_null": int(series.notna().sum()),
+            "nulls": int(series.isna().sum()),
+        }
+
+        as_time = _as_datetime(series)
+        as_number = _numeric(series) if as_time is None else None
+
+        if as_time is not None:
+            time_columns[name] = as_time
+            info["kind"] = "time"
+            info["min"] = _py(as_time.min())
+            info["max"] = _py(as_time.max())
+        elif as_number is not None:
+            numeric_columns[name] = as_number
+            info["kind"] = "numeric"
+            info["min"] = _py(as_number.min())
+            info["max"] = _py(as_number.max())
+            info["mean"] = _py(as_number.mean())
+            info["sum"] = _py(as_number.sum())
+        else:
+            counts = series.astype(str).where(series.notna()).value_counts()
+            info["kind"] = "categorical"
+            info["distinct"] = int(len(counts))
+            info["top"] = {str(k): int(v) for k, v in counts.head(top_k).items()}
+
+        columns.append(info)
+
+    trends = {}
+    if time_columns and numeric_columns:
+        time_name, time_values = next(iter(time_columns.items()))
+        for name, values in numeric_columns.items():
+            trend = _trend(time_values, values)
+            if trend is not None:
+                trends[str(name)] = trend | {"time_column": str(time_name)}
+
+    profile: dict[str, Any] = {
+        "row_count": int(len(df)),
+        "column_count": int(len(df.columns)),
+        "columns": columns,
+        "head": _records(df.head(sample_rows)),
+    }
+    if len(df) > sample_rows:
+        profile["tail"] = _records(df.tail(min(sample_rows, len(df) - sample_rows)))
+    if trends:
+        profile["trends"] = trends
+    return profile
+
+
+def summarize_result(df: pd.DataFrame, token_budget: int = 2000) -> Any:
+    """
+    Data to hand to SUMMARY_PROMPT: the rows themselves when they fit in
+    `token_budget`, otherwise a profile shrunk until it does.
+    """
+    if df is None or df.empty:
+        return []
+
+    rows = _records(df) if len(df) <= 1000 else None
+    if rows is not None and estimate_tokens(rows) <= token_budget:
+        return rows
+
+    profile = profile_dataframe(df)
+    # Shrink the samples and category lists rather than re-profiling
+    for top_k, sample_rows in ((5, 5), (3, 3), (3, 1), (1, 0)):
+        for column in profile["columns"]:
+            if "top" in column:
+                column["top"] = dict(list(column["top"].items())[:top_k])
+        profile["head"] = profile["head"][:sample_rows]
+        if "tail" in profile:
+            profile["tail"] = profile["tail"][max(len(profile["tail"]) - sample_rows, 0):] if sample_rows else []
+        if estimate_tokens(profile) <= token_budget:
+            return profile
+
+    # Very wide results: keep as many column profiles as the budget allows
+    profile["columns_truncated"] = True
+    while len(profile["columns"]) > 1 and estimate_tokens(profile) > token_budget:
+        profile["columns"] = profile["columns"][:len(profile["columns"]) // 2]
+    return profile
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from app.constants.dbTables import USER_DATASOURCE_CONNECTIONS
+from app.managers.db import DBManager
+from app.managers.mindsdb import MindsDBManager
+
+
+class _SchemaEntry:
+    def __init__(self, schema: Dict[str, Dict[str, str]], fingerprint: str):
+        self.schema = schema
+        self.fingerprint = fingerprint
+        self.validated_at = time.monotonic()
+
+
+class SchemaCache:
+    """
+    In-process LRU cache of datasource schemas.
+
+    Entries younger than `ttl` are served as-is. Older entries (and schemas
+    persisted in `user_datasource_connections.schemas`) are revalidated with
+    `MindsDBManager.get_schema_fingerprint` and only re-introspected when the
+    fingerprint changed.
+    """
+
+    def __init__(
+        self,
+        minds_db_manager: MindsDBManager,
+        db_manager: Optional[DBManager] = None,
+        ttl: float = 300,
+        maxsize: int = 256,
+    ):
+        self.minds_db_manager = minds_db_manager
+        self.db_manager = db_manager
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, _SchemaEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.revalidations = 0
+        self.introspections = 0
+        self.persisted_loads = 0
+
+    def get(self, name: str) -> Dict[str, Dict[str, str]]:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+                if time.monotonic() - entry.validated_at < self.ttl:
+                    self.hits += 1
+                    return entry.schema
+
+        if entry is None:
+            entry = self._load_persisted(name)
+
+        if entry is not None:
+            try:
+                live_fingerprint = self.minds_db_manager.get_schema_fingerprint(
+                    name)
+            except Exception as e:
+                logger.warning(
+                    f"Schema fingerprint failed for {name}, re-introspecting: {e}")
+                live_fingerprint = None
+
+            if live_fingerprint == entry.fingerprint:
+                entry.validated_at = time.monotonic()
+                self._store(name, entry)
+                with self._lock:
+                    self.revalidations += 1
+                return entry.schema
+
+        schema = self.minds_db_manager.get_datasources_tables_and_schemas_by_names([name])[
+            name]
+        with self._lock:
+            self.introspections += 1
+        self.put(name, schema)
+        return schema
+
+    def put(self, name: str, schema: Dict[str, Dict[str, str]]):
+        self._store(name, _SchemaEntry(
+            schema, MindsDBManager.schema_fingerprint(schema)))
+
+    def invalidate(self, name: str):
+        with self._lock:
+            self._entries.pop(name, None)
+
+    def _store(self, name: str, entry: _SchemaEntry):
+        with self._lock:
+            self._entries[name] = entry
+            self._entries.move_to_end(name)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _load_persisted(self, name: str) -> Optional[_SchemaEntry]:
+        if self.db_manager is None:
+            return None
+
+        try:
+            response = self.db_manager.client.table(USER_DATASOURCE_CONNECTIONS).select(
+                "schemas").eq("name", name).execute()
+        except Exception as e:
+            logger.warning(f"Failed to load persisted schema for {name}: {e}")
+            return None
+
+        schema = response.data[0].get("schemas") if response.data else None
+        if not schema:
+            return None
+
+        with self._lock:
+            self.persisted_loads += 1
+        return _SchemaEntry(schema, MindsDBManager.schema_fingerprint(schema))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "introspections": self.introspections,
+            "persisted_loads": self.persisted_loads,
+        }
@@ -0,0 +1,140 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, NamedTuple, Optional
+
+RELATIONSHIPS = "relationships"
+SEMANTICS = "semantics"
+
+
+class SchemaDiff(NamedTuple):
+    added: set[str]
+    removed: set[str]
+    # Tables whose columns or column types changed
+    altered: set[str]
+
+    @property
+    def changed(self) -> set[str]:
+        """Tables whose generated artifacts must be rebuilt."""
+        return self.added | self.altered
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.altered)
+
+
+def _normalize(schema: Any) -> dict[str, dict[str, str]]:
+    if not isinstance(schema, dict):
+        return {}
+    return {
+        str(table): {str(c).lower(): str(t).lower() for c, t in (columns or {}).items()}
+        if isinstance(columns, dict) else {}
+        for table, columns in schema.items()
+    }
+
+
+def diff_schemas(old: Any, new: Any) -> SchemaDiff:
+    """Tables added, removed and altered between two `{table: {column: type}}` schemas."""
+    old_tables, new_tables = _normalize(old), _normalize(new)
+    return SchemaDiff(
+        added=set(new_tables) - set(old_tables),
+        removed=set(old_tables) - set(new_tables),
+        altered={t for t in set(old_tables) & set(new_tables) if old_tables[t] != new_tables[t]},
+    )
+
+
+def semantics_diff(schema: Any, semantics: Optional[list[dict[str, Any]]]) -> SchemaDiff:
+    """
+    Tables the persisted semantics don't describe, describe differently
+    (column names changed) or describe but no longer exist.
+    """
+    described = {
+        t.get("table_name"): {str(c.get("column_name", "")).lower() for c in t.get("columns") or []}
+        for t in semantics or [] if isinstance(t, dict)
+    }
+    tables = _normalize(schema)
+    return SchemaDiff(
+        added=set(tables) - set(described),
+        removed=set(described) - set(tables),
+        altered={t for t in set(tables) & set(described) if set(tables[t]) != described[t]},
+    )
+
+
+def touches(relationship: dict[str, Any], tables: set[str]) -> bool:
+    return relationship.get("source_table") in tables or relationship.get("target_table") in tables
+
+
+class SchemaChangeTracker:
+    """
+    Tables changed by schema syncs since relationships/semantics were last generated.
+
+    `pending` returns None when nothing is known about a datasource (e.g.
+    after a restart), in which case callers regenerate everything.
+    Generation runs inside `generating`, so tables changed by a sync while
+    it runs stay pending once it is marked generated.
+    """
+
+    def __init__(self):
+        self._pending: dict[tuple[str, str], set[str]] = {}
+        # Tables changed since each in-flight generation started
+        self._running: dict[tuple[str, str], list[set[str]]] = {}
+        self._lock = threading.Lock()
+        self.incremental_runs = 0
+        self.full_runs = 0
+        self.tables_skipped = 0
+
+    def mark_changed(self, name: str, diff: SchemaDiff):
+        with self._lock:
+            for artifact in (RELATIONSHIPS, SEMANTICS):
+                pending = self._pending.get((name, artifact))
+                if pending is not None:
+                    pending.update(diff.changed)
+                    pending -= diff.removed
+                for since in self._running.get((name, artifact), []):
+                    since.update(diff.changed)
+                    since -= diff.removed
+
+    def pending(self, name: str, artifact: str) -> Optional[set[str]]:
+        with self._lock:
+            pending = self._pending.get((name, artifact))
+            return set(pending) if pending is not None else None
+
+    @contextmanager
+    def generating(self, name: str, artifact: str) -> Iterator[None]:
+        """Record schema changes made while `artifact` is being generated; enter before loading the schema."""
+        key, since = (name, artifact), set()
+        with self._lock:
+            self._running.setdefault(key, []).append(since)
+        try:
+            yield
+        finally:
+            with self._lock:
+                runs = [run for run in self._running[key] if run is not since]
+                if runs:
+                    self._running[key] = runs
+                else:
+                    del self._running[key]
+
+    def mark_generated(self, name: str, artifact: str, incremental: bool, skipped: int = 0):
+        """
+        Call inside `generating`: only tables changed since the generation
+        started (or since an overlapping one started) stay pending.
+        """
+        with self._lock:
+            self._pending[(name, artifact)] = set().union(*self._running.get((name, artifact), []))
+            if incremental:
+                self.incremental_runs += 1
+                self.tables_skipped += skipped
+            else:
+                self.full_runs += 1
+
+    def forget(self, name: str):
+        with self._lock:
+            for artifact in (RELATIONSHIPS, SEMANTICS):
+                self._pending.pop((name, artifact), None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "tracked": len(self._pending),
+            "incremental_runs": self.incremental_runs,
+            "full_runs": self.full_runs,
+            "tables_skipped": self.tables_skipped,
+        }
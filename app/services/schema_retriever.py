@@ -0,0 +1,173 @@
+import json
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Any
+
+from app.services.sql_cache import STOP_WORDS, chat_schema_fingerprint, normalize_token
+
+_CAMEL = re.compile(r"([a-z0-9])([A-Z])")
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Table names matter more than a column or a word in a description
+TABLE_NAME_WEIGHT = 3
+
+
+def tokenize(text: str) -> list[str]:
+    """Split snake_case / camelCase identifiers and prose into normalized terms."""
+    text = _CAMEL.sub(r"\1 \2", str(text)).lower()
+    return [normalize_token(t) for t in _WORD.findall(text) if t not in STOP_WORDS]
+
+
+def estimate_tokens(value: Any) -> int:
+    return len(json.dumps(value, default=str)) // 4
+
+
+class SchemaIndex:
+    """BM25 index with one document per table (name, columns, semantic descriptions)."""
+
+    def __init__(self, tables: dict[str, dict[str, str]], semantics: list[dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        descriptions: dict[str, list[str]] = {}
+        for table in semantics or []:
+            texts = [table.get("semantic_description", "")]
+            texts += [
+                f"{column.get('column_name', '')} {column.get('semantic_description', '')}"
+                for column in table.get("columns", [])
+            ]
+            descriptions[table.get("table_name", "")] = texts
+
+        self.docs: dict[str, Counter] = {}
+        for table_name, columns in tables.items():
+            terms = tokenize(table_name) * TABLE_NAME_WEIGHT
+            for column_name in (columns or {}):
+                terms += tokenize(column_name)
+            for text in descriptions.get(table_name, []):
+                terms += tokenize(text)
+            self.docs[table_name] = Counter(terms)
+
+        self.doc_lengths = {name: sum(doc.values())
+                            for name, doc in self.docs.items()}
+        self.avg_length = (sum(self.doc_lengths.values()) /
+                           len(self.docs)) if self.docs else 0
+        document_frequency: Counter = Counter()
+        for doc in self.docs.values():
+            document_frequency.update(doc.keys())
+        n = len(self.docs)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def score(self, query: str) -> dict[str, float]:
+        terms = set(tokenize(query))
+        scores: dict[str, float] = {}
+        for table_name, doc in self.docs.items():
+            length_norm = 1 - self.b + self.b * \
+                self.doc_lengths[table_name] / (self.avg_length or 1)
+            score = 0.0
+            for term in terms:
+                tf = doc.get(term)
+                if tf:
+                    score += self.idf[term] * tf * \
+                        (self.k1 + 1) / (tf + self.k1 * length_norm)
+            if score > 0:
+                scores[table_name] = score
+        return scores
+
+
+class SchemaRetriever:
+    """
+    Picks the tables relevant to a question before SQL generation.
+
+    Keeps the top-k tables by BM25 score plus their join neighbours from the
+    relationships, and trims relationships/semantics to match. Indexes are
+    built once per schema fingerprint.
+    """
+
+    def __init__(self, top_k: int = 8, maxsize: int = 64):
+        self.top_k = top_k
+        self.maxsize = maxsize
+        self._indexes: "OrderedDict[str, SchemaIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.pruned = 0
+        self.skipped = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def _index(self, inputs: dict[str, Any]) -> SchemaIndex:
+        fingerprint = chat_schema_fingerprint(inputs)
+        with self._lock:
+            index = self._indexes.get(fingerprint)
+            if index is not None:
+                self._indexes.move_to_end(fingerprint)
+                return index
+
+        index = SchemaIndex(inputs["tables"], inputs.get("semantics") or [])
+        with self._lock:
+            self._indexes[fingerprint] = index
+            while len(self._indexes) > self.maxsize:
+                self._indexes.popitem(last=False)
+        return index
+
+    def prune(self, inputs: dict[str, Any]) -> dict[str, Any]:
+        """Return `inputs` with tables, relationships and semantics cut to the relevant tables."""
+        tables = inputs.get("tables") or {}
+        if self.top_k <= 0 or len(tables) <= self.top_k:
+            return inputs
+
+        scores = self._index(inputs).score(inputs["user_message"])
+        if not scores:
+            # Nothing matched, the model is better off seeing everything
+            with self._lock:
+                self.skipped += 1
+            return inputs
+
+        top = set(sorted(scores, key=scores.get, reverse=True)[:self.top_k])
+        selected = set(top)
+        relationships = inputs.get("relationships") or []
+        for relationship in relationships:
+            source = relationship.get("source_table")
+            target = relationship.get("target_table")
+            if source in top and target in tables:
+                selected.add(target)
+            elif target in top and source in tables:
+                selected.add(source)
+
+        pruned = {
+            **inputs,
+            "tables": {name: columns for name, columns in tables.items() if name in selected},
+            "relationships": [
+                r for r in relationships
+                if r.get("source_table") in selected and r.get("target_table") in selected
+            ],
+            "semantics": [
+                t for t in inputs.get("semantics") or []
+                if t.get("table_name") in selected
+            ],
+        }
+
+        before = estimate_tokens(
+            [inputs["tables"], inputs.get("relationships"), inputs.get("semantics")])
+        after = estimate_tokens(
+            [pruned["tables"], pruned["relationships"], pruned["semantics"]])
+        with self._lock:
+            self.pruned += 1
+            self.tokens_before += before
+            self.tokens_after += after
+        return pruned
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "top_k": self.top_k,
+            "indexes": len(self._indexes),
+            "pruned": self.pruned,
+            "skipped": self.skipped,
+            "schema_tokens_before": self.tokens_before,
+            "schema_tokens_after": self.tokens_after,
+            "token_reduction": round(1 - self.tokens_after / self.tokens_before, 4) if self.tokens_before else 0.0,
+        }
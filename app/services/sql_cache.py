@@ -0,0 +1,71 @@
+import hashlib
+import json
+import re
+from typing import Any, Optional
+
+from app.utils.cache import TTLCache
+
+# Only articles and politeness; prepositions, quantifiers and logical words change the SQL
+STOP_WORDS = frozenset("""
+a an the please kindly can could would you me us show give tell display
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9_]+")
+
+
+def normalize_token(token: str) -> str:
+    # Crude singularization so "orders" and "order" hit the same entry
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def normalize_question(message: str) -> str:
+    """Lowercase, tokenize and drop stop words, keeping word order."""
+    tokens = _TOKEN.findall(message.lower())
+    return " ".join(normalize_token(t) for t in tokens if t not in STOP_WORDS)
+
+
+def chat_schema_fingerprint(payload: Any) -> str:
+    """Fingerprint of the schema context sent with a chat message."""
+    context = {
+        "db_type": payload.get("db_type"),
+        "tables": payload.get("tables"),
+        "relationships": payload.get("relationships"),
+        "semantics": payload.get("semantics"),
+    }
+    return hashlib.sha1(
+        json.dumps(context, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class SQLGenerationCache:
+    """
+    Cache of generated SQL keyed on (datasource, schema fingerprint, normalized question).
+
+    SQL generated against another schema of the same datasource is never
+    returned; those entries simply age out through the TTL and LRU.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def _key(payload: Any) -> tuple[str, str, str]:
+        return (
+            payload.get("db_name") or "",
+            chat_schema_fingerprint(payload),
+            normalize_question(payload["user_message"]),
+        )
+
+    def get(self, payload: Any) -> Optional[str]:
+        return self.cache.get(self._key(payload))
+
+    def put(self, payload: Any, sql: str):
+        if sql:
+            self.cache.set(self._key(payload), sql)
+
+    def discard(self, payload: Any):
+        self.cache.pop(self._key(payload))
+
+    def stats(self) -> dict[str, Any]:
+        return self.cache.stats()
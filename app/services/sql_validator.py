@@ -0,0 +1,192 @@
+import threading
+from typing import Any, Optional
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.dialects.dialect import Dialect
+from sqlglot.errors import ParseError
+
+# Validation modes
+VALIDATION_REJECT = "reject"  # raise before the query reaches MindsDB
+VALIDATION_WARN = "warn"  # report problems but still execute
+VALIDATION_OFF = "off"
+
+_DIALECT_ALIASES = {
+    "postgresql": "postgres",
+    "pg": "postgres",
+    "mariadb": "mysql",
+    "mssql": "tsql",
+    "sqlserver": "tsql",
+    "sql_server": "tsql",
+    "google_bigquery": "bigquery",
+}
+
+# What a statement can parse to; anything else is a mangled keyword read as an expression
+_STATEMENTS = (exp.Query, exp.DML, exp.DDL, exp.Command, exp.Describe, exp.Show, exp.Use, exp.Set, exp.Drop)
+
+
+class SQLValidationError(ValueError):
+    def __init__(self, errors: list[str]):
+        self.errors = errors
+        super().__init__("Invalid SQL: " + "; ".join(errors))
+
+
+def dialect_for(db_type: Optional[str]) -> Optional[str]:
+    """sqlglot dialect name for a datasource engine, None when sqlglot has no match."""
+    if not db_type:
+        return None
+    name = db_type.strip().lower()
+    name = _DIALECT_ALIASES.get(name, name)
+    return name if name in Dialect.classes else None
+
+
+class SQLValidator:
+    """
+    Parses generated SQL locally and checks it against the datasource schema.
+
+    Catches syntax errors and references to tables or columns that are not in
+    `tables` (`{table: {column: type}}`) without a MindsDB round-trip. Checks
+    are conservative: column references that may come from CTEs, subqueries
+    or select aliases are not flagged.
+    """
+
+    def __init__(self, mode: str = VALIDATION_REJECT):
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.passed = 0
+        self.rejected = 0
+        self.flagged = 0
+        self.parse_errors = 0
+        self.unknown_tables = 0
+        self.unknown_columns = 0
+
+    @staticmethod
+    def _parse(sql: str, dialect: Optional[str]) -> list[exp.Expression]:
+        try:
+            return [e for e in sqlglot.parse(sql, read=dialect) if e is not None]
+        except ParseError:
+            if dialect is None:
+                raise
+        # Engine-specific syntax sqlglot doesn't know for this dialect; try the generic one
+        return [e for e in sqlglot.parse(sql) if e is not None]
+
+    @staticmethod
+    def _columns(columns: Any) -> Optional[set[str]]:
+        if isinstance(columns, dict):
+            return {str(c).lower() for c in columns}
+        if isinstance(columns, (list, tuple)) and all(isinstance(c, str) for c in columns):
+            return {c.lower() for c in columns}
+        return None  # Unknown shape: the table is known, its columns aren't checked
+
+    @classmethod
+    def _schema(cls, tables: Any) -> dict[str, Optional[set[str]]]:
+        if not isinstance(tables, dict):
+            return {}
+        return {str(name).lower(): cls._columns(columns) for name, columns in tables.items()}
+
+    def check(self, sql: str, tables: Any, db_type: Optional[str] = None) -> tuple[list[str], dict[str, int]]:
+        """Return `(errors, counts)` for `sql`; no errors means it looks valid."""
+        counts = {"parse_errors": 0, "unknown_tables": 0, "unknown_columns": 0}
+        try:
+            statements = self._parse(sql, dialect_for(db_type))
+        except ParseError as e:
+            counts["parse_errors"] = 1
+            message = e.errors[0]["description"] if e.errors else str(e)
+            return [f"Syntax error: {message}"], counts
+
+        if not statements:
+            counts["parse_errors"] = 1
+            return ["Empty SQL statement"], counts
+        if not all(isinstance(s, _STATEMENTS) for s in statements):
+            counts["parse_errors"] = 1
+            return ["Syntax error: not a SQL statement"], counts
+
+        schema = self._schema(tables)
+        if not schema:
+            return [], counts
+
+        errors: list[str] = []
+        for statement in statements:
+            cte_names = {cte.alias_or_name.lower() for cte in statement.find_all(exp.CTE)}
+            derived = {
+                sub.alias_or_name.lower() for sub in statement.find_all(exp.Subquery) if sub.alias_or_name
+            }
+
+            aliases: dict[str, str] = {}
+            referenced: set[str] = set()
+            for table in statement.find_all(exp.Table):
+                name = table.name.lower()
+                if not name or name in cte_names:
+                    continue
+                if name not in schema:
+                    counts["unknown_tables"] += 1
+                    errors.append(f"Unknown table '{table.name}'")
+                    continue
+                referenced.add(name)
+                aliases[name] = name
+                if table.alias:
+                    aliases[table.alias.lower()] = name
+
+            select_aliases = {a.alias.lower() for a in statement.find_all(exp.Alias)}
+            unresolved_sources = bool(cte_names or derived)
+
+            for column in statement.find_all(exp.Column):
+                if isinstance(column.this, exp.Star):
+                    continue
+                name = column.name.lower()
+                qualifier = column.table.lower()
+
+                if qualifier:
+                    table_name = aliases.get(qualifier)
+                    if table_name is None or schema[table_name] is None:
+                        continue  # CTE, subquery or a table already reported
+                    if name not in schema[table_name]:
+                        counts["unknown_columns"] += 1
+                        errors.append(f"Unknown column '{column.table}.{column.name}'")
+                elif not unresolved_sources and referenced and name not in select_aliases:
+                    if all(schema[t] is not None and name not in schema[t] for t in referenced):
+                        counts["unknown_columns"] += 1
+                        errors.append(f"Unknown column '{column.name}'")
+
+        # The same bad identifier is usually referenced more than once
+        return list(dict.fromkeys(errors)), counts
+
+    def validate(self, sql: str, tables: Any, db_type: Optional[str] = None) -> list[str]:
+        """
+        Check `sql` and record the outcome. Raises SQLValidationError in reject
+        mode; otherwise returns the problems found (empty when valid or off).
+        """
+        if self.mode == VALIDATION_OFF:
+            return []
+
+        errors, counts = self.check(sql, tables, db_type)
+        with self._lock:
+            self.checked += 1
+            self.parse_errors += counts["parse_errors"]
+            self.unknown_tables += counts["unknown_tables"]
+            self.unknown_columns += counts["unknown_columns"]
+            if not errors:
+                self.passed += 1
+            elif self.mode == VALIDATION_REJECT:
+                self.rejected += 1
+            else:
+                self.flagged += 1
+
+        if errors and self.mode == VALIDATION_REJECT:
+            raise SQLValidationError(errors)
+        return errors
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "checked": self.checked,
+            "passed": self.passed,
+            "rejected": self.rejected,
+            "flagged": self.flagged,
+            "parse_errors": self.parse_errors,
+            "unknown_tables": self.unknown_tables,
+            "unknown_columns": self.unknown_columns,
+            # Each rejection is a query MindsDB never had to run and fail
+            "round_trips_avoided": self.rejected,
+        }
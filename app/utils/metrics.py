@@ -0,0 +1,70 @@
+import threading
+from collections import deque
+from typing import Any
+
+
+class LatencyRecorder:
+    """Thread-safe rolling window of latency samples (seconds) with percentile stats."""
+
+    def __init__(self, window: int = 1000):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self.count
+
+        if not samples:
+            return {"count": count, "mean_ms": None, "p50_ms": None, "p95_ms": None}
+
+        def percentile(p: float) -> float:
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1)
+
+        return {
+            "count": count,
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 1),
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+        }
+
+
+class ChatStreamMetrics:
+    """Time-to-first-SQL-token on /chat/stream, split by sequential vs speculative generation."""
+
+    SEQUENTIAL = "sequential"
+    SPECULATIVE = "speculative"
+
+    def __init__(self):
+        self.first_sql_token = {
+            self.SEQUENTIAL: LatencyRecorder(),
+            self.SPECULATIVE: LatencyRecorder(),
+        }
+        self._lock = threading.Lock()
+        self.speculations_used = 0
+        self.speculations_cancelled = 0
+
+    def record_first_sql_token(self, mode: str, seconds: float):
+        self.first_sql_token[mode].record(seconds)
+
+    def speculation_finished(self, used: bool):
+        with self._lock:
+            if used:
+                self.speculations_used += 1
+            else:
+                self.speculations_cancelled += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "time_to_first_sql_token": {
+                mode: recorder.stats() for mode, recorder in self.first_sql_token.items()
+            },
+            "speculations_used": self.speculations_used,
+            "speculations_cancelled": self.speculations_cancelled,
+        }
@@ -0,0 +1,120 @@
+import asyncio
+import copy
+import threading
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def _shared_error(error: BaseException) -> BaseException:
+    """A copy of `error` for one more caller, so callers don't share (and grow) one traceback."""
+    try:
+        clone = copy.copy(error)
+    except Exception:
+        return error
+    clone.__traceback__ = None
+    clone.__cause__ = error
+    return clone
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls.
+
+    While a call for `key` is in flight, further callers with the same key
+    wait for it and receive its result (or exception) instead of running
+    `fn` again. Nothing is kept once the call finishes; this is not a
+    cache. `do` is for threads, `ado` for coroutines on one event loop.
+
+    In `ado` the call runs in its own task: a caller being cancelled only
+    stops that caller waiting, and the call itself is cancelled once no
+    caller is waiting for it any more.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self._flights: dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise _shared_error(call.error)
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _discard(self, key: Hashable, flight: _Flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight(asyncio.ensure_future(fn()))
+                flight.task.add_done_callback(lambda _, key=key, flight=flight: self._discard(key, flight))
+                self.executions += 1
+            else:
+                self.coalesced += 1
+            flight.waiters += 1
+
+        try:
+            # Shielded: a caller giving up must not cancel the call others wait for
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            raise _shared_error(e)
+        finally:
+            with self._lock:
+                flight.waiters -= 1
+                abandoned = flight.waiters == 0 and not flight.task.done()
+            if abandoned:
+                # New callers must start a fresh call rather than join one being cancelled
+                self._discard(key, flight)
+                flight.task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        total = self.executions + self.coalesced
+        return {
+            "in_flight": len(self._calls) + len(self._flights),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / total, 3) if total else None,
+        }
@@ -0,0 +1,277 @@
+import asyncio
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from app.managers.llm import LLMRegistry
+from app.managers.mindsdb_pool import MindsDBPool, _PooledConnection
+
+_WORDS = re.compile(r"\S+\s*")
+
+
+def estimate_tokens(text: str) -> int:
+    return max(len(text) // 4, 1)
+
+
+def prompt_text(messages: list[BaseMessage]) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+
+# LLM
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model answering `respond(prompt)` after a simulated latency.
+
+    The first token arrives after `first_token` seconds plus `per_input_token`
+    for every prompt token; the rest of the answer is streamed at
+    `per_output_token` seconds per token, `chunk_words` words per chunk.
+    """
+
+    respond: Callable[[str], str]
+    first_token: float = 0.0
+    per_input_token: float = 0.0
+    per_output_token: float = 0.0
+    chunk_words: int = 3
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _prefill(self, prompt: str) -> float:
+        return self.first_token + self.per_input_token * estimate_tokens(prompt)
+
+    def _chunks(self, text: str) -> list[str]:
+        words = _WORDS.findall(text) or [text]
+        step = max(self.chunk_words, 1)
+        return ["".join(words[i:i + step]) for i in range(0, len(words), step)]
+
+    def _result(self, prompt: str, text: str) -> ChatResult:
+        usage = {
+            "input_tokens": estimate_tokens(prompt),
+            "output_tokens": estimate_tokens(text),
+            "total_tokens": estimate_tokens(prompt) + estimate_tokens(text),
+        }
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = prompt_text(messages)
+        text = self.respond(prompt)
+        time.sleep(self._prefill(prompt) + self.per_output_token * estimate_tokens(text))
+        return self._result(prompt, text)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = prompt_text(messages)
+        text = self.respond(prompt)
+        await asyncio.sleep(self._prefill(prompt) + self.per_output_token * estimate_tokens(text))
+        return self._result(prompt, text)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        prompt = prompt_text(messages)
+        time.sleep(self._prefill(prompt))
+        for chunk in self._chunks(self.respond(prompt)):
+            time.sleep(self.per_output_token * estimate_tokens(chunk))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        prompt = prompt_text(messages)
+        await asyncio.sleep(self._prefill(prompt))
+        for chunk in self._chunks(self.respond(prompt)):
+            await asyncio.sleep(self.per_output_token * estimate_tokens(chunk))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+
+class FakeLLMRegistry(LLMRegistry):
+    """LLMRegistry whose clients are all `model`; scheduling and chain caching are the real ones."""
+
+    def __init__(self, model: FakeChatModel, **kwargs: Any):
+        super().__init__(api_key="fake", **kwargs)
+        self.model = model
+
+    def _client(self, model: str, temperature: float) -> FakeChatModel:
+        self._clients[(model, temperature)] = self.model
+        return self.model
+
+
+CHAT_SQL = "SELECT region, SUM(total) AS revenue FROM orders GROUP BY region ORDER BY revenue DESC"
+CHAT_SUMMARY = (
+    "Revenue is concentrated in the north and west regions, which together account for "
+    "more than half of all orders, while the south trails the other regions."
+)
+
+
+def chat_responder(intent: str = "analytical", sql: str = CHAT_SQL, summary: str = CHAT_SUMMARY) -> Callable[[str], str]:
+    """Answers for the DBChatService prompts, told apart by their wording."""
+    def respond(prompt: str) -> str:
+        if "Classify the user message" in prompt:
+            return intent
+        if "MindsDB SQL generation" in prompt:
+            return sql
+        if "SQL executed:" in prompt:
+            return summary
+        return "Please ask a question about your data."
+    return respond
+
+
+# MindsDB
+
+def make_catalog(tables: int, columns: int, prefix: str = "table") -> dict[str, dict[str, str]]:
+    """`tables` tables of `columns` columns each, with a key, a foreign key and a timestamp."""
+    types = ("varchar", "integer", "numeric", "boolean", "date")
+    catalog = {}
+    for t in range(tables):
+        name = f"{prefix}_{t:04d}"
+        table = {"id": "integer", f"{prefix}_{(t + 1) % tables:04d}_id": "integer", "created_at": "timestamp"}
+        for c in range(max(columns - len(table), 0)):
+            table[f"column_{c:03d}"] = types[c % len(types)]
+        catalog[name] = table
+    return catalog
+
+
+def make_result(rows: int, seed: int = 0) -> pd.DataFrame:
+    """A query result with the usual mix of MindsDB column types."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "order_id": np.arange(rows, dtype=np.int64),
+        "region": rng.choice(["north", "south", "east", "west"], rows),
+        "total": rng.gamma(2.0, 50.0, rows).round(2),
+        "quantity": rng.integers(1, 20, rows),
+        "paid": rng.random(rows) > 0.1,
+        "created_at": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24, rows), unit="h"),
+    })
+
+
+class FakeMindsDBServer:
+    """
+    In-memory stand-in for a `mindsdb_sdk` server.
+
+    Serves `SHOW TABLES` and INFORMATION_SCHEMA.COLUMNS from `catalogs`
+    ({datasource: {table: {column: type}}}) and any other query from
+    `result`. Every fetch costs `round_trip` seconds plus `per_row` seconds
+    per returned row. With `bulk=False` an unfiltered INFORMATION_SCHEMA
+    query fails, like engines that don't support it.
+    """
+
+    def __init__(
+        self,
+        catalogs: dict[str, dict[str, dict[str, str]]],
+        result: Optional[pd.DataFrame] = None,
+        round_trip: float = 0.0,
+        per_row: float = 0.0,
+        bulk: bool = True,
+    ):
+        self.catalogs = catalogs
+        self.result = result if result is not None else make_result(100)
+        self.round_trip = round_trip
+        self.per_row = per_row
+        self.bulk = bulk
+        self.queries = 0
+        self._lock = threading.Lock()
+        # Built up front, so the fake's own cost stays out of the timings
+        self._frames = {name: self._catalog_frames(catalog) for name, catalog in catalogs.items()}
+
+    @property
+    def databases(self) -> "FakeMindsDBServer":
+        return self
+
+    def get(self, name: str) -> "_FakeDatabase":
+        return _FakeDatabase(self, name)
+
+    def get_database(self, name: str) -> "_FakeDatabase":
+        return _FakeDatabase(self, name)
+
+    def query(self, sql: str) -> "_FakeQuery":
+        return _FakeQuery(self, None, sql)
+
+    def answer(self, datasource: Optional[str], sql: str) -> pd.DataFrame:
+        with self._lock:
+            self.queries += 1
+        sql = " ".join(sql.split())
+        upper = sql.upper()
+        catalog = self.catalogs.get(datasource or "", {})
+
+        if upper.startswith("SHOW TABLES"):
+            frame = pd.DataFrame({f"Tables_in_{datasource}": list(catalog)})
+        elif "INFORMATION_SCHEMA.COLUMNS" in upper:
+            frame = self._columns(datasource or "", sql, upper)
+        elif upper == "SELECT 1":
+            frame = pd.DataFrame({"1": [1]})
+        else:
+            frame = self.result
+
+        time.sleep(self.round_trip + self.per_row * len(frame))
+        return frame
+
+    @staticmethod
+    def _catalog_frames(catalog: dict[str, dict[str, str]]) -> tuple[pd.DataFrame, dict[str, pd.DataFrame]]:
+        """All columns of a datasource, and per table in the per-table query's layout."""
+        rows = [(table, column, data_type)
+                for table, columns in catalog.items() for column, data_type in columns.items()]
+        frame = pd.DataFrame(rows, columns=["TABLE_NAME", "COLUMN_NAME", "DATA_TYPE"])
+        tables = {
+            table: group.assign(IS_NULLABLE="YES")[["COLUMN_NAME", "IS_NULLABLE", "DATA_TYPE"]]
+            for table, group in frame.groupby("TABLE_NAME", sort=False)
+        }
+        return frame, tables
+
+    def _columns(self, datasource: str, sql: str, upper: str) -> pd.DataFrame:
+        frame, tables = self._frames.get(datasource) or self._catalog_frames({})
+
+        if "WHERE" not in upper:
+            if not self.bulk:
+                raise Exception("unfiltered INFORMATION_SCHEMA queries are not supported")
+            return frame
+        names = [n.replace("''", "'") for n in re.findall(r"'((?:[^']|'')*)'", sql[upper.index("WHERE"):])]
+        if upper.startswith("SELECT DISTINCT"):
+            return frame[frame["TABLE_NAME"].isin(names)][["TABLE_NAME", "COLUMN_NAME"]]
+        return tables.get(names[0], frame.iloc[:0, [1, 2]].assign(IS_NULLABLE="YES"))
+
+
+class _FakeDatabase:
+    def __init__(self, server: FakeMindsDBServer, name: str):
+        self.server = server
+        self.name = name
+
+    def query(self, sql: str) -> "_FakeQuery":
+        return _FakeQuery(self.server, self.name, sql)
+
+
+class _FakeQuery:
+    def __init__(self, server: FakeMindsDBServer, datasource: Optional[str], sql: str):
+        self.server = server
+        self.datasource = datasource
+        self.sql = sql
+
+    def fetch(self) -> pd.DataFrame:
+        return self.server.answer(self.datasource, self.sql)
+
+
+class FakeMindsDBPool(MindsDBPool):
+    """The real session pool, handing out sessions of `server`."""
+
+    def __init__(self, server: FakeMindsDBServer, **kwargs: Any):
+        self.server = server
+        super().__init__(url="fake://mindsdb", **kwargs)
+
+    def _connect(self) -> _PooledConnection:
+        self.created += 1
+        return _PooledConnection(self.server)
+
+
+# Auth
+
+class FakeAuthManager:
+    """Accepts every token, as a warm token cache would."""
+
+    async def averify(self, token: str) -> tuple[dict[str, Any], str]:
+        return {"id": "bench-user"}, "bench-user"
+
+    def stats(self) -> dict[str, Any]:
+        return {}
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Optional
+
+# Required by Settings; the benchmarks never reach MindsDB, Supabase or Gemini
+for _name in (
+    "MINDSDB_URL", "SUPABASE_URL", "SUPABASE_ANON_KEY", "SUPABASE_SERVICE_ROLE_KEY",
+    "GEMINI_API_KEY", "DEMO_ACCOUNT_EMAIL", "DEMO_ACCOUNT_PASSWORD",
+):
+    os.environ.setdefault(_name, "benchmark")
+
+from fastapi import FastAPI  # noqa: E402
+from loguru import logger  # noqa: E402
+
+from app.managers.executors import ExecutorManager  # noqa: E402
+from app.managers.mindsdb import MindsDBManager  # noqa: E402
+from app.routes.chat import router as chat_router  # noqa: E402
+from app.utils.metrics import ChatStreamMetrics  # noqa: E402
+from app.utils.serialization import FastJSONResponse  # noqa: E402
+from benchmarks.fakes import FakeAuthManager, FakeLLMRegistry, FakeMindsDBPool, FakeMindsDBServer  # noqa: E402
+
+# Client creation and cache logs would interleave with the results
+logger.remove()
+logger.add(sys.stderr, level="WARNING")
+
+CHAT_PAYLOAD = {
+    "user_message": "Revenue by region",
+    "db_type": "postgres",
+    "db_name": "shop",
+    "tables": {"orders": {"order_id": "integer", "region": "varchar", "total": "numeric"}},
+    "relationships": [],
+    "semantics": [],
+}
+
+
+def ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.3f}"
+
+
+def percentile(samples: list[float], p: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    """Fastest of `repeat` runs of `fn`, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def print_table(title: str, headers: list[str], rows: list[list[Any]]):
+    cells = [headers] + [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    print(f"\n{title}")
+    for i, row in enumerate(cells):
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+        if i == 0:
+            print("  ".join("-" * width for width in widths))
+
+
+def chat_app(llm_registry: FakeLLMRegistry, server: FakeMindsDBServer, middleware: Optional[type] = None) -> FastAPI:
+    """The /chat routes with real managers over the fake LLM and MindsDB."""
+    app = FastAPI(default_response_class=FastJSONResponse)
+    if middleware is not None:
+        app.add_middleware(middleware)
+    app.include_router(chat_router, prefix="/chat")
+
+    app.state.auth_manager = FakeAuthManager()
+    app.state.executors = ExecutorManager(mindsdb_workers=4, supabase_workers=1, llm_workers=4)
+    app.state.minds_db_manager = MindsDBManager(FakeMindsDBPool(server))
+    app.state.llm_registry = llm_registry
+    app.state.sql_cache = None
+    app.state.schema_retriever = None
+    app.state.chat_metrics = ChatStreamMetrics()
+    app.state.intent_classifier = None
+    app.state.sql_validator = None
+    return app
+
+
+async def asgi_request(
+    app: Any, method: str, path: str, body: Any = None, headers: Optional[dict[str, str]] = None
+) -> list[tuple[float, bytes]]:
+    """
+    Drive `app` with one HTTP request over plain ASGI, without a server or
+    client in between. Returns every response body message with the
+    `perf_counter` time it was sent.
+    """
+    payload = json.dumps(body).encode() if body is not None else b""
+    raw_headers = [(b"content-type", b"application/json")] + [
+        (k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": raw_headers,
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    finished = asyncio.Event()
+    received = False
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    messages: list[tuple[float, bytes]] = []
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            messages.append((time.perf_counter(), message.get("body", b"")))
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    finished.set()
+    return messages
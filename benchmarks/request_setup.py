@@ -0,0 +1,76 @@
+"""
+Per-request setup cost of the LLM-backed services.
+
+"per request" builds every service on a fresh LLMRegistry, which is what
+constructing ChatGoogleGenerativeAI clients and chains in each service's
+__init__ amounted to; "shared" builds them on one warm registry, as the
+routes now do. Clients are real ChatGoogleGenerativeAI instances with a
+placeholder key; nothing is sent to the model API.
+
+    python -m benchmarks.request_setup [--requests 200]
+"""
+import argparse
+import time
+from typing import Callable
+
+from benchmarks.harness import ms, percentile, print_table
+from app.managers.llm import LLMRegistry
+from app.managers.llm_scheduler import LLMScheduler
+from app.services.analytics_generation import AnalyticsGenerationService
+from app.services.db_chat import DBChatService
+from app.services.db_relationships_analyzer import DBRelationshipsAnalyzer
+from app.services.db_semantics_analyzer import DBSemanticsAnalyzer
+
+SERVICES: dict[str, Callable[[LLMRegistry], object]] = {
+    "DBChatService": lambda registry: DBChatService(registry, minds_db_manager=None),
+    "AnalyticsGenerationService": AnalyticsGenerationService,
+    "DBRelationshipsAnalyzer": DBRelationshipsAnalyzer,
+    "DBSemanticsAnalyzer": DBSemanticsAnalyzer,
+}
+
+
+def _setup_times(build: Callable[[LLMRegistry], object], registry: Callable[[], LLMRegistry], requests: int):
+    timings = []
+    registries: list[LLMRegistry] = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        current = registry()
+        build(current)
+        timings.append(time.perf_counter() - started)
+        if not any(current is seen for seen in registries):
+            registries.append(current)
+    return timings, sum(len(seen._clients) for seen in registries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200, help="requests per service and variant")
+    args = parser.parse_args()
+
+    scheduler = LLMScheduler()
+    shared = LLMRegistry(api_key="benchmark", scheduler=scheduler)
+    for build in SERVICES.values():
+        build(LLMRegistry(api_key="benchmark", scheduler=scheduler))  # imports and first-client setup
+
+    rows = []
+    for name, build in SERVICES.items():
+        variants = {
+            "per request": lambda: LLMRegistry(api_key="benchmark", scheduler=scheduler),
+            "shared": lambda: shared,
+        }
+        for variant, registry in variants.items():
+            timings, clients = _setup_times(build, registry, args.requests)
+            rows.append([
+                name, variant, ms(sum(timings) / len(timings)),
+                ms(percentile(timings, 0.5)), ms(percentile(timings, 0.95)), clients,
+            ])
+
+    print_table(
+        f"Service setup, {args.requests} requests each",
+        ["service", "registry", "mean ms", "p50 ms", "p95 ms", "clients"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
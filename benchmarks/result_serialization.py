@@ -0,0 +1,95 @@
+"""
+Latency, size and peak memory of serializing query results, 10k to 1M rows.
+
+"records via jsonable_encoder" is the previous path: `to_dict("records")`
+through FastAPI's default encoder. The others are the formats
+/datasources/query now offers, encoded with `app.utils.serialization.dumps`.
+Peak memory is traced in a separate run, so it doesn't slow the timings.
+
+    python -m benchmarks.result_serialization [--rows 10000,100000,1000000] [--baseline-max-rows 100000]
+"""
+import argparse
+import json
+import tracemalloc
+from decimal import Decimal
+from typing import Any, Callable
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.harness import best_of, print_table
+from app.services.result_format import to_arrow_ipc, to_columnar, to_records
+from app.utils.serialization import dumps
+from benchmarks.fakes import make_result
+
+
+def _frame(rows: int):
+    """The fake result plus the NaN and Decimal values MindsDB results carry."""
+    frame = make_result(rows)
+    discount = np.round(frame["total"].to_numpy() * 0.1, 2)
+    discount[::7] = np.nan
+    frame["discount"] = discount
+    frame["amount"] = [Decimal(f"{value:.2f}") for value in frame["total"]]
+    return frame
+
+
+def _before(frame) -> bytes:
+    return json.dumps(jsonable_encoder(frame.to_dict("records"))).encode()
+
+
+def _arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _peak_bytes(fn: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", default="10000,100000,1000000", help="comma-separated result sizes")
+    parser.add_argument("--baseline-max-rows", type=int, default=100000,
+                        help="skip the jsonable_encoder baseline above this size")
+    parser.add_argument("--rounds", type=int, default=3, help="runs per variant; the best is reported")
+    args = parser.parse_args()
+
+    variants: dict[str, Callable[[Any], bytes]] = {
+        "records via jsonable_encoder (before)": _before,
+        "records": lambda frame: dumps(to_records(frame)),
+        "columnar": lambda frame: dumps(to_columnar(frame)),
+    }
+    if _arrow_available():
+        variants["arrow"] = to_arrow_ipc
+
+    rows = []
+    for size in (int(n) for n in args.rows.split(",")):
+        frame = _frame(size)
+        for name, encode in variants.items():
+            if encode is _before and size > args.baseline_max_rows:
+                continue
+            body = encode(frame)
+            seconds = best_of(args.rounds, lambda: encode(frame))
+            peak = _peak_bytes(lambda: encode(frame))
+            rows.append([
+                f"{size:,}", name, f"{seconds * 1000:,.0f}", f"{size / seconds:,.0f}",
+                f"{len(body) / 2**20:,.1f}", f"{peak / 2**20:,.1f}",
+            ])
+
+    print_table(
+        "Query result serialization" + ("" if _arrow_available() else " (pyarrow not installed: no arrow)"),
+        ["rows", "format", "ms", "rows/s", "body MiB", "peak MiB"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Schema introspection against a fake MindsDB returning large catalogs.
+
+Compares the per-table INFORMATION_SCHEMA queries introspection used to run
+with the single bulk query, for datasources introspected one after another
+and in parallel, and the fallback for engines that reject the bulk query.
+Every query costs a simulated round trip plus a per-row transfer time.
+
+    python -m benchmarks.schema_introspection [--tables 100,800] [--datasources 3] [--round-trip-ms 2]
+"""
+import argparse
+import time
+
+from benchmarks.harness import best_of, print_table
+from app.managers.mindsdb import MindsDBManager
+from benchmarks.fakes import FakeMindsDBPool, FakeMindsDBServer, make_catalog
+
+
+def _introspect(server: FakeMindsDBServer, names: list[str], workers: int, per_table: bool) -> tuple[float, int, dict]:
+    manager = MindsDBManager(FakeMindsDBPool(server, max_size=max(workers, 1)), introspection_workers=workers)
+    if per_table:
+        manager._bulk_unsupported.update({name: float("inf") for name in names})
+    queries = server.queries
+    started = time.perf_counter()
+    schemas = manager.get_datasources_tables_and_schemas_by_names(names)
+    return time.perf_counter() - started, server.queries - queries, schemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tables", default="100,800", help="comma-separated tables per datasource")
+    parser.add_argument("--columns", type=int, default=20, help="columns per table")
+    parser.add_argument("--datasources", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4, help="parallel introspection workers")
+    parser.add_argument("--round-trip-ms", type=float, default=2.0)
+    parser.add_argument("--per-row-us", type=float, default=1.0)
+    parser.add_argument("--rounds", type=int, default=1, help="runs per variant; the best is reported")
+    args = parser.parse_args()
+
+    rows = []
+    for tables in (int(n) for n in args.tables.split(",")):
+        names = [f"warehouse_{i}" for i in range(args.datasources)]
+        catalogs = {name: make_catalog(tables, args.columns) for name in names}
+        latency = {"round_trip": args.round_trip_ms / 1000, "per_row": args.per_row_us / 1e6}
+        variants = [
+            ("per-table (before)", FakeMindsDBServer(catalogs, **latency), 1, True),
+            ("per-table, parallel", FakeMindsDBServer(catalogs, **latency), args.workers, True),
+            ("bulk", FakeMindsDBServer(catalogs, **latency), 1, False),
+            ("bulk, parallel", FakeMindsDBServer(catalogs, **latency), args.workers, False),
+            ("no bulk support, parallel", FakeMindsDBServer(catalogs, bulk=False, **latency), args.workers, False),
+        ]
+
+        expected = None
+        for name, server, workers, per_table in variants:
+            result = {}
+
+            def run():
+                result["elapsed"], result["queries"], result["schemas"] = _introspect(
+                    server, names, workers, per_table)
+
+            best_of(args.rounds, run)
+            expected = expected or result["schemas"]
+            assert result["schemas"] == expected, f"{name} returned a different schema"
+            rows.append([
+                tables, name, workers, f"{result['queries'] / args.datasources:.0f}",
+                f"{result['elapsed']:.3f}",
+            ])
+
+    print_table(
+        f"Introspection of {args.datasources} datasources x {args.columns} columns per table, "
+        f"{args.round_trip_ms:g} ms round trip",
+        ["tables", "variant", "workers", "queries/datasource", "seconds"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Semantics generation wall clock on 50, 500 and 2000-table fake schemas.
+
+"single prompt" is the whole schema in one call, as before batching (a
+batch budget no schema reaches); "map-reduce" is DBSemanticsAnalyzer's
+token-budgeted batches at the configured concurrency. The fake model
+describes every table it is sent, at a fixed time to first token plus a
+generation rate, and cuts answers off at `--max-output-tokens` like the
+real API, so oversized single answers fail to parse.
+
+    python -m benchmarks.semantics_generation [--tables 50,500,2000] [--concurrency 4]
+"""
+import argparse
+import json
+import threading
+import time
+
+from benchmarks.harness import print_table
+from app.services.db_semantics_analyzer import DBSemanticsAnalyzer
+from benchmarks.fakes import FakeChatModel, FakeLLMRegistry, estimate_tokens, make_catalog
+
+
+class SemanticsResponder:
+    """Describes the tables of the schema in a SEMANTICS_GENERATION_PROMPT."""
+
+    def __init__(self, max_output_tokens: int):
+        self.max_output_tokens = max_output_tokens
+        self.calls = 0
+        self.truncated = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt: str) -> str:
+        schema = json.loads(prompt.split("Database Schema:", 1)[1].split("Instructions:", 1)[0])
+        answer = json.dumps({"tables": [
+            {
+                "table_name": table,
+                "semantic_description": f"Records of {table} kept for reporting on the business process it tracks over time.",
+                "columns": [
+                    {"column_name": column, "semantic_description": f"The {column} value of each {table} record."}
+                    for column in columns
+                ],
+            }
+            for table, columns in schema.items()
+        ]})
+        with self._lock:
+            self.calls += 1
+            if estimate_tokens(answer) > self.max_output_tokens:
+                self.truncated += 1
+                answer = answer[:self.max_output_tokens * 4]
+        return answer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tables", default="50,500,2000", help="comma-separated schema sizes")
+    parser.add_argument("--columns", type=int, default=8, help="columns per table")
+    parser.add_argument("--batch-tokens", type=int, default=6000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--first-token-ms", type=float, default=500.0)
+    parser.add_argument("--output-tokens-per-s", type=float, default=20000.0,
+                        help="generation rate; raise it to shorten runs, ratios stay the same")
+    parser.add_argument("--max-output-tokens", type=int, default=65536)
+    args = parser.parse_args()
+
+    variants = {
+        "single prompt (before)": {"batch_tokens": 2**62, "batch_retries": 0},
+        "map-reduce": {"batch_tokens": args.batch_tokens, "max_concurrency": args.concurrency},
+    }
+
+    rows = []
+    for size in (int(n) for n in args.tables.split(",")):
+        schema = make_catalog(size, args.columns)
+        for name, options in variants.items():
+            responder = SemanticsResponder(args.max_output_tokens)
+            model = FakeChatModel(
+                respond=responder,
+                first_token=args.first_token_ms / 1000,
+                per_output_token=1 / args.output_tokens_per_s,
+            )
+            analyzer = DBSemanticsAnalyzer(FakeLLMRegistry(model), **options)
+
+            started = time.perf_counter()
+            try:
+                described = f"{len(analyzer.analyze_semantics(schema).tables)}/{size}"
+            except Exception as e:
+                described = f"failed ({type(e).__name__})"
+            elapsed = time.perf_counter() - started
+            rows.append([size, name, responder.calls, responder.truncated, described, f"{elapsed:.2f}"])
+
+    print_table(
+        f"Semantics generation, {args.columns} columns per table, {args.output_tokens_per_s:,.0f} output tokens/s",
+        ["tables", "variant", "LLM calls", "truncated", "tables described", "seconds"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Time to first SQL token on /chat/stream, sequential vs speculative.
+
+Runs DBChatService.stream_response against a fake model with a fixed
+time to first token and a streaming rate, with the local intent classifier
+off so every request pays the classifier call. Reports the
+ChatStreamMetrics time-to-first-SQL-token, the whole stream, and for
+generic messages the speculations that were started and cancelled.
+
+    python -m benchmarks.speculative_sql [--requests 10] [--first-token-ms 400]
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.harness import CHAT_PAYLOAD, print_table
+from app.managers.mindsdb import MindsDBManager
+from app.services.db_chat import DBChatService
+from app.utils.metrics import ChatStreamMetrics
+from benchmarks.fakes import FakeChatModel, FakeLLMRegistry, FakeMindsDBPool, FakeMindsDBServer, chat_responder
+
+
+async def _run(service: DBChatService, requests: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> float:
+        async with semaphore:
+            started = time.perf_counter()
+            async for _ in service.stream_response(CHAT_PAYLOAD):
+                pass
+            return time.perf_counter() - started
+
+    return await asyncio.gather(*(one() for _ in range(requests)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--first-token-ms", type=float, default=400.0, help="model time to first token")
+    parser.add_argument("--output-tokens-per-s", type=float, default=100.0)
+    args = parser.parse_args()
+
+    server = FakeMindsDBServer({})
+    rows = []
+    for intent in ("analytical", "generic"):
+        model = FakeChatModel(
+            respond=chat_responder(intent=intent),
+            first_token=args.first_token_ms / 1000,
+            per_output_token=1 / args.output_tokens_per_s,
+        )
+        for speculative in (False, True):
+            metrics = ChatStreamMetrics()
+            service = DBChatService(
+                FakeLLMRegistry(model),
+                MindsDBManager(FakeMindsDBPool(server)),
+                speculative_sql=speculative,
+                metrics=metrics,
+            )
+            totals = asyncio.run(_run(service, args.requests, args.concurrency))
+            mode = ChatStreamMetrics.SPECULATIVE if speculative else ChatStreamMetrics.SEQUENTIAL
+            first = metrics.stats()["time_to_first_sql_token"][mode]
+            rows.append([
+                intent, mode,
+                first["p50_ms"] if first["p50_ms"] is not None else "-",
+                first["p95_ms"] if first["p95_ms"] is not None else "-",
+                f"{sorted(totals)[len(totals) // 2] * 1000:.0f}",
+                metrics.speculations_cancelled,
+            ])
+
+    print_table(
+        f"/chat/stream, {args.requests} requests ({args.concurrency} concurrent), "
+        f"{args.first_token_ms:g} ms to first token",
+        ["intent", "mode", "first SQL token p50 ms", "p95 ms", "stream p50 ms", "speculations cancelled"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
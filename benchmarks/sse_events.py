@@ -0,0 +1,103 @@
+"""
+Events per second on /chat/stream by JSON encoder.
+
+"json.dumps" is the previous `_format_sse` (stdlib, `default=str` so the
+pandas values in row batches don't fail it); "stdlib fallback" is
+`app.utils.serialization.dumps` without orjson; "orjson" is the same with
+orjson. Measured once for the encoder alone on token and row-batch events,
+and once end to end over plain ASGI against a fake LLM and MindsDB.
+
+    python -m benchmarks.sse_events [--streams 10] [--tokens 500] [--rows 5000]
+"""
+import argparse
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from typing import Any
+
+from benchmarks.harness import CHAT_PAYLOAD, asgi_request, best_of, chat_app, print_table
+from app.services.db_chat import DBChatService
+from app.utils import serialization
+from benchmarks.fakes import FakeChatModel, FakeLLMRegistry, FakeMindsDBServer, chat_responder, make_result
+
+
+def _json_dumps_sse(event_type: str, data: dict[str, Any]) -> bytes:
+    return (json.dumps({"event": event_type, "data": data}, default=str) + "\n\n").encode()
+
+
+@contextmanager
+def _encoder(name: str):
+    original_format = DBChatService.__dict__["_format_sse"]
+    original_orjson = serialization.orjson
+    if name == "json.dumps (before)":
+        DBChatService._format_sse = staticmethod(_json_dumps_sse)
+    elif name == "stdlib fallback":
+        serialization.orjson = None
+    try:
+        yield DBChatService._format_sse
+    finally:
+        DBChatService._format_sse = original_format
+        serialization.orjson = original_orjson
+
+
+async def _streams(app, count: int) -> tuple[int, int]:
+    results = await asyncio.gather(*(
+        asgi_request(app, "POST", "/chat/stream", CHAT_PAYLOAD, {"Authorization": "Bearer bench"})
+        for _ in range(count)
+    ))
+    bodies = [body for messages in results for _, body in messages if body]
+    return len(bodies), sum(len(body) for body in bodies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--streams", type=int, default=10, help="concurrent streams")
+    parser.add_argument("--tokens", type=int, default=500, help="summary chunks per stream")
+    parser.add_argument("--rows", type=int, default=5000, help="result rows per stream")
+    parser.add_argument("--rounds", type=int, default=3, help="runs per variant; the best is reported")
+    args = parser.parse_args()
+
+    encoders = ["json.dumps (before)", "stdlib fallback"] + (["orjson"] if serialization.orjson else [])
+    frame = make_result(args.rows)
+    batch = frame.iloc[:500].to_dict("records")
+
+    micro = []
+    for name in encoders:
+        with _encoder(name) as format_sse:
+            for event, data, count in (
+                ("summary_chunk", {"content": "word "}, 100000),
+                ("data_chunk", {"offset": 0, "rows": batch}, 200),
+            ):
+                seconds = best_of(args.rounds, lambda: [format_sse(event, data) for _ in range(count)])
+                micro.append([name, event, f"{count / seconds:,.0f}"])
+
+    summary = " ".join(f"word{i}" for i in range(args.tokens))
+    model = FakeChatModel(respond=chat_responder(summary=summary), chunk_words=1)
+    server = FakeMindsDBServer({}, result=frame)
+    end_to_end = []
+    for name in encoders:
+        with _encoder(name):
+            app = chat_app(FakeLLMRegistry(model), server)
+            asyncio.run(_streams(app, 1))
+            best = None
+            for _ in range(args.rounds):
+                started = time.perf_counter()
+                events, size = asyncio.run(_streams(app, args.streams))
+                elapsed = time.perf_counter() - started
+                if best is None or elapsed < best[2]:
+                    best = (events, size, elapsed)
+            events, size, elapsed = best
+            end_to_end.append([name, events, f"{events / elapsed:,.0f}", f"{size / elapsed / 2**20:,.1f}"])
+            app.state.executors.shutdown()
+
+    print_table("SSE frame encoding alone", ["encoder", "event", "events/s"], micro)
+    print_table(
+        f"/chat/stream, {args.streams} concurrent streams, {args.rows} rows + {args.tokens} summary chunks each",
+        ["encoder", "events", "events/s", "MiB/s"],
+        end_to_end,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Per-event latency and throughput of /chat/stream behind the auth middleware.
+
+Compares the pure ASGI AuthMiddleware with the BaseHTTPMiddleware version it
+replaced (the same token check, with Starlette wrapping the response), and
+no middleware as the floor. Requests are driven over plain ASGI against a
+fake LLM and MindsDB, so the numbers are framework overhead only. Latency is
+from an event being formatted by DBChatService to it reaching the server.
+
+    python -m benchmarks.sse_stream [--streams 20] [--events 400] [--rounds 3]
+"""
+import argparse
+import asyncio
+import contextvars
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from benchmarks.harness import CHAT_PAYLOAD, asgi_request, chat_app, ms, percentile, print_table
+from app.middleware.auth import AuthMiddleware
+from app.services.db_chat import DBChatService
+from benchmarks.fakes import FakeChatModel, FakeLLMRegistry, FakeMindsDBServer, chat_responder, make_result
+
+# Formatting times of the events of the stream running in this context
+_produced: contextvars.ContextVar[list[float]] = contextvars.ContextVar("produced")
+
+
+class BaseHTTPAuthMiddleware(BaseHTTPMiddleware):
+    """The auth check as a BaseHTTPMiddleware, as it was before."""
+
+    async def dispatch(self, request: Request, call_next):
+        auth_header = request.headers.get("Authorization", "")
+        if not auth_header.startswith("Bearer "):
+            return JSONResponse({"detail": "Auth header format is invalid"}, status_code=401)
+        auth_manager = request.app.state.auth_manager
+        request.state.user, request.state.user_id = await auth_manager.averify(auth_header.split(" ")[1])
+        return await call_next(request)
+
+
+def _timed_format_sse(format_sse):
+    def wrapper(event_type, data):
+        event = format_sse(event_type, data)
+        _produced.get().append(time.perf_counter())
+        return event
+    return staticmethod(wrapper)
+
+
+async def _stream(app) -> tuple[list[float], int]:
+    produced: list[float] = []
+    _produced.set(produced)
+    messages = await asgi_request(
+        app, "POST", "/chat/stream", CHAT_PAYLOAD, {"Authorization": "Bearer bench"})
+    events = [sent for sent, body in messages if body]
+    return [sent - made for made, sent in zip(produced, events)], len(events)
+
+
+async def _run(app, streams: int) -> tuple[list[float], int, float]:
+    started = time.perf_counter()
+    results = await asyncio.gather(*(_stream(app) for _ in range(streams)))
+    elapsed = time.perf_counter() - started
+    latencies = [latency for stream, _ in results for latency in stream]
+    return latencies, sum(count for _, count in results), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--streams", type=int, default=20, help="concurrent streams")
+    parser.add_argument("--events", type=int, default=400, help="summary chunks per stream")
+    parser.add_argument("--rounds", type=int, default=3, help="runs per variant; the best is reported")
+    args = parser.parse_args()
+
+    summary = " ".join(f"word{i}" for i in range(args.events))
+    model = FakeChatModel(respond=chat_responder(summary=summary), chunk_words=1)
+    server = FakeMindsDBServer({}, result=make_result(2000))
+    variants = {
+        "none": None,
+        "BaseHTTPMiddleware (before)": BaseHTTPAuthMiddleware,
+        "pure ASGI (AuthMiddleware)": AuthMiddleware,
+    }
+
+    original = DBChatService.__dict__["_format_sse"].__func__
+    DBChatService._format_sse = _timed_format_sse(original)
+    try:
+        rows = []
+        for name, middleware in variants.items():
+            app = chat_app(FakeLLMRegistry(model), server, middleware)
+            asyncio.run(_run(app, 1))  # warm up routing and chain construction
+            best = None
+            for _ in range(args.rounds):
+                latencies, events, elapsed = asyncio.run(_run(app, args.streams))
+                if best is None or elapsed < best[2]:
+                    best = (latencies, events, elapsed)
+            latencies, events, elapsed = best
+            rows.append([
+                name, events, f"{events / elapsed:,.0f}",
+                ms(percentile(latencies, 0.5)), ms(percentile(latencies, 0.95)), ms(percentile(latencies, 0.99)),
+            ])
+            app.state.executors.shutdown()
+    finally:
+        DBChatService._format_sse = staticmethod(original)
+
+    print_table(
+        f"/chat/stream, {args.streams} concurrent streams",
+        ["middleware", "events", "events/s", "p50 ms", "p95 ms", "p99 ms"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Summary latency versus result size.
+
+"raw rows" sends every row to SUMMARY_PROMPT, as before profiling; "profile"
+sends `summarize_result` within SUMMARY_TOKEN_BUDGET. Preparation (profiling
+plus prompt rendering through the real summary chain) is measured; the model
+time is modelled from the prompt size, since sleeping through a
+million-token prefill would only measure the sleep.
+
+    python -m benchmarks.summary_latency [--rows 100,1000,10000,50000] [--budget 2000]
+"""
+import argparse
+import time
+
+from benchmarks.harness import print_table
+from app.services.db_chat import DBChatService
+from app.services.result_profiler import summarize_result
+from benchmarks.fakes import CHAT_SUMMARY, FakeChatModel, FakeLLMRegistry, estimate_tokens, make_result
+
+SQL = "SELECT * FROM orders"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", default="100,1000,10000,50000", help="comma-separated result sizes")
+    parser.add_argument("--budget", type=int, default=2000, help="summary token budget")
+    parser.add_argument("--first-token-ms", type=float, default=300.0, help="modelled fixed model latency")
+    parser.add_argument("--prefill-tokens-per-s", type=float, default=20000.0, help="modelled prompt processing rate")
+    parser.add_argument("--output-tokens-per-s", type=float, default=100.0, help="modelled generation rate")
+    args = parser.parse_args()
+
+    prompt_tokens: list[int] = []
+
+    def respond(prompt: str) -> str:
+        prompt_tokens.append(estimate_tokens(prompt))
+        return CHAT_SUMMARY
+
+    service = DBChatService(FakeLLMRegistry(FakeChatModel(respond=respond)), minds_db_manager=None)
+    generation = estimate_tokens(CHAT_SUMMARY) / args.output_tokens_per_s
+
+    variants = {
+        "raw rows (before)": lambda frame: frame.to_dict("records"),
+        "profile": lambda frame: summarize_result(frame, args.budget),
+    }
+
+    rows = []
+    for size in (int(n) for n in args.rows.split(",")):
+        frame = make_result(size)
+        for name, digest in variants.items():
+            started = time.perf_counter()
+            service.summary_chain.invoke({"user_message": "Summarize the orders", "sql_query": SQL, "data": digest(frame)})
+            prepare = time.perf_counter() - started
+            tokens = prompt_tokens[-1]
+            model = args.first_token_ms / 1000 + tokens / args.prefill_tokens_per_s + generation
+            rows.append([size, name, f"{tokens:,}", f"{prepare * 1000:.1f}", f"{model:.2f}", f"{prepare + model:.2f}"])
+
+    print_table(
+        f"Summary of a result, {args.budget}-token budget",
+        ["rows", "data", "prompt tokens", "prepare ms", "model s (modelled)", "total s"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import jwt
+
+from app.managers.auth import USER_FIELDS, AuthManager
+
+SECRET = "test-secret-that-is-long-enough-for-hs256"
+
+
+class FakeExecutors:
+    async def supabase(self, fn, *args):
+        return fn(*args)
+
+
+class FakeSupabaseAuth:
+    def get_user(self, token):
+        return SimpleNamespace(user=SimpleNamespace(
+            id="remote-user", email="remote@example.com", role="authenticated", aud="authenticated",
+            app_metadata={}, user_metadata={}))
+
+
+def token(secret=SECRET, **claims):
+    claims = {"sub": "local-user", "email": "local@example.com", "role": "authenticated",
+              "aud": "authenticated", "exp": time.time() + 60} | claims
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+def manager():
+    return AuthManager(SimpleNamespace(auth=FakeSupabaseAuth()), FakeExecutors(), SECRET, "HS256", "authenticated")
+
+
+def test_local_and_remote_users_have_the_same_shape():
+    auth = manager()
+    local, local_id = asyncio.run(auth.averify(token()))
+    # Signed with another secret: Supabase decides instead of a 401
+    remote, remote_id = asyncio.run(auth.averify(token(secret="rotated-secret-that-is-long-enough-too")))
+
+    assert (local_id, remote_id) == ("local-user", "remote-user")
+    assert set(local) == set(remote) == set(USER_FIELDS)
+    assert (local["id"], remote["id"]) == (local_id, remote_id)
+    stats = auth.stats()
+    assert (stats["local_verifications"], stats["remote_verifications"]) == (1, 1)
@@ -0,0 +1,33 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.managers.executors import ExecutorManager
+
+
+def test_queued_counter_drops_cancelled_work():
+    async def main():
+        executors = ExecutorManager(mindsdb_workers=1, supabase_workers=1, llm_workers=1)
+        release = threading.Event()
+        running = asyncio.create_task(executors.mindsdb(release.wait))
+        waiting = asyncio.create_task(executors.mindsdb(release.wait))
+        await asyncio.sleep(0.05)
+        assert executors.stats()["mindsdb"]["queued"] == 1
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert executors.stats()["mindsdb"]["queued"] == 0
+
+        pending = asyncio.create_task(executors.mindsdb(release.wait))
+        await asyncio.sleep(0.05)
+        executors.shutdown()
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+        release.set()
+        await running
+        return executors.stats()["mindsdb"]
+
+    stats = asyncio.run(main())
+    assert (stats["queued"], stats["active"], stats["completed"]) == (0, 0, 1)
@@ -0,0 +1,33 @@
+from app.services.intent_classifier import ANALYTICAL, GENERIC, FastIntentClassifier
+
+TABLES = {"orders": {"id": "int", "total": "numeric", "customer_id": "int"}, "customers": {"id": "int", "email": "text"}}
+
+
+def classify(message, tables=TABLES):
+    return FastIntentClassifier(threshold=0.8).classify(message, tables)
+
+
+def test_greetings_are_fast_pathed():
+    assert classify("hi there!") == GENERIC
+    assert classify("how are you?") == GENERIC
+    assert classify("thanks a lot") == GENERIC
+
+
+def test_question_words_alone_are_not_greetings():
+    assert classify("how much?") is None
+    assert FastIntentClassifier().score("what is it")[1] < 0.8
+
+
+def test_how_without_aggregation_phrase_is_escalated():
+    assert classify("how do I use the orders table") is None
+
+
+def test_aggregation_phrases_are_analytical():
+    assert classify("how many orders per month") == ANALYTICAL
+    assert classify("total orders by customer") == ANALYTICAL
+
+
+def test_aggregation_phrases_match_whole_words_only():
+    classifier = FastIntentClassifier()
+    intent, confidence = classifier.score("showhow manyfold orders", TABLES)
+    assert confidence < 0.8
@@ -0,0 +1,32 @@
+import asyncio
+
+from app.managers import jobs
+from app.managers.jobs import SUCCEEDED, JobManager
+
+
+def test_expired_jobs_are_pruned_as_jobs_finish(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "_PRUNE_INTERVAL", 0)
+
+    async def work(job):
+        return {"ok": True}
+
+    async def main():
+        manager = JobManager(str(tmp_path / "jobs.sqlite3"), workers=1, retention=0.05)
+        await manager.start()
+        first, _ = manager.submit("semantics", "semantics:u:a", "u", work)
+        while (await manager.get(first["id"], "u"))["status"] != SUCCEEDED:
+            await asyncio.sleep(0.01)
+
+        await asyncio.sleep(0.1)
+        second, _ = manager.submit("semantics", "semantics:u:b", "u", work)
+        while (job := await manager.get(second["id"], "u")) is None or job["status"] != SUCCEEDED:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.01)
+
+        found = await manager.get(first["id"], "u"), await manager.get(second["id"], "u")
+        await manager.close()
+        return found, manager.stats()
+
+    (first, second), stats = asyncio.run(main())
+    assert first is None and second is not None
+    assert stats["pruned"] == 1
@@ -0,0 +1,20 @@
+from langchain_core.runnables import RunnableLambda
+
+from app.managers.llm import LLMRegistry
+from app.managers.llm_scheduler import BACKGROUND, INTERACTIVE, LLMScheduler
+
+
+class FakeRegistry(LLMRegistry):
+    def _client(self, model, temperature):
+        return RunnableLambda(lambda prompt: f"{model}@{temperature}")
+
+
+def test_chains_are_keyed_by_priority():
+    registry = FakeRegistry("key", scheduler=LLMScheduler())
+    interactive = registry.get_chain("summary", lambda llm: llm, priority=INTERACTIVE)
+    background = registry.get_chain("summary", lambda llm: llm, priority=BACKGROUND)
+
+    assert interactive is not background
+    assert (interactive.priority, background.priority) == (INTERACTIVE, BACKGROUND)
+    assert registry.get_chain("summary", lambda llm: llm, priority=BACKGROUND) is background
+    assert registry.stats()["chains"] == ["summary", "summary"]
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+
+from langchain_core.messages import AIMessageChunk
+
+from app.managers.llm_scheduler import BACKGROUND, INTERACTIVE, LLMScheduler
+
+
+def test_async_waiters_are_woken_by_release():
+    scheduler = LLMScheduler(max_concurrency=1)
+    order = []
+
+    async def call(name: str, priority: int):
+        await scheduler.aacquire(1, priority)
+        order.append(name)
+        await asyncio.sleep(0.001)
+        scheduler.release(1)
+
+    async def main():
+        scheduler.acquire(1)
+        tasks = [asyncio.create_task(call(f"background-{i}", BACKGROUND)) for i in range(3)]
+        tasks += [asyncio.create_task(call(f"interactive-{i}", INTERACTIVE)) for i in range(3)]
+        await asyncio.sleep(0.01)
+        assert scheduler.stats()["waiting"] == 6
+
+        # Released from another thread, as a sync call running on an executor would
+        started = time.monotonic()
+        threading.Thread(target=scheduler.release, args=(1,)).start()
+        await asyncio.gather(*tasks)
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(main())
+    assert order == [f"interactive-{i}" for i in range(3)] + [f"background-{i}" for i in range(3)]
+    # Each hand-over is a wake-up, not a poll interval
+    assert elapsed < 0.2
+    assert scheduler.stats()["waiting"] == 0 and not scheduler._async_waiters
+
+
+def test_cancelled_async_waiter_leaves_the_queue():
+    scheduler = LLMScheduler(max_concurrency=1)
+
+    async def main():
+        scheduler.acquire(1)
+        first = asyncio.create_task(scheduler.aacquire(1))
+        second = asyncio.create_task(scheduler.aacquire(1))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        scheduler.release(1)
+        await asyncio.wait_for(second, 1)
+
+    asyncio.run(main())
+    stats = scheduler.stats()
+    assert (stats["active"], stats["waiting"], stats["calls"]) == (1, 0, 2)
+
+
+def test_retry_and_failure_counters():
+    scheduler = LLMScheduler(max_retries=1, retry_base_delay=0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        raise RuntimeError("429 RESOURCE_EXHAUSTED")
+
+    try:
+        scheduler.run(flaky, tokens=1)
+    except RuntimeError:
+        pass
+    stats = scheduler.stats()
+    assert len(attempts) == 2
+    assert (stats["retries"], stats["rate_limited"], stats["failed"], stats["active"]) == (1, 1, 1, 0)
+
+
+def test_streams_correct_the_token_estimate_with_reported_usage():
+    scheduler = LLMScheduler(tokens_per_minute=60000)
+
+    def chunks():
+        yield AIMessageChunk(content="a", usage_metadata={"input_tokens": 100, "output_tokens": 1, "total_tokens": 101})
+        yield AIMessageChunk(content="b")
+        yield AIMessageChunk(content="c", usage_metadata={"input_tokens": 0, "output_tokens": 49, "total_tokens": 49})
+
+    assert "".join(c.content for c in scheduler.stream(chunks, tokens=10)) == "abc"
+    assert scheduler.stats()["tokens"] == 150
+
+    async def achunks():
+        for chunk in chunks():
+            yield chunk
+
+    async def consume():
+        return [chunk async for chunk in scheduler.astream(achunks, tokens=10)]
+
+    asyncio.run(consume())
+    assert scheduler.stats()["tokens"] == 300
@@ -0,0 +1,54 @@
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from app.managers.mindsdb_pool import MindsDBPool, _PooledConnection
+
+
+class FakePool(MindsDBPool):
+    def _connect(self):
+        self.created += 1
+        return _PooledConnection(object())
+
+
+def failing(error):
+    calls = []
+
+    def fn(server):
+        calls.append(server)
+        if len(calls) == 1:
+            raise error
+        return "ok"
+
+    return fn, calls
+
+
+def refused():
+    return requests.exceptions.ConnectionError(
+        MaxRetryError(None, "/api/sql/query", NewConnectionError(None, "Connection refused")))
+
+
+def test_reads_are_retried_after_any_connection_error():
+    pool = FakePool("http://mindsdb", min_size=0)
+    fn, calls = failing(requests.exceptions.ReadTimeout("read timed out"))
+    assert pool.run(fn, idempotent=True) == "ok"
+    assert len(calls) == 2 and pool.stats()["reconnects"] == 1
+
+
+def test_writes_are_only_retried_when_never_sent():
+    pool = FakePool("http://mindsdb", min_size=0)
+    fn, calls = failing(requests.exceptions.ReadTimeout("read timed out"))
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        pool.run(fn)
+    assert len(calls) == 1
+
+    fn, calls = failing(requests.exceptions.ChunkedEncodingError("connection broken"))
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        pool.run(fn)
+    assert len(calls) == 1
+
+    fn, calls = failing(refused())
+    assert pool.run(fn) == "ok"
+    assert len(calls) == 2
+    # Sessions that failed are discarded, not handed out again
+    assert pool.stats()["discarded"] == 3
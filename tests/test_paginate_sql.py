@@ -0,0 +1,42 @@
+from app.services.mindsdb_service import clean_sql, is_pageable, paginate_sql
+
+
+def test_plain_select_gets_page_limit():
+    assert paginate_sql("SELECT * FROM t;", 0, 100) == "SELECT * FROM t\nLIMIT 101"
+    assert paginate_sql("SELECT * FROM t", 200, 100) == "SELECT * FROM t\nLIMIT 101 OFFSET 200"
+
+
+def test_user_limit_is_respected():
+    assert paginate_sql("SELECT * FROM t LIMIT 5", 0, 100) == "SELECT * FROM t\nLIMIT 5"
+    assert paginate_sql("SELECT * FROM t LIMIT 5", 5, 100) is None
+    assert paginate_sql("SELECT * FROM t LIMIT 10, 20", 0, 100) == "SELECT * FROM t\nLIMIT 20 OFFSET 10"
+
+
+def test_trailing_comment_does_not_hide_limit():
+    assert paginate_sql("SELECT * FROM t LIMIT 5 -- c", 0, 100) == "SELECT * FROM t\nLIMIT 5"
+    assert paginate_sql("SELECT * FROM t LIMIT 5 /* c */;", 0, 100) == "SELECT * FROM t\nLIMIT 5"
+
+
+def test_bare_offset_is_folded_into_generated_clause():
+    assert paginate_sql("SELECT * FROM t OFFSET 10", 0, 100) == "SELECT * FROM t\nLIMIT 101 OFFSET 10"
+    assert paginate_sql("SELECT * FROM t OFFSET 10", 100, 100) == "SELECT * FROM t\nLIMIT 101 OFFSET 110"
+
+
+def test_leading_comments_and_parentheses_are_pageable():
+    assert is_pageable("-- monthly totals\nSELECT 1")
+    assert is_pageable("/* c */ WITH x AS (SELECT 1) SELECT * FROM x")
+    assert is_pageable("(SELECT * FROM t)")
+    assert paginate_sql("(SELECT * FROM t)", 0, 10) == "SELECT * FROM t\nLIMIT 11"
+
+
+def test_non_select_is_not_pageable():
+    assert not is_pageable("INSERT INTO t VALUES (1)")
+    assert not is_pageable("-- SELECT\nDELETE FROM t")
+
+
+def test_comment_markers_inside_strings_are_kept():
+    assert clean_sql("SELECT '--x' AS a, \"/*y*/\" FROM t -- c") == "SELECT '--x' AS a, \"/*y*/\" FROM t"
+
+
+def test_union_of_parenthesized_selects_is_not_unwrapped():
+    assert clean_sql("(SELECT 1) UNION (SELECT 2)") == "(SELECT 1) UNION (SELECT 2)"
@@ -0,0 +1,45 @@
+import pandas as pd
+
+from app.managers.query_cache import BYPASS, HIT, MISS, QueryResultCache
+
+
+def frame():
+    return pd.DataFrame({"id": [1, 2], "total": [10.0, 20.0]})
+
+
+def test_callers_get_private_copies():
+    cache = QueryResultCache(max_bytes=1 << 20)
+    first, status = cache.fetch("shop", "SELECT * FROM orders", frame)
+    assert status == MISS
+    first.loc[0, "total"] = -1
+
+    second, status = cache.fetch("shop", "SELECT * FROM orders", frame)
+    assert status == HIT
+    assert second.loc[0, "total"] == 10.0
+    second["extra"] = 1
+
+    third, _ = cache.fetch("shop", "SELECT * FROM orders", frame)
+    assert list(third.columns) == ["id", "total"]
+
+
+def test_write_invalidates_its_datasource():
+    cache = QueryResultCache(max_bytes=1 << 20)
+    cache.fetch("shop", "SELECT * FROM orders", frame)
+    cache.fetch("crm", "SELECT * FROM leads", frame)
+
+    _, status = cache.fetch("shop", "INSERT INTO orders VALUES (3, 30.0)", lambda: None)
+    assert status == BYPASS
+
+    assert cache.fetch("shop", "SELECT * FROM orders", frame)[1] == MISS
+    assert cache.fetch("crm", "SELECT * FROM leads", frame)[1] == HIT
+
+
+def test_load_overtaken_by_a_write_is_not_stored():
+    cache = QueryResultCache(max_bytes=1 << 20)
+
+    def load_during_write():
+        cache.fetch("shop", "DELETE FROM orders", lambda: None)
+        return frame()
+
+    assert cache.fetch("shop", "SELECT * FROM orders", load_during_write)[1] == MISS
+    assert cache.fetch("shop", "SELECT * FROM orders", frame)[1] == MISS
@@ -0,0 +1,21 @@
+import pandas as pd
+
+from app.services.result_profiler import profile_dataframe
+
+
+def test_string_date_column_is_profiled_as_time():
+    df = pd.DataFrame({
+        "order_date": pd.Series([f"2024-01-{d:02d}" for d in range(1, 31)], dtype="string"),
+        "amount": range(30),
+    })
+    profile = profile_dataframe(df)
+
+    kinds = {c["name"]: c["kind"] for c in profile["columns"]}
+    assert kinds == {"order_date": "time", "amount": "numeric"}
+    assert profile["trends"]["amount"]["direction"] == "increasing"
+
+
+def test_string_decimal_column_is_numeric():
+    df = pd.DataFrame({"price": pd.Series(["1.50", "2.25", None], dtype="string")})
+    assert profile_dataframe(df)["columns"][0]["kind"] == "numeric"
+
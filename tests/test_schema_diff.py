@@ -0,0 +1,96 @@
+from app.services.schema_diff import (
+    RELATIONSHIPS, SEMANTICS, SchemaChangeTracker, diff_schemas, semantics_diff, touches,
+)
+
+OLD = {
+    "orders": {"id": "int", "total": "numeric"},
+    "customers": {"id": "int", "name": "varchar"},
+    "legacy": {"id": "int"},
+}
+
+
+def test_added_removed_and_altered_tables():
+    new = {
+        "orders": {"id": "int", "total": "numeric", "discount": "numeric"},
+        "customers": {"id": "int", "name": "varchar"},
+        "invoices": {"id": "int"},
+    }
+    diff = diff_schemas(OLD, new)
+    assert diff.added == {"invoices"}
+    assert diff.removed == {"legacy"}
+    assert diff.altered == {"orders"}
+    assert diff.changed == {"invoices", "orders"}
+    assert not diff.is_empty()
+
+
+def test_type_change_alters_but_case_does_not():
+    assert diff_schemas(OLD, OLD | {"orders": {"id": "bigint", "total": "numeric"}}).altered == {"orders"}
+    assert diff_schemas(OLD, OLD | {"orders": {"ID": "INT", "Total": "NUMERIC"}}).is_empty()
+
+
+def test_unusable_schemas_count_as_empty():
+    assert diff_schemas(None, OLD).added == set(OLD)
+    assert diff_schemas(OLD, "error").removed == set(OLD)
+    assert diff_schemas({"orders": None}, {"orders": None}).is_empty()
+
+
+def test_semantics_diff_compares_column_names():
+    semantics = [
+        {"table_name": "orders", "columns": [{"column_name": "id"}, {"column_name": "total"}]},
+        {"table_name": "customers", "columns": [{"column_name": "id"}]},
+        {"table_name": "dropped", "columns": []},
+    ]
+    diff = semantics_diff(OLD, semantics)
+    assert diff.added == {"legacy"}
+    assert diff.removed == {"dropped"}
+    assert diff.altered == {"customers"}
+    assert semantics_diff(OLD, None).added == set(OLD)
+
+
+def test_touches():
+    relationship = {"source_table": "orders", "target_table": "customers"}
+    assert touches(relationship, {"customers"})
+    assert not touches(relationship, {"invoices"})
+
+
+def test_tracker_accumulates_changes_after_generation():
+    tracker = SchemaChangeTracker()
+    tracker.mark_changed("shop", diff_schemas(OLD, OLD | {"invoices": {"id": "int"}}))
+    # Nothing known before the first generation: callers regenerate everything
+    assert tracker.pending("shop", SEMANTICS) is None
+
+    tracker.mark_generated("shop", SEMANTICS, incremental=False)
+    tracker.mark_changed("shop", diff_schemas(OLD, OLD | {"invoices": {"id": "int"}}))
+    tracker.mark_changed("shop", diff_schemas(OLD | {"invoices": {"id": "int"}}, {"orders": OLD["orders"]}))
+    assert tracker.pending("shop", SEMANTICS) == set()
+    assert tracker.pending("shop", RELATIONSHIPS) is None
+
+    tracker.mark_changed("shop", diff_schemas({}, {"refunds": {"id": "int"}}))
+    assert tracker.pending("shop", SEMANTICS) == {"refunds"}
+
+    tracker.mark_generated("shop", SEMANTICS, incremental=True, skipped=3)
+    assert tracker.pending("shop", SEMANTICS) == set()
+    assert tracker.stats()["tables_skipped"] == 3
+
+    tracker.forget("shop")
+    assert tracker.pending("shop", SEMANTICS) is None
+
+
+def test_changes_during_generation_stay_pending():
+    tracker = SchemaChangeTracker()
+    tracker.mark_generated("shop", RELATIONSHIPS, incremental=False)
+    tracker.mark_changed("shop", diff_schemas({}, {"refunds": {"id": "int"}}))
+
+    with tracker.generating("shop", RELATIONSHIPS):
+        assert tracker.pending("shop", RELATIONSHIPS) == {"refunds"}
+        # A schema sync lands while the generation is running
+        tracker.mark_changed("shop", diff_schemas({}, {"invoices": {"id": "int"}}))
+        tracker.mark_generated("shop", RELATIONSHIPS, incremental=True)
+    assert tracker.pending("shop", RELATIONSHIPS) == {"invoices"}
+
+    # Also when nothing was known before the (full) generation started
+    with tracker.generating("shop", SEMANTICS):
+        tracker.mark_changed("shop", diff_schemas({}, {"payouts": {"id": "int"}}))
+        tracker.mark_generated("shop", SEMANTICS, incremental=False)
+    assert tracker.pending("shop", SEMANTICS) == {"payouts"}
+    assert not tracker._running
@@ -0,0 +1,81 @@
+from contextlib import contextmanager
+
+import pandas as pd
+
+from app.managers.mindsdb import MindsDBManager
+
+# The same table name in two schemas, as an unfiltered INFORMATION_SCHEMA returns it
+COLUMNS = pd.DataFrame({
+    "TABLE_NAME": ["orders", "orders", "orders", "orders", "users", "audit"],
+    "COLUMN_NAME": ["id", "total", "id", "total", "id", "id"],
+    "DATA_TYPE": ["int", "numeric", "int", "numeric", "int", "int"],
+})
+TABLES = pd.DataFrame({"Tables_in_shop": ["orders", "orders", "users"]})
+
+
+class FakeQuery:
+    def __init__(self, sql, all_columns):
+        self.sql = " ".join(sql.split())
+        self.all_columns = all_columns
+
+    def fetch(self):
+        if self.sql.startswith("SHOW TABLES"):
+            return TABLES
+        columns = self.all_columns[self.all_columns["TABLE_NAME"].isin(["orders", "users"])]
+        if self.sql.startswith("SELECT DISTINCT"):
+            return columns[["TABLE_NAME", "COLUMN_NAME"]].drop_duplicates()
+        if "WHERE" in self.sql:
+            table = columns[columns["TABLE_NAME"] == self.sql.split("'")[1]]
+            return table.assign(IS_NULLABLE="YES")[["COLUMN_NAME", "IS_NULLABLE", "DATA_TYPE"]]
+        return self.all_columns
+
+
+class FakeDatabase:
+    def __init__(self, columns):
+        self.columns = columns
+
+    def query(self, sql):
+        return FakeQuery(sql, self.columns)
+
+
+class FakeServer:
+    def __init__(self, columns):
+        self.columns = columns
+
+    def get_database(self, name):
+        return FakeDatabase(self.columns)
+
+
+class FakePool:
+    def __init__(self, columns=COLUMNS):
+        self.columns = columns
+
+    @contextmanager
+    def connection(self):
+        yield FakeServer(self.columns)
+
+
+def test_live_fingerprint_matches_introspected_schema_across_schemas():
+    manager = MindsDBManager(FakePool())
+    schema = manager._get_datasource_schema("shop")
+
+    assert schema == {"orders": {"id": "int", "total": "numeric"}, "users": {"id": "int"}}
+    assert manager.get_schema_fingerprint("shop") == MindsDBManager.schema_fingerprint(schema)
+
+
+def test_per_table_fallback_matches_fingerprint():
+    manager = MindsDBManager(FakePool())
+    manager._bulk_unsupported["shop"] = float("inf")
+    schema = manager._get_datasource_schema("shop")
+
+    assert manager.get_schema_fingerprint("shop") == MindsDBManager.schema_fingerprint(schema)
+
+
+def test_renamed_column_changes_fingerprint():
+    schema = MindsDBManager(FakePool())._get_datasource_schema("shop")
+    renamed = COLUMNS.assign(COLUMN_NAME=["id", "amount", "id", "amount", "id", "id"])
+
+    assert MindsDBManager(FakePool(renamed)).get_schema_fingerprint("shop") != \
+        MindsDBManager.schema_fingerprint(schema)
+    assert MindsDBManager.schema_fingerprint({"orders": {"id": "int", "amount": "numeric"}, "users": {"id": "int"}}) == \
+        MindsDBManager(FakePool(renamed)).get_schema_fingerprint("shop")
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+
+def test_do_coalesces_concurrent_calls():
+    singleflight = SingleFlight()
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"rows": 1}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(singleflight.do("k", load))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 5 and all(r is results[0] for r in results)
+    assert singleflight.stats()["coalesced"] == 4
+
+
+def test_do_gives_each_follower_its_own_exception():
+    singleflight = SingleFlight()
+    errors = []
+
+    def fail():
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    def call():
+        try:
+            singleflight.do("k", fail)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3
+    assert len({id(e) for e in errors}) == 3
+    assert all(str(e) == "boom" for e in errors)
+
+
+def test_ado_coalesces_and_shares_result():
+    async def main():
+        singleflight = SingleFlight()
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "result"
+
+        results = await asyncio.gather(*(singleflight.ado("k", load) for _ in range(4)))
+        return calls, results, singleflight.stats()
+
+    calls, results, stats = asyncio.run(main())
+    assert len(calls) == 1
+    assert results == ["result"] * 4
+    assert stats["in_flight"] == 0
+
+
+def test_ado_leader_cancellation_does_not_cancel_followers():
+    async def main():
+        singleflight = SingleFlight()
+
+        async def load():
+            await asyncio.sleep(0.05)
+            return 7
+
+        leader = asyncio.create_task(singleflight.ado("k", load))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(singleflight.ado("k", load))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == 7
+
+
+def test_ado_cancels_call_once_every_caller_is_gone():
+    async def main():
+        singleflight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def load():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.create_task(singleflight.ado("k", load)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+        # A new caller starts a fresh call instead of joining the cancelled one
+        async def quick():
+            return "fresh"
+
+        return await singleflight.ado("k", quick)
+
+    assert asyncio.run(main()) == "fresh"
+
+
+def test_ado_propagates_errors_to_every_caller():
+    async def main():
+        singleflight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise KeyError("missing")
+
+        return await asyncio.gather(*(singleflight.ado("k", fail) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(main())
+    assert all(isinstance(e, KeyError) for e in errors)
+    assert len({id(e) for e in errors}) == 3
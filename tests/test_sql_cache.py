@@ -0,0 +1,49 @@
+from app.services.sql_cache import SQLGenerationCache, normalize_question
+
+
+def payload(message, tables=None, db_name="shop"):
+    return {
+        "user_message": message,
+        "db_name": db_name,
+        "db_type": "postgres",
+        "tables": tables or {"orders": {"id": "int"}},
+        "relationships": [],
+        "semantics": [],
+    }
+
+
+def test_normalize_question_drops_articles_and_politeness():
+    assert normalize_question("Please show me the total Orders!") == normalize_question("total order")
+
+
+def test_normalize_question_keeps_direction():
+    assert normalize_question("flights from NYC to LA") != normalize_question("flights to NYC from LA")
+
+
+def test_normalize_question_keeps_prepositions_and_quantifiers():
+    assert normalize_question("revenue by month") != normalize_question("revenue for month")
+    assert normalize_question("orders with all items") != normalize_question("orders with any items")
+    assert normalize_question("paid or shipped") != normalize_question("paid and shipped")
+
+
+def test_cache_hit_for_equivalent_question():
+    cache = SQLGenerationCache()
+    cache.put(payload("Show me the total orders"), "SELECT COUNT(*) FROM orders")
+    assert cache.get(payload("please show the total orders")) == "SELECT COUNT(*) FROM orders"
+
+
+def test_schemas_of_same_datasource_do_not_evict_each_other():
+    cache = SQLGenerationCache()
+    old, new = {"orders": {"id": "int"}}, {"orders": {"id": "int", "total": "numeric"}}
+    cache.put(payload("total orders", old), "SELECT 1")
+    cache.put(payload("total orders", new), "SELECT 2")
+
+    assert cache.get(payload("total orders", old)) == "SELECT 1"
+    assert cache.get(payload("total orders", new)) == "SELECT 2"
+
+
+def test_discard_removes_entry():
+    cache = SQLGenerationCache()
+    cache.put(payload("total orders"), "SELECT 1")
+    cache.discard(payload("total orders"))
+    assert cache.get(payload("total orders")) is None
@@ -0,0 +1,76 @@
+import pytest
+
+from app.services.sql_validator import (
+    VALIDATION_OFF, VALIDATION_WARN, SQLValidationError, SQLValidator, dialect_for,
+)
+
+TABLES = {
+    "orders": {"id": "int", "customer_id": "int", "total": "numeric", "created_at": "timestamp"},
+    "customers": {"id": "int", "name": "varchar", "region": "varchar"},
+}
+
+
+def errors(sql, tables=TABLES, db_type="postgres"):
+    return SQLValidator().check(sql, tables, db_type)[0]
+
+
+def test_valid_join_with_aliases():
+    assert errors(
+        "SELECT c.region, SUM(o.total) AS revenue FROM orders o "
+        "JOIN customers c ON c.id = o.customer_id GROUP BY c.region ORDER BY revenue DESC"
+    ) == []
+
+
+def test_unknown_table_and_qualified_column():
+    assert errors("SELECT * FROM invoices") == ["Unknown table 'invoices'"]
+    assert errors("SELECT o.amount FROM orders o") == ["Unknown column 'o.amount'"]
+
+
+def test_unqualified_column_missing_from_every_table():
+    assert errors("SELECT discount FROM orders") == ["Unknown column 'discount'"]
+    assert errors("SELECT name FROM orders JOIN customers ON customers.id = orders.customer_id") == []
+
+
+def test_ctes_subqueries_and_aliases_are_not_flagged():
+    assert errors(
+        "WITH recent AS (SELECT customer_id, total AS amount FROM orders) "
+        "SELECT amount FROM recent"
+    ) == []
+    assert errors("SELECT t.n FROM (SELECT COUNT(*) AS n FROM orders) AS t") == []
+    assert errors("SELECT total * 2 AS doubled FROM orders ORDER BY doubled") == []
+
+
+def test_syntax_errors():
+    assert errors("SELEC id FROM orders")[0].startswith("Syntax error")
+    assert errors("SELECT id FROM orders WHERE (")[0].startswith("Syntax error")
+    assert errors("") == ["Empty SQL statement"]
+
+
+def test_identifiers_are_case_insensitive():
+    assert errors("SELECT ID, Total FROM ORDERS") == []
+
+
+def test_unknown_column_shape_is_not_checked():
+    assert errors("SELECT anything FROM orders", tables={"orders": "unknown"}) == []
+
+
+def test_dialect_aliases():
+    assert dialect_for("PostgreSQL") == "postgres"
+    assert dialect_for("mariadb") == "mysql"
+    assert dialect_for("not-an-engine") is None
+
+
+def test_modes_and_counters():
+    validator = SQLValidator()
+    with pytest.raises(SQLValidationError) as e:
+        validator.validate("SELECT * FROM invoices", TABLES, "postgres")
+    assert e.value.errors == ["Unknown table 'invoices'"]
+
+    warn = SQLValidator(mode=VALIDATION_WARN)
+    assert warn.validate("SELECT * FROM invoices", TABLES) == ["Unknown table 'invoices'"]
+    assert warn.validate("SELECT id FROM orders", TABLES) == []
+    assert SQLValidator(mode=VALIDATION_OFF).validate("SELEC", TABLES) == []
+
+    assert validator.stats()["rejected"] == 1
+    stats = warn.stats()
+    assert (stats["checked"], stats["passed"], stats["flagged"], stats["unknown_tables"]) == (2, 1, 1, 1)